@@ -1511,6 +1511,9 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Sparse (BM25) index used by hybrid search
+SPARSE_INDEX_DATA_PATH = f"{DATA_DIR}/sparse_index"
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -1727,6 +1730,55 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+RAG_EMBEDDING_CACHE_DIR = os.environ.get(
+    "RAG_EMBEDDING_CACHE_DIR", f"{CACHE_DIR}/embeddings"
+)
+
+try:
+    RAG_EMBEDDING_CACHE_SIZE = int(os.environ.get("RAG_EMBEDDING_CACHE_SIZE", "10000"))
+except ValueError:
+    RAG_EMBEDDING_CACHE_SIZE = 10000
+
+# Number of embeddings kept on disk, the least recently used ones are evicted
+try:
+    RAG_EMBEDDING_CACHE_DISK_SIZE = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_DISK_SIZE", "1000000")
+    )
+except ValueError:
+    RAG_EMBEDDING_CACHE_DISK_SIZE = 1000000
+
+try:
+    RAG_RETRIEVAL_MAX_WORKERS = int(os.environ.get("RAG_RETRIEVAL_MAX_WORKERS", "8"))
+except ValueError:
+    RAG_RETRIEVAL_MAX_WORKERS = 8
+
+try:
+    RAG_EMBEDDING_CONCURRENT_REQUESTS = int(
+        os.environ.get("RAG_EMBEDDING_CONCURRENT_REQUESTS", "4")
+    )
+except ValueError:
+    RAG_EMBEDDING_CONCURRENT_REQUESTS = 4
+
+try:
+    RAG_EMBEDDING_BATCH_MAX_TOKENS = int(
+        os.environ.get("RAG_EMBEDDING_BATCH_MAX_TOKENS", "100000")
+    )
+except ValueError:
+    RAG_EMBEDDING_BATCH_MAX_TOKENS = 100000
+
+try:
+    RAG_EMBEDDING_MAX_RETRIES = int(os.environ.get("RAG_EMBEDDING_MAX_RETRIES", "3"))
+except ValueError:
+    RAG_EMBEDDING_MAX_RETRIES = 3
+
+try:
+    RAG_INGESTION_WORKERS = int(os.environ.get("RAG_INGESTION_WORKERS", "2"))
+except ValueError:
+    RAG_INGESTION_WORKERS = 2
+
 RAG_RERANKING_MODEL = PersistentConfig(
     "RAG_RERANKING_MODEL",
     "rag.reranking_model",
@@ -2030,6 +2082,24 @@ RAG_WEB_SEARCH_TRUST_ENV = PersistentConfig(
     os.getenv("RAG_WEB_SEARCH_TRUST_ENV", "False").lower() == "true",
 )
 
+ENABLE_RAG_WEB_FETCH_CACHE = (
+    os.environ.get("ENABLE_RAG_WEB_FETCH_CACHE", "True").lower() == "true"
+)
+RAG_WEB_FETCH_CACHE_DIR = os.environ.get("RAG_WEB_FETCH_CACHE_DIR", f"{CACHE_DIR}/web")
+
+try:
+    RAG_WEB_FETCH_CACHE_TTL = int(os.environ.get("RAG_WEB_FETCH_CACHE_TTL", "3600"))
+except ValueError:
+    RAG_WEB_FETCH_CACHE_TTL = 3600
+
+try:
+    # In bytes, 256 MB by default
+    RAG_WEB_FETCH_CACHE_MAX_SIZE = int(
+        os.environ.get("RAG_WEB_FETCH_CACHE_MAX_SIZE", str(256 * 1024 * 1024))
+    )
+except ValueError:
+    RAG_WEB_FETCH_CACHE_MAX_SIZE = 256 * 1024 * 1024
+
 PLAYWRIGHT_WS_URI = PersistentConfig(
     "PLAYWRIGHT_WS_URI",
     "rag.web.loader.engine.playwright.ws.uri",
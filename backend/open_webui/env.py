@@ -317,6 +317,65 @@ else:
     except Exception:
         DATABASE_POOL_RECYCLE = 3600
 
+# Seconds between background refreshes of the model catalogue, i.e. of the model
+# lists of the connected providers
+MODEL_CATALOGUE_REFRESH_INTERVAL = os.environ.get(
+    "MODEL_CATALOGUE_REFRESH_INTERVAL", "60"
+)
+
+try:
+    MODEL_CATALOGUE_REFRESH_INTERVAL = int(MODEL_CATALOGUE_REFRESH_INTERVAL)
+except Exception:
+    MODEL_CATALOGUE_REFRESH_INTERVAL = 60
+
+# Seconds a user's group memberships are cached for access control checks, writes
+# from this process invalidate the cache immediately
+ACCESS_CONTROL_CACHE_TTL = os.environ.get("ACCESS_CONTROL_CACHE_TTL", "5")
+
+try:
+    ACCESS_CONTROL_CACHE_TTL = float(ACCESS_CONTROL_CACHE_TTL)
+except Exception:
+    ACCESS_CONTROL_CACHE_TTL = 5.0
+
+# Seconds an authenticated user is cached by token or API key, writes to the user
+# from this process invalidate the cache immediately
+AUTH_USER_CACHE_TTL = os.environ.get("AUTH_USER_CACHE_TTL", "5")
+
+try:
+    AUTH_USER_CACHE_TTL = float(AUTH_USER_CACHE_TTL)
+except Exception:
+    AUTH_USER_CACHE_TTL = 5.0
+
+# Seconds between the bulk updates of the users' last activity
+USER_LAST_ACTIVE_FLUSH_INTERVAL = os.environ.get(
+    "USER_LAST_ACTIVE_FLUSH_INTERVAL", "10"
+)
+
+try:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = max(float(USER_LAST_ACTIVE_FLUSH_INTERVAL), 1.0)
+except Exception:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = 10.0
+
+# Threads hashing and verifying passwords, which is CPU bound and kept off the
+# event loop
+PASSWORD_HASHING_WORKERS = os.environ.get(
+    "PASSWORD_HASHING_WORKERS", str(min(4, os.cpu_count() or 1))
+)
+
+try:
+    PASSWORD_HASHING_WORKERS = max(int(PASSWORD_HASHING_WORKERS), 1)
+except Exception:
+    PASSWORD_HASHING_WORKERS = min(4, os.cpu_count() or 1)
+
+# Connections of the LDAP application account kept bound for the user searches,
+# which is also the number of concurrent LDAP requests
+LDAP_CONNECTION_POOL_SIZE = os.environ.get("LDAP_CONNECTION_POOL_SIZE", "4")
+
+try:
+    LDAP_CONNECTION_POOL_SIZE = max(int(LDAP_CONNECTION_POOL_SIZE), 1)
+except Exception:
+    LDAP_CONNECTION_POOL_SIZE = 4
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -326,6 +385,25 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Write-behind window used when realtime chat saving is enabled: buffered message
+# updates are flushed at most once per interval (seconds) or once the buffered
+# content has grown by the given number of characters, whichever comes first.
+REALTIME_CHAT_SAVE_INTERVAL = os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1")
+
+try:
+    REALTIME_CHAT_SAVE_INTERVAL = float(REALTIME_CHAT_SAVE_INTERVAL)
+except Exception:
+    REALTIME_CHAT_SAVE_INTERVAL = 1.0
+
+REALTIME_CHAT_SAVE_BUFFER_SIZE = os.environ.get(
+    "REALTIME_CHAT_SAVE_BUFFER_SIZE", "4096"
+)
+
+try:
+    REALTIME_CHAT_SAVE_BUFFER_SIZE = int(REALTIME_CHAT_SAVE_BUFFER_SIZE)
+except Exception:
+    REALTIME_CHAT_SAVE_BUFFER_SIZE = 4096
+
 ####################################
 # REDIS
 ####################################
@@ -387,6 +465,45 @@ WEBSOCKET_MANAGER = os.environ.get("WEBSOCKET_MANAGER", "")
 WEBSOCKET_REDIS_URL = os.environ.get("WEBSOCKET_REDIS_URL", REDIS_URL)
 WEBSOCKET_REDIS_LOCK_TIMEOUT = os.environ.get("WEBSOCKET_REDIS_LOCK_TIMEOUT", 60)
 
+# Seconds a node may serve session/user pool reads from its local cache, entries
+# are also invalidated through Redis pub/sub as soon as another node writes them
+WEBSOCKET_REDIS_CACHE_TTL = os.environ.get("WEBSOCKET_REDIS_CACHE_TTL", "3")
+
+try:
+    WEBSOCKET_REDIS_CACHE_TTL = float(WEBSOCKET_REDIS_CACHE_TTL)
+except Exception:
+    WEBSOCKET_REDIS_CACHE_TTL = 3.0
+
+# Streamed chat completion frames are coalesced per message and emitted at most
+# once per interval (milliseconds), 0 disables coalescing
+WEBSOCKET_EVENT_COALESCE_INTERVAL = os.environ.get(
+    "WEBSOCKET_EVENT_COALESCE_INTERVAL", "40"
+)
+
+try:
+    WEBSOCKET_EVENT_COALESCE_INTERVAL = int(WEBSOCKET_EVENT_COALESCE_INTERVAL)
+except Exception:
+    WEBSOCKET_EVENT_COALESCE_INTERVAL = 40
+
+# Send only the appended part of the message content when possible
+WEBSOCKET_EVENT_DELTA_FRAMES = (
+    os.environ.get("WEBSOCKET_EVENT_DELTA_FRAMES", "False").lower() == "true"
+)
+
+# Running tasks (e.g. chat completions) are shared by all workers and nodes
+# through Redis when set to "redis", so that they can be stopped from any of them
+TASK_MANAGER = os.environ.get("TASK_MANAGER", WEBSOCKET_MANAGER)
+TASK_REDIS_URL = os.environ.get("TASK_REDIS_URL", WEBSOCKET_REDIS_URL)
+
+# Seconds after which the tasks of a worker that stopped renewing its lease, e.g.
+# a killed process, are removed from the registry
+TASK_WORKER_LEASE_TTL = os.environ.get("TASK_WORKER_LEASE_TTL", "30")
+
+try:
+    TASK_WORKER_LEASE_TTL = int(TASK_WORKER_LEASE_TTL)
+except Exception:
+    TASK_WORKER_LEASE_TTL = 30
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -411,6 +528,51 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = 5
 
+# Connections kept open to each upstream host (LLM providers, audio, images)
+AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = os.environ.get(
+    "AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "100"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST)
+except Exception:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "60"
+)
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 60.0
+
+AIOHTTP_CLIENT_DNS_CACHE_TTL = os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "300")
+
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = int(AIOHTTP_CLIENT_DNS_CACHE_TTL)
+except Exception:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 300
+
+# Picks the backend among the Ollama / OpenAI base URLs serving a model, one of
+# "least_requests", "latency" or "random"
+LOAD_BALANCER_STRATEGY = os.environ.get("LOAD_BALANCER_STRATEGY", "least_requests")
+
+# Consecutive failures after which a backend is skipped for the cooldown
+LOAD_BALANCER_FAILURE_THRESHOLD = os.environ.get("LOAD_BALANCER_FAILURE_THRESHOLD", "3")
+
+try:
+    LOAD_BALANCER_FAILURE_THRESHOLD = int(LOAD_BALANCER_FAILURE_THRESHOLD)
+except Exception:
+    LOAD_BALANCER_FAILURE_THRESHOLD = 3
+
+LOAD_BALANCER_COOLDOWN = os.environ.get("LOAD_BALANCER_COOLDOWN", "30")
+
+try:
+    LOAD_BALANCER_COOLDOWN = float(LOAD_BALANCER_COOLDOWN)
+except Exception:
+    LOAD_BALANCER_COOLDOWN = 30.0
+
 
 ####################################
 # OFFLINE_MODE
@@ -1,6 +1,10 @@
+import asyncio
+import functools
 import json
 import logging
-from contextlib import contextmanager
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
@@ -15,7 +19,8 @@ from open_webui.env import (
     DATABASE_POOL_TIMEOUT,
 )
 from peewee_migrate import Router
-from sqlalchemy import Dialect, create_engine, MetaData, types
+from sqlalchemy import Dialect, create_engine, make_url, MetaData, types
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
@@ -102,7 +107,24 @@ SessionLocal = sessionmaker(
 )
 metadata_obj = MetaData(schema=DATABASE_SCHEMA)
 Base = declarative_base(metadata=metadata_obj)
-Session = scoped_session(SessionLocal)
+
+# Threads which used the scoped `Session` during the current request, set by
+# `RequestMiddleware` to commit the session only if the request used it
+session_threads: ContextVar[Optional[set[int]]] = ContextVar(
+    "session_threads", default=None
+)
+
+
+def get_session_scope() -> int:
+    # Called on every use of `Session`, whose sessions stay thread-local
+    thread_id = threading.get_ident()
+    threads = session_threads.get()
+    if threads is not None:
+        threads.add(thread_id)
+    return thread_id
+
+
+Session = scoped_session(SessionLocal, scopefunc=get_session_scope)
 
 
 def get_session():
@@ -114,3 +136,97 @@ def get_session():
 
 
 get_db = contextmanager(get_session)
+
+
+####################
+# Async engine, used by the `*_async` accessors of the hot request paths so that
+# queries do not block the event loop
+####################
+
+# Asyncio drivers of the databases, by synchronous driver
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(database_url: str) -> Optional[str]:
+    try:
+        url = make_url(database_url)
+    except Exception:
+        return None
+
+    if url.drivername not in ASYNC_DRIVERS:
+        return None
+
+    url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    if url.drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        # asyncpg takes the libpq sslmode values as `ssl`
+        url = url.update_query_dict(
+            {"ssl": url.query["sslmode"]}
+        ).difference_update_query(["sslmode"])
+
+    return url.render_as_string(hide_password=False)
+
+
+async_engine = None
+ASYNC_SQLALCHEMY_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+if ASYNC_SQLALCHEMY_DATABASE_URL is not None:
+    try:
+        if "sqlite" in ASYNC_SQLALCHEMY_DATABASE_URL:
+            async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+        elif DATABASE_POOL_SIZE > 0:
+            async_engine = create_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT,
+                pool_recycle=DATABASE_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+        else:
+            async_engine = create_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, poolclass=NullPool
+            )
+    except Exception as e:
+        # e.g. the asyncio driver is not installed
+        log.warning(f"Async database access disabled: {e}")
+        async_engine = None
+
+if async_engine is None:
+    log.info("Async accessors run the synchronous ones in a thread pool.")
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+@asynccontextmanager
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def sync_fallback(sync_method):
+    """
+    Decorator of the async variant of `sync_method`, which is run in a thread
+    instead when there is no asyncio driver for the database.
+    """
+
+    def decorator(async_method):
+        if async_engine is not None:
+            return async_method
+
+        @functools.wraps(async_method)
+        async def wrapper(*args, **kwargs):
+            return await asyncio.to_thread(sync_method, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
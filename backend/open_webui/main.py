@@ -6,7 +6,6 @@ import mimetypes
 import os
 import shutil
 import sys
-import time
 import random
 
 from contextlib import asynccontextmanager
@@ -36,11 +35,10 @@ from fastapi import (
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response, StreamingResponse
 
@@ -51,6 +49,7 @@ from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
     periodic_usage_pool_cleanup,
+    listen_for_pool_invalidations,
 )
 from open_webui.routers import (
     audio,
@@ -326,6 +325,7 @@ from open_webui.env import (
     ENABLE_WEBSOCKET_SUPPORT,
     BYPASS_MODEL_ACCESS_CONTROL,
     RESET_CONFIG_ON_START,
+    ENABLE_FORWARD_USER_INFO_HEADERS,
     OFFLINE_MODE,
 )
 
@@ -334,6 +334,8 @@ from open_webui.utils.models import (
     get_all_models,
     get_all_base_models,
     check_model_access,
+    ModelCatalogue,
+    MODEL_CATALOGUE,
 )
 from open_webui.utils.chat import (
     generate_chat_completion as chat_completion_handler,
@@ -341,7 +343,13 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
-from open_webui.utils.access_control import has_access
+from open_webui.utils.message_store import MESSAGE_STORE
+from open_webui.utils.last_active import LAST_ACTIVE_BUFFER
+from open_webui.utils.ldap import LDAP_CONNECTION_MANAGER
+from open_webui.utils.jobs import INGESTION_QUEUE
+from open_webui.utils.http_client import HTTP_CLIENT_POOL
+from open_webui.retrieval.sparse import SPARSE_INDEX
+from open_webui.utils.access_control import get_user_group_ids
 
 from open_webui.utils.auth import (
     get_license_data,
@@ -351,8 +359,14 @@ from open_webui.utils.auth import (
 )
 from open_webui.utils.oauth import OAuthManager
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.request_middleware import RequestMiddleware
 
-from open_webui.tasks import stop_task, list_tasks  # Import from tasks.py
+from open_webui.tasks import (
+    TASK_REGISTRY,
+    stop_task,
+    list_tasks,
+    get_task_counts,
+)  # Import from tasks.py
 
 
 if SAFE_MODE:
@@ -406,8 +420,23 @@ async def lifespan(app: FastAPI):
         get_license_data(app, LICENSE_KEY)
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    asyncio.create_task(listen_for_pool_invalidations())
+    await INGESTION_QUEUE.start(app)
+    await MODEL_CATALOGUE.start(app)
+    await TASK_REGISTRY.start()
+    await LAST_ACTIVE_BUFFER.start()
+    await asyncio.to_thread(SPARSE_INDEX.prune)
     yield
 
+    await LAST_ACTIVE_BUFFER.stop()
+
+    await TASK_REGISTRY.stop()
+    await MODEL_CATALOGUE.stop()
+    await INGESTION_QUEUE.stop()
+    await MESSAGE_STORE.flush_all()
+    await HTTP_CLIENT_POOL.close()
+    LDAP_CONNECTION_MANAGER.close()
+
 
 app = FastAPI(
     docs_url="/docs" if ENV == "dev" else None,
@@ -794,10 +823,14 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 app.state.MODELS = {}
 
 
-class RedirectMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class RedirectMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
         # Check if the request is a GET request
-        if request.method == "GET":
+        if scope["type"] == "http" and scope["method"] == "GET":
+            request = Request(scope)
             path = request.url.path
             query_params = dict(parse_qs(urlparse(str(request.url)).query))
 
@@ -806,52 +839,17 @@ class RedirectMiddleware(BaseHTTPMiddleware):
                 video_id = query_params["v"][0]  # Extract the first 'v' parameter
                 encoded_video_id = urlencode({"youtube": video_id})
                 redirect_url = f"/?{encoded_video_id}"
-                return RedirectResponse(url=redirect_url)
+                response = RedirectResponse(url=redirect_url)
+                return await response(scope, receive, send)
 
         # Proceed with the normal flow of other requests
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
 
 
 # Add the middleware to the app
 app.add_middleware(RedirectMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
-
-
-@app.middleware("http")
-async def commit_session_after_request(request: Request, call_next):
-    response = await call_next(request)
-    # log.debug("Commit session after request")
-    Session.commit()
-    return response
-
-
-@app.middleware("http")
-async def check_url(request: Request, call_next):
-    start_time = int(time.time())
-    request.state.enable_api_key = app.state.config.ENABLE_API_KEY
-    response = await call_next(request)
-    process_time = int(time.time()) - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
-
-
-@app.middleware("http")
-async def inspect_websocket(request: Request, call_next):
-    if (
-        "/ws/socket.io" in request.url.path
-        and request.query_params.get("transport") == "websocket"
-    ):
-        upgrade = (request.headers.get("Upgrade") or "").lower()
-        connection = (request.headers.get("Connection") or "").lower().split(",")
-        # Check that there's the correct headers for an upgrade, else reject the connection
-        # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
-        if upgrade != "websocket" or "upgrade" not in connection:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"detail": "Invalid WebSocket upgrade request"},
-            )
-    return await call_next(request)
+app.add_middleware(RequestMiddleware)
 
 
 app.add_middleware(
@@ -923,31 +921,30 @@ if audit_level != AuditLevel.NONE:
 
 
 @app.get("/api/models")
-async def get_models(request: Request, user=Depends(get_verified_user)):
-    def get_filtered_models(models, user):
-        filtered_models = []
-        for model in models:
-            if model.get("arena"):
-                if has_access(
-                    user.id,
-                    type="read",
-                    access_control=model.get("info", {})
-                    .get("meta", {})
-                    .get("access_control", {}),
-                ):
-                    filtered_models.append(model)
-                continue
-
-            model_info = Models.get_model_by_id(model["id"])
-            if model_info:
-                if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                ):
-                    filtered_models.append(model)
-
-        return filtered_models
-
-    models = await get_all_models(request, user=user)
+async def get_models(
+    request: Request, response: Response, user=Depends(get_verified_user)
+):
+    # Filter out models that the user does not have access to
+    filter_by_access = user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL
+    user_group_ids = get_user_group_ids(user.id) if filter_by_access else None
+    model_order_list = request.app.state.config.MODEL_ORDER_LIST
+
+    if ENABLE_FORWARD_USER_INFO_HEADERS:
+        # Providers may list models per user from the forwarded headers, which
+        # the shared catalogue does not hold
+        models = await get_all_models(request, user=user)
+        readers = ModelCatalogue.get_readers(models) if filter_by_access else None
+        etag = None
+    else:
+        models = await MODEL_CATALOGUE.get_models(request)
+        readers = None
+        etag = MODEL_CATALOGUE.get_etag(
+            model_order_list,
+            user.id if filter_by_access else None,
+            sorted(user_group_ids) if filter_by_access else None,
+        )
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
 
     # Filter out filter pipelines
     models = [
@@ -956,7 +953,6 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
         if "pipeline" not in model or model["pipeline"].get("type", None) != "filter"
     ]
 
-    model_order_list = request.app.state.config.MODEL_ORDER_LIST
     if model_order_list:
         model_order_dict = {model_id: i for i, model_id in enumerate(model_order_list)}
         # Sort models by order list priority, with fallback for those not in the list
@@ -964,13 +960,14 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
             key=lambda x: (model_order_dict.get(x["id"], float("inf")), x["name"])
         )
 
-    # Filter out models that the user does not have access to
-    if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models = get_filtered_models(models, user)
+    if filter_by_access:
+        models = MODEL_CATALOGUE.filter_models(models, user.id, user_group_ids, readers)
 
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model['id'] for model in models])}"
     )
+    if etag:
+        response.headers["ETag"] = etag
     return {"data": models}
 
 
@@ -987,7 +984,7 @@ async def chat_completion(
     user=Depends(get_verified_user),
 ):
     if not request.app.state.MODELS:
-        await get_all_models(request, user=user)
+        await MODEL_CATALOGUE.get_models(request)
 
     model_item = form_data.pop("model_item", {})
     tasks = form_data.pop("background_tasks", None)
@@ -999,12 +996,12 @@ async def chat_completion(
                 raise Exception("Model not found")
 
             model = request.app.state.MODELS[model_id]
-            model_info = Models.get_model_by_id(model_id)
+            model_info = await Models.get_model_by_id_async(model_id)
 
             # Check if user has access to the model
             if not BYPASS_MODEL_ACCESS_CONTROL and user.role == "user":
                 try:
-                    check_model_access(user, model)
+                    await check_model_access(user, model)
                 except Exception as e:
                     raise e
         else:
@@ -1118,7 +1115,12 @@ async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
 
 @app.get("/api/tasks")
 async def list_tasks_endpoint(user=Depends(get_verified_user)):
-    return {"tasks": list_tasks()}  # Use the function from tasks.py
+    return {"tasks": await list_tasks()}  # Use the function from tasks.py
+
+
+@app.get("/api/tasks/counts")
+async def get_task_counts_endpoint(user=Depends(get_admin_user)):
+    return await get_task_counts()
 
 
 ##################################
@@ -1142,7 +1144,7 @@ async def get_app_config(request: Request):
                 detail="Invalid token",
             )
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
 
     user_count = Users.get_num_users()
     onboarding = False
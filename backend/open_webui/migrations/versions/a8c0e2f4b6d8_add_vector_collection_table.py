@@ -0,0 +1,29 @@
+"""Add vector_collection table
+
+Revision ID: a8c0e2f4b6d8
+Revises: f6a8b0c2d4e5
+Create Date: 2025-03-07 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "a8c0e2f4b6d8"
+down_revision = "f6a8b0c2d4e5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "vector_collection",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("vector_collection")
@@ -0,0 +1,39 @@
+"""Add job table
+
+Revision ID: b2c4d6e8f0a1
+Revises: d7d58848da1d
+Create Date: 2025-03-02 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "b2c4d6e8f0a1"
+down_revision = "d7d58848da1d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "job",
+        sa.Column("id", sa.Text(), nullable=False, primary_key=True, unique=True),
+        sa.Column("user_id", sa.Text()),
+        sa.Column("type", sa.Text()),
+        sa.Column("status", sa.Text()),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("progress", sa.JSON(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+    )
+    op.create_index("job_status_idx", "job", ["status"])
+    op.create_index("job_user_id_idx", "job", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("job_user_id_idx", table_name="job")
+    op.drop_index("job_status_idx", table_name="job")
+    op.drop_table("job")
@@ -0,0 +1,62 @@
+"""Add group_member table
+
+Revision ID: c3d5e7f9a1b2
+Revises: b2c4d6e8f0a1
+Create Date: 2025-03-03 02:00:00.000000
+
+"""
+
+import json
+import time
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "c3d5e7f9a1b2"
+down_revision = "b2c4d6e8f0a1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    group_member_table = op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Populate the table from the `user_ids` JSON column of existing groups
+    group_table = sa.table(
+        "group",
+        sa.column("id", sa.Text()),
+        sa.column("user_ids", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    now = int(time.time())
+
+    members = []
+    for group_id, user_ids in conn.execute(
+        sa.select(group_table.c.id, group_table.c.user_ids)
+    ).fetchall():
+        if isinstance(user_ids, str):
+            try:
+                user_ids = json.loads(user_ids)
+            except json.JSONDecodeError:
+                user_ids = []
+
+        for user_id in dict.fromkeys(user_ids or []):
+            members.append(
+                {"group_id": group_id, "user_id": user_id, "created_at": now}
+            )
+
+    if members:
+        op.bulk_insert(group_member_table, members)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,105 @@
+"""Add access_grant table
+
+Revision ID: d4e6f8a0b2c3
+Revises: c3d5e7f9a1b2
+Create Date: 2025-03-04 02:00:00.000000
+
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d4e6f8a0b2c3"
+down_revision = "c3d5e7f9a1b2"
+branch_labels = None
+depends_on = None
+
+# Resource type, table and primary key of the resources with access control
+RESOURCES = [
+    ("knowledge", "knowledge", "id"),
+    ("model", "model", "id"),
+    ("prompt", "prompt", "command"),
+    ("tool", "tool", "id"),
+]
+
+
+def get_access_grants(resource_type, resource_id, access_control):
+    # `None` is public read access, `{}` leaves only the owner
+    if access_control is None:
+        grants = [("read", "user", "*")]
+    else:
+        grants = [
+            (permission, principal_type, principal_id)
+            for permission in ["read", "write"]
+            for principal_type in ["group", "user"]
+            for principal_id in (access_control.get(permission) or {}).get(
+                f"{principal_type}_ids"
+            )
+            or []
+        ]
+
+    return [
+        {
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "permission": permission,
+            "principal_type": principal_type,
+            "principal_id": principal_id,
+        }
+        for permission, principal_type, principal_id in dict.fromkeys(grants)
+    ]
+
+
+def upgrade():
+    access_grant_table = op.create_table(
+        "access_grant",
+        sa.Column("resource_type", sa.Text(), nullable=False),
+        sa.Column("resource_id", sa.Text(), nullable=False),
+        sa.Column("permission", sa.Text(), nullable=False),
+        sa.Column("principal_type", sa.Text(), nullable=False),
+        sa.Column("principal_id", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "resource_type",
+            "resource_id",
+            "permission",
+            "principal_type",
+            "principal_id",
+            name="pk_access_grant",
+        ),
+    )
+    op.create_index(
+        "access_grant_principal_idx",
+        "access_grant",
+        ["resource_type", "permission", "principal_type", "principal_id"],
+    )
+
+    # Derive the grants of existing resources from their `access_control`
+    conn = op.get_bind()
+    for resource_type, table_name, id_column in RESOURCES:
+        table = sa.table(
+            table_name,
+            sa.column(id_column, sa.Text()),
+            sa.column("access_control", sa.JSON()),
+        )
+
+        grants = []
+        for resource_id, access_control in conn.execute(
+            sa.select(table.c[id_column], table.c.access_control)
+        ).fetchall():
+            if isinstance(access_control, str):
+                try:
+                    access_control = json.loads(access_control)
+                except json.JSONDecodeError:
+                    access_control = {}
+
+            grants.extend(get_access_grants(resource_type, resource_id, access_control))
+
+        if grants:
+            op.bulk_insert(access_grant_table, grants)
+
+
+def downgrade():
+    op.drop_index("access_grant_principal_idx", table_name="access_grant")
+    op.drop_table("access_grant")
@@ -0,0 +1,92 @@
+"""Add chat_message table
+
+Revision ID: d7d58848da1d
+Revises: 3781e22d8b01
+Create Date: 2025-03-01 03:00:00.000000
+
+"""
+
+import time
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+
+revision = "d7d58848da1d"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+
+
+def upgrade():
+    chat_message_table = op.create_table(
+        "chat_message",
+        sa.Column("chat_id", sa.Text(), nullable=False),
+        sa.Column("id", sa.Text(), nullable=False),
+        sa.Column("parent_id", sa.Text(), nullable=True),
+        sa.Column("role", sa.Text(), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("chat_id", "id"),
+    )
+
+    # Backfill the messages of existing chats, a batch of chats at a time so that
+    # large databases are not loaded into memory at once
+    chat_table = table(
+        "chat",
+        column("id", sa.Text()),
+        column("chat", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    chat_ids = [row.id for row in conn.execute(select(chat_table.c.id))]
+
+    now = int(time.time())
+    for idx in range(0, len(chat_ids), BATCH_SIZE):
+        batch_ids = chat_ids[idx : idx + BATCH_SIZE]
+        rows = conn.execute(
+            select(chat_table.c.id, chat_table.c.chat).where(
+                chat_table.c.id.in_(batch_ids)
+            )
+        )
+
+        chat_messages = []
+        for row in rows:
+            chat = row.chat if isinstance(row.chat, dict) else {}
+            messages = (chat.get("history") or {}).get("messages") or {}
+            if not isinstance(messages, dict):
+                continue
+
+            for message_id, message in messages.items():
+                if not isinstance(message, dict):
+                    continue
+
+                content = message.get("content")
+                try:
+                    created_at = int(message.get("timestamp") or now)
+                except (TypeError, ValueError):
+                    created_at = now
+
+                chat_messages.append(
+                    {
+                        "chat_id": row.id,
+                        "id": message_id,
+                        "parent_id": message.get("parentId"),
+                        "role": message.get("role"),
+                        "content": content if isinstance(content, str) else None,
+                        "data": message,
+                        "created_at": created_at,
+                        "updated_at": now,
+                    }
+                )
+
+        if chat_messages:
+            op.bulk_insert(chat_message_table, chat_messages)
+
+
+def downgrade():
+    op.drop_table("chat_message")
@@ -0,0 +1,33 @@
+"""Add message indexes
+
+Revision ID: e5f7a9b1c3d4
+Revises: d4e6f8a0b2c3
+Create Date: 2025-03-05 02:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e5f7a9b1c3d4"
+down_revision = "d4e6f8a0b2c3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "message_channel_id_created_at_idx", "message", ["channel_id", "created_at"]
+    )
+    op.create_index(
+        "message_parent_id_created_at_idx", "message", ["parent_id", "created_at"]
+    )
+    op.create_index(
+        "message_reaction_message_id_idx", "message_reaction", ["message_id"]
+    )
+
+
+def downgrade():
+    op.drop_index("message_reaction_message_id_idx", table_name="message_reaction")
+    op.drop_index("message_parent_id_created_at_idx", table_name="message")
+    op.drop_index("message_channel_id_created_at_idx", table_name="message")
@@ -0,0 +1,25 @@
+"""Add chat_message hash
+
+Revision ID: f6a8b0c2d4e5
+Revises: e5f7a9b1c3d4
+Create Date: 2025-03-06 01:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "f6a8b0c2d4e5"
+down_revision = "e5f7a9b1c3d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Left empty for existing rows, which are rewritten with their hash the next
+    # time their chat is saved
+    op.add_column("chat_message", sa.Column("hash", sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("chat_message", "hash")
@@ -0,0 +1,148 @@
+import logging
+from typing import Optional
+
+from open_webui.internal.db import Base
+from open_webui.env import SRC_LOG_LEVELS
+
+from sqlalchemy import Column, Index, PrimaryKeyConstraint, Text, and_, or_, select
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+# Principal of the read grant of resources without access control (public)
+PUBLIC_PRINCIPAL_ID = "*"
+
+####################
+# AccessGrant DB Schema
+####################
+
+
+class AccessGrant(Base):
+    __tablename__ = "access_grant"
+
+    # Queryable copy of the `access_control` column of knowledge bases, models,
+    # prompts and tools, one row per (resource, permission, user or group).
+    resource_type = Column(Text, nullable=False)
+    resource_id = Column(Text, nullable=False)
+    permission = Column(Text, nullable=False)  # "read" or "write"
+    principal_type = Column(Text, nullable=False)  # "user" or "group"
+    principal_id = Column(Text, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "resource_type",
+            "resource_id",
+            "permission",
+            "principal_type",
+            "principal_id",
+            name="pk_access_grant",
+        ),
+        Index(
+            "access_grant_principal_idx",
+            "resource_type",
+            "permission",
+            "principal_type",
+            "principal_id",
+        ),
+    )
+
+
+def get_access_grants(
+    resource_type: str, resource_id: str, access_control: Optional[dict]
+) -> list[dict]:
+    """
+    Derive the grant rows of a resource from its `access_control`, mirroring
+    `has_access`: `None` grants read access to everyone, `{}` only leaves the
+    owner, who is matched on the resource itself.
+    """
+    grants = []
+
+    if access_control is None:
+        grants.append(("read", "user", PUBLIC_PRINCIPAL_ID))
+    else:
+        for permission in ["read", "write"]:
+            permission_access = access_control.get(permission) or {}
+            for group_id in permission_access.get("group_ids") or []:
+                grants.append((permission, "group", group_id))
+            for user_id in permission_access.get("user_ids") or []:
+                grants.append((permission, "user", user_id))
+
+    return [
+        {
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "permission": permission,
+            "principal_type": principal_type,
+            "principal_id": principal_id,
+        }
+        for permission, principal_type, principal_id in dict.fromkeys(grants)
+    ]
+
+
+class AccessGrantTable:
+    """
+    The grants are written with the session of the resource they belong to and
+    left for its caller to commit, so a resource is never committed with stale
+    grants. Errors are raised to fail the whole change.
+    """
+
+    def set_access_grants(
+        self,
+        db,
+        resource_type: str,
+        resource_id: str,
+        access_control: Optional[dict],
+    ):
+        db.query(AccessGrant).filter_by(
+            resource_type=resource_type, resource_id=resource_id
+        ).delete()
+        db.add_all(
+            [
+                AccessGrant(**grant)
+                for grant in get_access_grants(
+                    resource_type, resource_id, access_control
+                )
+            ]
+        )
+        db.flush()
+
+    def delete_access_grants(
+        self, db, resource_type: str, resource_id: Optional[str] = None
+    ):
+        query = db.query(AccessGrant).filter_by(resource_type=resource_type)
+        if resource_id is not None:
+            query = query.filter_by(resource_id=resource_id)
+        query.delete()
+
+    def get_accessible_resource_ids_query(
+        self,
+        resource_type: str,
+        user_id: str,
+        permission: str,
+        user_group_ids: set[str],
+    ):
+        """
+        Subquery of the ids of the resources a user was granted `permission` on,
+        to be used as `Resource.id.in_(...)`. Ownership is not included.
+        """
+        principals = and_(
+            AccessGrant.principal_type == "user",
+            AccessGrant.principal_id.in_([user_id, PUBLIC_PRINCIPAL_ID]),
+        )
+        if user_group_ids:
+            principals = or_(
+                principals,
+                and_(
+                    AccessGrant.principal_type == "group",
+                    AccessGrant.principal_id.in_(list(user_group_ids)),
+                ),
+            )
+
+        return select(AccessGrant.resource_id).where(
+            AccessGrant.resource_type == resource_type,
+            AccessGrant.permission == permission,
+            principals,
+        )
+
+
+AccessGrants = AccessGrantTable()
@@ -1,16 +1,19 @@
+import hashlib
 import logging
 import json
 import time
 import uuid
-from typing import Optional
+from typing import Iterator, Optional
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import Base, get_db, get_async_db, sync_fallback
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
-from sqlalchemy import or_, func, select, and_, text
+from sqlalchemy import or_, func, select, and_, text, cast, update, literal
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql import exists
 
 ####################
@@ -59,6 +62,58 @@ class ChatModel(BaseModel):
     folder_id: Optional[str] = None
 
 
+class ChatMessage(Base):
+    __tablename__ = "chat_message"
+
+    # Normalized copy of `chat.chat["history"]["messages"]`, one row per message
+    chat_id = Column(Text, primary_key=True)
+    id = Column(Text, primary_key=True)
+    parent_id = Column(Text, nullable=True)
+
+    role = Column(Text, nullable=True)
+    content = Column(Text, nullable=True)
+    data = Column(JSON)
+    # sha256 of `data`, compared on chat saves instead of loading `data`
+    hash = Column(Text, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class ChatMessageModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    chat_id: str
+    id: str
+    parent_id: Optional[str] = None
+
+    role: Optional[str] = None
+    content: Optional[str] = None
+    data: dict
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+def get_chat_message_hash(message: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(message, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def get_chat_message_values(chat_id: str, message_id: str, message: dict) -> dict:
+    content = message.get("content")
+    return {
+        "chat_id": chat_id,
+        "id": message_id,
+        "parent_id": message.get("parentId"),
+        "role": message.get("role"),
+        "content": content if isinstance(content, str) else None,
+        "data": message,
+        "hash": get_chat_message_hash(message),
+    }
+
+
 ####################
 # Forms
 ####################
@@ -74,6 +129,16 @@ class ChatImportForm(ChatForm):
     folder_id: Optional[str] = None
 
 
+class ChatBulkImportForm(ChatImportForm):
+    # Fields of an exported chat that are kept, new ones are set when missing
+    id: Optional[str] = None
+    user_id: Optional[str] = None
+    title: Optional[str] = None
+    archived: Optional[bool] = False
+    created_at: Optional[int] = None
+    updated_at: Optional[int] = None
+
+
 class ChatTitleMessagesForm(BaseModel):
     title: str
     messages: list[dict]
@@ -105,6 +170,52 @@ class ChatTitleIdResponse(BaseModel):
 
 
 class ChatTable:
+    def sync_chat_messages(self, db, id: str, chat: dict, new: bool = False):
+        """
+        Mirror the message history of a chat into the `chat_message` table. Only
+        new, changed and removed messages are written, changes are found by
+        comparing the hashes of the messages so that the stored ones are not
+        loaded. With `new=True` the chat has no messages yet and they are not
+        looked up.
+        """
+        history = chat.get("history") or {}
+        messages = history.get("messages") or {}
+        if not isinstance(messages, dict):
+            messages = {}
+
+        existing = (
+            {}
+            if new
+            else dict(
+                db.query(ChatMessage.id, ChatMessage.hash).filter_by(chat_id=id).all()
+            )
+        )
+
+        now = int(time.time())
+        for message_id, message in messages.items():
+            if not isinstance(message, dict):
+                continue
+
+            values = get_chat_message_values(id, message_id, message)
+
+            if message_id not in existing:
+                db.add(
+                    ChatMessage(
+                        **values,
+                        created_at=int(message.get("timestamp") or now),
+                        updated_at=now,
+                    )
+                )
+            elif existing.pop(message_id) != values["hash"]:
+                db.query(ChatMessage).filter_by(chat_id=id, id=message_id).update(
+                    {**values, "updated_at": now}, synchronize_session=False
+                )
+
+        if existing:
+            db.query(ChatMessage).filter(
+                ChatMessage.chat_id == id, ChatMessage.id.in_(list(existing.keys()))
+            ).delete(synchronize_session=False)
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -125,6 +236,7 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            self.sync_chat_messages(db, id, form_data.chat)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
@@ -154,21 +266,102 @@ class ChatTable:
 
             result = Chat(**chat.model_dump())
             db.add(result)
+            self.sync_chat_messages(db, id, form_data.chat)
             db.commit()
             db.refresh(result)
             return ChatModel.model_validate(result) if result else None
 
+    def import_chats(self, forms: list[ChatBulkImportForm]) -> list[Optional[str]]:
+        """
+        Insert a batch of chats in a single transaction, keeping their ids and
+        timestamps when given. `user_id` must be set on every form.
+
+        Returns the error of each chat, None if it was imported. If the batch
+        fails as a whole, its chats are inserted one by one to find the faulty
+        ones.
+        """
+        now = int(time.time())
+        errors: list[Optional[str]] = [None] * len(forms)
+
+        chats = [
+            ChatModel(
+                **{
+                    "id": form.id or str(uuid.uuid4()),
+                    "user_id": form.user_id,
+                    "title": form.chat.get("title", form.title or "New Chat"),
+                    "chat": form.chat,
+                    "meta": form.meta or {},
+                    "archived": form.archived or False,
+                    "pinned": form.pinned,
+                    "folder_id": form.folder_id,
+                    "created_at": form.created_at or now,
+                    "updated_at": form.updated_at or form.created_at or now,
+                }
+            )
+            for form in forms
+        ]
+
+        with get_db() as db:
+            existing = {
+                id
+                for (id,) in db.query(Chat.id)
+                .filter(Chat.id.in_([chat.id for chat in chats]))
+                .all()
+            }
+
+            pending = []
+            for idx, chat in enumerate(chats):
+                if chat.id in existing:
+                    errors[idx] = f"Chat {chat.id} already exists"
+                    continue
+
+                existing.add(chat.id)
+                pending.append(idx)
+
+            try:
+                for idx in pending:
+                    db.add(Chat(**chats[idx].model_dump()))
+                    self.sync_chat_messages(db, chats[idx].id, chats[idx].chat, True)
+                db.commit()
+                return errors
+            except Exception as e:
+                log.debug(f"Importing the chats one by one: {e}")
+                db.rollback()
+
+        for idx in pending:
+            try:
+                with get_db() as db:
+                    db.add(Chat(**chats[idx].model_dump()))
+                    self.sync_chat_messages(db, chats[idx].id, chats[idx].chat, True)
+                    db.commit()
+            except Exception as e:
+                errors[idx] = str(e)
+
+        return errors
+
+    def update_chat(self, db, id: str, chat: dict) -> ChatModel:
+        chat_item = db.get(Chat, id)
+        chat_item.chat = chat
+        chat_item.title = chat["title"] if "title" in chat else "New Chat"
+        chat_item.updated_at = int(time.time())
+        self.sync_chat_messages(db, id, chat)
+        db.commit()
+        db.refresh(chat_item)
+
+        return ChatModel.model_validate(chat_item)
+
     def update_chat_by_id(self, id: str, chat: dict) -> Optional[ChatModel]:
         try:
             with get_db() as db:
-                chat_item = db.get(Chat, id)
-                chat_item.chat = chat
-                chat_item.title = chat["title"] if "title" in chat else "New Chat"
-                chat_item.updated_at = int(time.time())
-                db.commit()
-                db.refresh(chat_item)
+                return self.update_chat(db, id, chat)
+        except Exception:
+            return None
 
-                return ChatModel.model_validate(chat_item)
+    @sync_fallback(update_chat_by_id)
+    async def update_chat_by_id_async(self, id: str, chat: dict) -> Optional[ChatModel]:
+        try:
+            async with get_async_db() as db:
+                return await db.run_sync(lambda db: self.update_chat(db, id, chat))
         except Exception:
             return None
 
@@ -182,6 +375,18 @@ class ChatTable:
 
         return self.update_chat_by_id(id, chat)
 
+    async def update_chat_title_by_id_async(
+        self, id: str, title: str
+    ) -> Optional[ChatModel]:
+        chat = await self.get_chat_by_id_async(id)
+        if chat is None:
+            return None
+
+        chat = chat.chat
+        chat["title"] = title
+
+        return await self.update_chat_by_id_async(id, chat)
+
     def update_chat_tags_by_id(
         self, id: str, tags: list[str], user
     ) -> Optional[ChatModel]:
@@ -203,68 +408,243 @@ class ChatTable:
         return self.get_chat_by_id(id)
 
     def get_chat_title_by_id(self, id: str) -> Optional[str]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            chat = db.query(Chat.title).filter_by(id=id).first()
+            if chat is None:
+                return None
+
+            return chat.title or "New Chat"
+
+    @sync_fallback(get_chat_title_by_id)
+    async def get_chat_title_by_id_async(self, id: str) -> Optional[str]:
+        async with get_async_db() as db:
+            chat = (await db.execute(select(Chat.title).filter_by(id=id))).first()
+            if chat is None:
+                return None
 
-        return chat.chat.get("title", "New Chat")
+            return chat.title or "New Chat"
 
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            chat_messages = (
+                db.query(ChatMessage.id, ChatMessage.data).filter_by(chat_id=id).all()
+            )
 
-        return chat.chat.get("history", {}).get("messages", {}) or {}
+            if not chat_messages and db.query(Chat.id).filter_by(id=id).first() is None:
+                return None
+
+            return {
+                chat_message.id: chat_message.data for chat_message in chat_messages
+            }
 
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db() as db:
+            chat_message = db.get(ChatMessage, (id, message_id))
+            if chat_message is not None:
+                return chat_message.data
 
-        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+            if db.query(Chat.id).filter_by(id=id).first() is None:
+                return None
 
-    def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+            return {}
+
+    @sync_fallback(get_message_by_id_and_message_id)
+    async def get_message_by_id_and_message_id_async(
+        self, id: str, message_id: str
+    ) -> Optional[dict]:
+        async with get_async_db() as db:
+            chat_message = await db.get(ChatMessage, (id, message_id))
+            if chat_message is not None:
+                return chat_message.data
+
+            if await db.scalar(select(Chat.id).filter_by(id=id)) is None:
+                return None
+
+            return {}
+
+    def get_message_list(self, db, id: str, message_id: str) -> Optional[list[dict]]:
+        """
+        Return the branch of the conversation ending at `message_id`, ordered from
+        the root message, by following the parent pointers in the database.
+        """
+        path = (
+            select(
+                ChatMessage.id,
+                ChatMessage.parent_id,
+                literal(0).label("depth"),
+            )
+            .where(ChatMessage.chat_id == id, ChatMessage.id == message_id)
+            .cte("path", recursive=True)
+        )
+
+        parent = aliased(ChatMessage)
+        path = path.union_all(
+            select(parent.id, parent.parent_id, path.c.depth + 1).where(
+                parent.chat_id == id,
+                parent.id == path.c.parent_id,
+                # Guard against cycles in corrupted histories
+                path.c.depth < 10000,
+            )
+        )
+
+        chat_messages = (
+            db.query(ChatMessage.data)
+            .join(path, and_(ChatMessage.chat_id == id, ChatMessage.id == path.c.id))
+            .order_by(path.c.depth.desc())
+            .all()
+        )
+
+        if not chat_messages:
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        return [chat_message.data for chat_message in chat_messages]
 
-        if message_id in history.get("messages", {}):
+    def get_message_list_by_id_and_message_id(
+        self, id: str, message_id: str
+    ) -> Optional[list[dict]]:
+        with get_db() as db:
+            return self.get_message_list(db, id, message_id)
+
+    @sync_fallback(get_message_list_by_id_and_message_id)
+    async def get_message_list_by_id_and_message_id_async(
+        self, id: str, message_id: str
+    ) -> Optional[list[dict]]:
+        async with get_async_db() as db:
+            return await db.run_sync(
+                lambda db: self.get_message_list(db, id, message_id)
+            )
+
+    def upsert_message(
+        self, db, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        """
+        Merge `message` into a single message of the chat. The message row is read
+        from `chat_message` and the merged message is written into the chat JSON by
+        the database (SQLite and PostgreSQL), so the whole history is never loaded.
+        """
+        dialect_name = db.bind.dialect.name
+        if dialect_name not in ("sqlite", "postgresql"):
+            chat = db.get(Chat, id)
+            if chat is None:
+                return None
+
+            chat = chat.chat
+            history = chat.get("history", {})
             history["messages"][message_id] = {
-                **history["messages"][message_id],
+                **history["messages"].get(message_id, {}),
                 **message,
             }
+            history["currentId"] = message_id
+            chat["history"] = history
+
+            self.update_chat(db, id, chat)
+            chat_message = db.get(ChatMessage, (id, message_id))
+            return (
+                ChatMessageModel.model_validate(chat_message) if chat_message else None
+            )
+
+        chat_message = db.get(ChatMessage, (id, message_id))
+        message = {**chat_message.data, **message} if chat_message else message
+
+        if dialect_name == "sqlite":
+            chat_value = func.json_set(
+                Chat.chat,
+                f"$.history.messages.{json.dumps(message_id)}",
+                func.json(json.dumps(message)),
+                "$.history.currentId",
+                message_id,
+            )
         else:
-            history["messages"][message_id] = message
+            chat_value = cast(
+                func.jsonb_set(
+                    func.jsonb_set(
+                        cast(Chat.chat, JSONB),
+                        array(["history", "messages", message_id]),
+                        cast(message, JSONB),
+                    ),
+                    array(["history", "currentId"]),
+                    func.to_jsonb(cast(message_id, Text)),
+                ),
+                JSON,
+            )
 
-        history["currentId"] = message_id
+        now = int(time.time())
+        result = db.execute(
+            update(Chat).where(Chat.id == id).values(chat=chat_value, updated_at=now)
+        )
+        if result.rowcount == 0:
+            db.rollback()
+            return None
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+        values = get_chat_message_values(id, message_id, message)
+        if chat_message is None:
+            chat_message = ChatMessage(
+                **values,
+                created_at=int(message.get("timestamp") or now),
+                updated_at=now,
+            )
+            db.add(chat_message)
+        else:
+            for key, value in values.items():
+                setattr(chat_message, key, value)
+            chat_message.updated_at = now
+
+        db.commit()
+        db.refresh(chat_message)
+        return ChatMessageModel.model_validate(chat_message)
+
+    def upsert_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        try:
+            with get_db() as db:
+                return self.upsert_message(db, id, message_id, message)
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    @sync_fallback(upsert_message_to_chat_by_id_and_message_id)
+    async def upsert_message_to_chat_by_id_and_message_id_async(
+        self, id: str, message_id: str, message: dict
+    ) -> Optional[ChatMessageModel]:
+        try:
+            async with get_async_db() as db:
+                return await db.run_sync(
+                    lambda db: self.upsert_message(db, id, message_id, message)
+                )
+        except Exception as e:
+            log.exception(e)
+            return None
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
-    ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
+    ) -> Optional[ChatMessageModel]:
+        message = self.get_message_by_id_and_message_id(id, message_id)
+        if not message:
             return None
 
-        chat = chat.chat
-        history = chat.get("history", {})
+        status_history = message.get("statusHistory", [])
+        status_history.append(status)
 
-        if message_id in history.get("messages", {}):
-            status_history = history["messages"][message_id].get("statusHistory", [])
-            status_history.append(status)
-            history["messages"][message_id]["statusHistory"] = status_history
+        return self.upsert_message_to_chat_by_id_and_message_id(
+            id, message_id, {"statusHistory": status_history}
+        )
 
-        chat["history"] = history
-        return self.update_chat_by_id(id, chat)
+    async def add_message_status_to_chat_by_id_and_message_id_async(
+        self, id: str, message_id: str, status: dict
+    ) -> Optional[ChatMessageModel]:
+        message = await self.get_message_by_id_and_message_id_async(id, message_id)
+        if not message:
+            return None
+
+        status_history = message.get("statusHistory", [])
+        status_history.append(status)
+
+        return await self.upsert_message_to_chat_by_id_and_message_id_async(
+            id, message_id, {"statusHistory": status_history}
+        )
 
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
@@ -286,6 +666,7 @@ class ChatTable:
             )
             shared_result = Chat(**shared_chat.model_dump())
             db.add(shared_result)
+            self.sync_chat_messages(db, shared_chat.id, shared_chat.chat)
             db.commit()
             db.refresh(shared_result)
 
@@ -311,6 +692,7 @@ class ChatTable:
 
                 shared_chat.title = chat.title
                 shared_chat.chat = chat.chat
+                self.sync_chat_messages(db, shared_chat.id, chat.chat)
 
                 shared_chat.updated_at = int(time.time())
                 db.commit()
@@ -323,6 +705,11 @@ class ChatTable:
     def delete_shared_chat_by_chat_id(self, chat_id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == f"shared-{chat_id}")
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
@@ -470,6 +857,15 @@ class ChatTable:
         except Exception:
             return None
 
+    @sync_fallback(get_chat_by_id)
+    async def get_chat_by_id_async(self, id: str) -> Optional[ChatModel]:
+        try:
+            async with get_async_db() as db:
+                chat = await db.get(Chat, id)
+                return ChatModel.model_validate(chat)
+        except Exception:
+            return None
+
     def get_chat_by_share_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
@@ -501,6 +897,21 @@ class ChatTable:
             )
             return [ChatModel.model_validate(chat) for chat in all_chats]
 
+    def iter_chats(
+        self, user_id: Optional[str] = None, batch_size: int = 100
+    ) -> Iterator[ChatModel]:
+        """
+        Iterate over all chats, or those of a user, fetching `batch_size` rows at
+        a time through a server-side cursor instead of loading them all.
+        """
+        with get_db() as db:
+            query = db.query(Chat)
+            if user_id is not None:
+                query = query.filter_by(user_id=user_id)
+
+            for chat in query.order_by(Chat.updated_at.desc()).yield_per(batch_size):
+                yield ChatModel.model_validate(chat)
+
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
             all_chats = (
@@ -854,6 +1265,7 @@ class ChatTable:
     def delete_chat_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -864,7 +1276,8 @@ class ChatTable:
     def delete_chat_by_id_and_user_id(self, id: str, user_id: str) -> bool:
         try:
             with get_db() as db:
-                db.query(Chat).filter_by(id=id, user_id=user_id).delete()
+                if db.query(Chat).filter_by(id=id, user_id=user_id).delete():
+                    db.query(ChatMessage).filter_by(chat_id=id).delete()
                 db.commit()
 
                 return True and self.delete_shared_chat_by_chat_id(id)
@@ -876,6 +1289,11 @@ class ChatTable:
             with get_db() as db:
                 self.delete_shared_chats_by_user_id(user_id)
 
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id == user_id)
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -888,6 +1306,13 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db() as db:
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(
+                            Chat.user_id == user_id, Chat.folder_id == folder_id
+                        )
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -901,6 +1326,11 @@ class ChatTable:
                 chats_by_user = db.query(Chat).filter_by(user_id=user_id).all()
                 shared_chat_ids = [f"shared-{chat.id}" for chat in chats_by_user]
 
+                db.query(ChatMessage).filter(
+                    ChatMessage.chat_id.in_(
+                        select(Chat.id).where(Chat.user_id.in_(shared_chat_ids))
+                    )
+                ).delete(synchronize_session=False)
                 db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
                 db.commit()
 
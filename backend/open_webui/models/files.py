@@ -2,7 +2,7 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import Base, JSONField, get_db, get_async_db, sync_fallback
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
@@ -130,6 +130,15 @@ class FilesTable:
             except Exception:
                 return None
 
+    @sync_fallback(get_file_by_id)
+    async def get_file_by_id_async(self, id: str) -> Optional[FileModel]:
+        async with get_async_db() as db:
+            try:
+                file = await db.get(File, id)
+                return FileModel.model_validate(file)
+            except Exception:
+                return None
+
     def get_file_metadata_by_id(self, id: str) -> Optional[FileMetadataResponse]:
         with get_db() as db:
             try:
@@ -143,6 +152,22 @@ class FilesTable:
             except Exception:
                 return None
 
+    @sync_fallback(get_file_metadata_by_id)
+    async def get_file_metadata_by_id_async(
+        self, id: str
+    ) -> Optional[FileMetadataResponse]:
+        async with get_async_db() as db:
+            try:
+                file = await db.get(File, id)
+                return FileMetadataResponse(
+                    id=file.id,
+                    meta=file.meta,
+                    created_at=file.created_at,
+                    updated_at=file.updated_at,
+                )
+            except Exception:
+                return None
+
     def get_files(self) -> list[FileModel]:
         with get_db() as db:
             return [FileModel.model_validate(file) for file in db.query(File).all()]
@@ -5,13 +5,13 @@ from typing import Optional
 import uuid
 
 from open_webui.internal.db import Base, get_db
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import ACCESS_CONTROL_CACHE_TTL, SRC_LOG_LEVELS
 
 from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Index, PrimaryKeyConstraint, Text, JSON
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,19 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    group_id = Column(Text, nullable=False)
+    user_id = Column(Text, nullable=False)
+    created_at = Column(BigInteger)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("group_id", "user_id", name="pk_group_id_user_id"),
+        Index("group_member_user_id_idx", "user_id"),
+    )
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +101,21 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    def __init__(self):
+        # user_id -> (expires_at, group ids)
+        self.member_cache: dict[str, tuple[float, set[str]]] = {}
+
+    def set_group_members(self, db, id: str, user_ids: list[str]):
+        # `group.user_ids` is kept for API responses, `group_member` is the
+        # indexed copy used to look up the groups of a user
+        db.query(GroupMember).filter_by(group_id=id).delete()
+        db.add_all(
+            [
+                GroupMember(group_id=id, user_id=user_id, created_at=int(time.time()))
+                for user_id in dict.fromkeys(user_ids)
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,7 +133,9 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self.set_group_members(db, group.id, group.user_ids)
                 db.commit()
+                self.member_cache.clear()
                 db.refresh(result)
                 if result:
                     return GroupModel.model_validate(result)
@@ -127,16 +157,31 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> set[str]:
+        cached = self.member_cache.get(user_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        with get_db() as db:
+            group_ids = {
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id)
+                .filter_by(user_id=user_id)
+                .all()
+            }
+
+        self.member_cache[user_id] = (
+            time.monotonic() + ACCESS_CONTROL_CACHE_TTL,
+            group_ids,
+        )
+        return group_ids
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -163,7 +208,10 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self.set_group_members(db, id, form_data.user_ids)
                 db.commit()
+                self.member_cache.clear()
                 return self.get_group_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -173,7 +221,9 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
+                self.member_cache.clear()
                 return True
         except Exception:
             return False
@@ -182,7 +232,9 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
+                self.member_cache.clear()
 
                 return True
             except Exception:
@@ -203,6 +255,9 @@ class GroupTable:
                     )
                     db.commit()
 
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
+                self.member_cache.pop(user_id, None)
                 return True
             except Exception:
                 return False
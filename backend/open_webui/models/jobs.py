@@ -0,0 +1,173 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, String, Text, JSON
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Jobs DB Schema
+####################
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(String)
+
+    type = Column(Text)
+    # pending, processing, completed or failed
+    status = Column(Text)
+
+    data = Column(JSON, nullable=True)
+    progress = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
+class JobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: str
+
+    type: str
+    status: str
+
+    data: Optional[dict] = None
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+####################
+# Forms
+####################
+
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str
+
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+class JobsTable:
+    def insert_new_job(self, user_id: str, type: str, data: dict) -> Optional[JobModel]:
+        with get_db() as db:
+            job = JobModel(
+                **{
+                    "id": str(uuid.uuid4()),
+                    "user_id": user_id,
+                    "type": type,
+                    "status": "pending",
+                    "data": data,
+                    "created_at": int(time.time()),
+                    "updated_at": int(time.time()),
+                }
+            )
+
+            try:
+                result = Job(**job.model_dump())
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return JobModel.model_validate(result) if result else None
+            except Exception as e:
+                log.exception(f"Error inserting a new job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[JobModel]:
+        with get_db() as db:
+            try:
+                job = db.get(Job, id)
+                return JobModel.model_validate(job)
+            except Exception:
+                return None
+
+    def get_jobs_by_user_id(
+        self, user_id: str, skip: int = 0, limit: int = 50
+    ) -> list[JobModel]:
+        with get_db() as db:
+            return [
+                JobModel.model_validate(job)
+                for job in db.query(Job)
+                .filter_by(user_id=user_id)
+                .order_by(Job.created_at.desc())
+                .offset(skip)
+                .limit(limit)
+                .all()
+            ]
+
+    def get_resumable_jobs(self, stale_before: int) -> list[JobModel]:
+        """
+        Jobs that are still pending, or whose worker stopped updating them before
+        `stale_before`, e.g. because the server was restarted.
+        """
+        with get_db() as db:
+            return [
+                JobModel.model_validate(job)
+                for job in db.query(Job)
+                .filter(
+                    (Job.status == "pending")
+                    | ((Job.status == "processing") & (Job.updated_at < stale_before))
+                )
+                .order_by(Job.created_at)
+                .all()
+            ]
+
+    def claim_job_by_id(self, id: str, stale_before: int) -> bool:
+        """
+        Atomically mark a job as processing, so that a job is only picked up by
+        a single worker across instances.
+        """
+        with get_db() as db:
+            claimed = (
+                db.query(Job)
+                .filter(Job.id == id)
+                .filter(
+                    (Job.status == "pending")
+                    | ((Job.status == "processing") & (Job.updated_at < stale_before))
+                )
+                .update(
+                    {"status": "processing", "updated_at": int(time.time())},
+                    synchronize_session=False,
+                )
+            )
+            db.commit()
+            return claimed == 1
+
+    def update_job_by_id(self, id: str, **fields) -> Optional[JobModel]:
+        with get_db() as db:
+            try:
+                job = db.get(Job, id)
+                for key, value in fields.items():
+                    setattr(job, key, value)
+                job.updated_at = int(time.time())
+                db.commit()
+                db.refresh(job)
+                return JobModel.model_validate(job)
+            except Exception:
+                return None
+
+
+Jobs = JobsTable()
@@ -12,9 +12,10 @@ from open_webui.models.users import Users, UserResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, or_
 
-from open_webui.utils.access_control import has_access
+from open_webui.models.access_grants import AccessGrants
+from open_webui.utils.access_control import get_user_group_ids
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -117,6 +118,9 @@ class KnowledgeTable:
             try:
                 result = Knowledge(**knowledge.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "knowledge", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -126,32 +130,62 @@ class KnowledgeTable:
             except Exception:
                 return None
 
-    def get_knowledge_bases(self) -> list[KnowledgeUserModel]:
+    def get_knowledge_bases(
+        self, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[KnowledgeUserModel]:
         with get_db() as db:
-            knowledge_bases = []
-            for knowledge in (
-                db.query(Knowledge).order_by(Knowledge.updated_at.desc()).all()
-            ):
-                user = Users.get_user_by_id(knowledge.user_id)
-                knowledge_bases.append(
-                    KnowledgeUserModel.model_validate(
-                        {
-                            **KnowledgeModel.model_validate(knowledge).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
-                )
-            return knowledge_bases
+            return self.get_knowledge_bases_by_query(db.query(Knowledge), skip, limit)
 
     def get_knowledge_bases_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[KnowledgeUserModel]:
+        user_group_ids = get_user_group_ids(user_id)
+        with get_db() as db:
+            query = db.query(Knowledge).filter(
+                or_(
+                    Knowledge.user_id == user_id,
+                    Knowledge.id.in_(
+                        AccessGrants.get_accessible_resource_ids_query(
+                            "knowledge", user_id, permission, user_group_ids
+                        )
+                    ),
+                )
+            )
+            return self.get_knowledge_bases_by_query(query, skip, limit)
+
+    def get_knowledge_bases_by_query(
+        self, query, skip: Optional[int] = None, limit: Optional[int] = None
     ) -> list[KnowledgeUserModel]:
-        knowledge_bases = self.get_knowledge_bases()
+        query = query.order_by(Knowledge.updated_at.desc())
+        if skip:
+            query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        knowledge_bases = query.all()
+        users = {
+            user.id: user
+            for user in Users.get_users_by_user_ids(
+                list({knowledge.user_id for knowledge in knowledge_bases})
+            )
+        }
+
         return [
-            knowledge_base
-            for knowledge_base in knowledge_bases
-            if knowledge_base.user_id == user_id
-            or has_access(user_id, permission, knowledge_base.access_control)
+            KnowledgeUserModel.model_validate(
+                {
+                    **KnowledgeModel.model_validate(knowledge).model_dump(),
+                    "user": (
+                        users[knowledge.user_id].model_dump()
+                        if knowledge.user_id in users
+                        else None
+                    ),
+                }
+            )
+            for knowledge in knowledge_bases
         ]
 
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
@@ -174,6 +208,9 @@ class KnowledgeTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                AccessGrants.set_access_grants(
+                    db, "knowledge", id, form_data.access_control
+                )
                 db.commit()
                 return self.get_knowledge_by_id(id=id)
         except Exception as e:
@@ -198,10 +235,40 @@ class KnowledgeTable:
             log.exception(e)
             return None
 
+    def add_file_id_to_knowledge_by_id(
+        self, id: str, file_id: str
+    ) -> Optional[KnowledgeModel]:
+        """
+        Add a file id to `data["file_ids"]` of a knowledge base in one
+        transaction, as jobs of other workers may add files to it concurrently.
+        """
+        try:
+            with get_db() as db:
+                # Writing the row first locks it until commit (the whole database
+                # with SQLite), so that the file ids read below are up to date
+                if (
+                    not db.query(Knowledge)
+                    .filter_by(id=id)
+                    .update({"updated_at": int(time.time())})
+                ):
+                    return None
+
+                knowledge = db.query(Knowledge).filter_by(id=id).first()
+                data = knowledge.data or {}
+                file_ids = data.get("file_ids", [])
+                if file_id not in file_ids:
+                    knowledge.data = {**data, "file_ids": file_ids + [file_id]}
+                db.commit()
+                return KnowledgeModel.model_validate(knowledge)
+        except Exception as e:
+            log.exception(e)
+            return None
+
     def delete_knowledge_by_id(self, id: str) -> bool:
         try:
             with get_db() as db:
                 db.query(Knowledge).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "knowledge", id)
                 db.commit()
                 return True
         except Exception:
@@ -211,6 +278,7 @@ class KnowledgeTable:
         with get_db() as db:
             try:
                 db.query(Knowledge).delete()
+                AccessGrants.delete_access_grants(db, "knowledge")
                 db.commit()
 
                 return True
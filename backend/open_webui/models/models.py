@@ -2,7 +2,13 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    sync_fallback,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.models.users import Users, UserResponse
@@ -15,7 +21,8 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
-from open_webui.utils.access_control import has_access
+from open_webui.models.access_grants import AccessGrants
+from open_webui.utils.access_control import get_user_group_ids
 
 
 log = logging.getLogger(__name__)
@@ -158,6 +165,9 @@ class ModelsTable:
             with get_db() as db:
                 result = Model(**model.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "model", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
 
@@ -173,20 +183,11 @@ class ModelsTable:
         with get_db() as db:
             return [ModelModel.model_validate(model) for model in db.query(Model).all()]
 
-    def get_models(self) -> list[ModelUserResponse]:
+    def get_models(
+        self, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[ModelUserResponse]:
         with get_db() as db:
-            models = []
-            for model in db.query(Model).filter(Model.base_model_id != None).all():
-                user = Users.get_user_by_id(model.user_id)
-                models.append(
-                    ModelUserResponse.model_validate(
-                        {
-                            **ModelModel.model_validate(model).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
-                )
-            return models
+            return self.get_models_by_query(db.query(Model), skip, limit)
 
     def get_base_models(self) -> list[ModelModel]:
         with get_db() as db:
@@ -196,16 +197,67 @@ class ModelsTable:
             ]
 
     def get_models_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
     ) -> list[ModelUserResponse]:
-        models = self.get_models()
+        user_group_ids = get_user_group_ids(user_id)
+        with get_db() as db:
+            query = db.query(Model).filter(
+                or_(
+                    Model.user_id == user_id,
+                    Model.id.in_(
+                        AccessGrants.get_accessible_resource_ids_query(
+                            "model", user_id, permission, user_group_ids
+                        )
+                    ),
+                )
+            )
+            return self.get_models_by_query(query, skip, limit)
+
+    def get_models_by_query(
+        self, query, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[ModelUserResponse]:
+        query = query.filter(Model.base_model_id != None).order_by(
+            Model.updated_at.desc()
+        )
+        if skip:
+            query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        models = query.all()
+        users = {
+            user.id: user
+            for user in Users.get_users_by_user_ids(
+                list({model.user_id for model in models})
+            )
+        }
+
         return [
-            model
+            ModelUserResponse.model_validate(
+                {
+                    **ModelModel.model_validate(model).model_dump(),
+                    "user": (
+                        users[model.user_id].model_dump()
+                        if model.user_id in users
+                        else None
+                    ),
+                }
+            )
             for model in models
-            if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control)
         ]
 
+    def get_models_updated_at(self) -> tuple[int, int]:
+        # Number of models and latest update, to detect changes with one query
+        with get_db() as db:
+            count, updated_at = db.query(
+                func.count(Model.id), func.max(Model.updated_at)
+            ).one()
+            return count, updated_at or 0
+
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
         try:
             with get_db() as db:
@@ -214,6 +266,15 @@ class ModelsTable:
         except Exception:
             return None
 
+    @sync_fallback(get_model_by_id)
+    async def get_model_by_id_async(self, id: str) -> Optional[ModelModel]:
+        try:
+            async with get_async_db() as db:
+                model = await db.get(Model, id)
+                return ModelModel.model_validate(model)
+        except Exception:
+            return None
+
     def toggle_model_by_id(self, id: str) -> Optional[ModelModel]:
         with get_db() as db:
             try:
@@ -238,8 +299,14 @@ class ModelsTable:
                 result = (
                     db.query(Model)
                     .filter_by(id=id)
-                    .update(model.model_dump(exclude={"id"}))
+                    .update(
+                        {
+                            **model.model_dump(exclude={"id"}),
+                            "updated_at": int(time.time()),
+                        }
+                    )
                 )
+                AccessGrants.set_access_grants(db, "model", id, model.access_control)
                 db.commit()
 
                 model = db.get(Model, id)
@@ -253,6 +320,7 @@ class ModelsTable:
         try:
             with get_db() as db:
                 db.query(Model).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "model", id)
                 db.commit()
 
                 return True
@@ -263,6 +331,7 @@ class ModelsTable:
         try:
             with get_db() as db:
                 db.query(Model).delete()
+                AccessGrants.delete_access_grants(db, "model")
                 db.commit()
 
                 return True
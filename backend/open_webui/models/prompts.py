@@ -5,9 +5,10 @@ from open_webui.internal.db import Base, get_db
 from open_webui.models.users import Users, UserResponse
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, or_
 
-from open_webui.utils.access_control import has_access
+from open_webui.models.access_grants import AccessGrants
+from open_webui.utils.access_control import get_user_group_ids
 
 ####################
 # Prompts DB Schema
@@ -84,6 +85,9 @@ class PromptsTable:
             with get_db() as db:
                 result = Prompt(**prompt.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "prompt", result.command, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -101,33 +105,62 @@ class PromptsTable:
         except Exception:
             return None
 
-    def get_prompts(self) -> list[PromptUserResponse]:
+    def get_prompts(
+        self, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[PromptUserResponse]:
         with get_db() as db:
-            prompts = []
-
-            for prompt in db.query(Prompt).order_by(Prompt.timestamp.desc()).all():
-                user = Users.get_user_by_id(prompt.user_id)
-                prompts.append(
-                    PromptUserResponse.model_validate(
-                        {
-                            **PromptModel.model_validate(prompt).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
-                )
-
-            return prompts
+            return self.get_prompts_by_query(db.query(Prompt), skip, limit)
 
     def get_prompts_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
     ) -> list[PromptUserResponse]:
-        prompts = self.get_prompts()
+        user_group_ids = get_user_group_ids(user_id)
+        with get_db() as db:
+            query = db.query(Prompt).filter(
+                or_(
+                    Prompt.user_id == user_id,
+                    Prompt.command.in_(
+                        AccessGrants.get_accessible_resource_ids_query(
+                            "prompt", user_id, permission, user_group_ids
+                        )
+                    ),
+                )
+            )
+            return self.get_prompts_by_query(query, skip, limit)
+
+    def get_prompts_by_query(
+        self, query, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[PromptUserResponse]:
+        query = query.order_by(Prompt.timestamp.desc())
+        if skip:
+            query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        prompts = query.all()
+        users = {
+            user.id: user
+            for user in Users.get_users_by_user_ids(
+                list({prompt.user_id for prompt in prompts})
+            )
+        }
 
         return [
-            prompt
+            PromptUserResponse.model_validate(
+                {
+                    **PromptModel.model_validate(prompt).model_dump(),
+                    "user": (
+                        users[prompt.user_id].model_dump()
+                        if prompt.user_id in users
+                        else None
+                    ),
+                }
+            )
             for prompt in prompts
-            if prompt.user_id == user_id
-            or has_access(user_id, permission, prompt.access_control)
         ]
 
     def update_prompt_by_command(
@@ -140,6 +173,9 @@ class PromptsTable:
                 prompt.content = form_data.content
                 prompt.access_control = form_data.access_control
                 prompt.timestamp = int(time.time())
+                AccessGrants.set_access_grants(
+                    db, "prompt", command, form_data.access_control
+                )
                 db.commit()
                 return PromptModel.model_validate(prompt)
         except Exception:
@@ -149,6 +185,7 @@ class PromptsTable:
         try:
             with get_db() as db:
                 db.query(Prompt).filter_by(command=command).delete()
+                AccessGrants.delete_access_grants(db, "prompt", command)
                 db.commit()
 
                 return True
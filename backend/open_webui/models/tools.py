@@ -6,9 +6,10 @@ from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.models.users import Users, UserResponse
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, or_
 
-from open_webui.utils.access_control import has_access
+from open_webui.models.access_grants import AccessGrants
+from open_webui.utils.access_control import get_user_group_ids
 
 
 log = logging.getLogger(__name__)
@@ -124,6 +125,9 @@ class ToolsTable:
             try:
                 result = Tool(**tool.model_dump())
                 db.add(result)
+                AccessGrants.set_access_grants(
+                    db, "tool", result.id, result.access_control
+                )
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -142,31 +146,62 @@ class ToolsTable:
         except Exception:
             return None
 
-    def get_tools(self) -> list[ToolUserModel]:
+    def get_tools(
+        self, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[ToolUserModel]:
         with get_db() as db:
-            tools = []
-            for tool in db.query(Tool).order_by(Tool.updated_at.desc()).all():
-                user = Users.get_user_by_id(tool.user_id)
-                tools.append(
-                    ToolUserModel.model_validate(
-                        {
-                            **ToolModel.model_validate(tool).model_dump(),
-                            "user": user.model_dump() if user else None,
-                        }
-                    )
-                )
-            return tools
+            return self.get_tools_by_query(db.query(Tool), skip, limit)
 
     def get_tools_by_user_id(
-        self, user_id: str, permission: str = "write"
+        self,
+        user_id: str,
+        permission: str = "write",
+        skip: Optional[int] = None,
+        limit: Optional[int] = None,
     ) -> list[ToolUserModel]:
-        tools = self.get_tools()
+        user_group_ids = get_user_group_ids(user_id)
+        with get_db() as db:
+            query = db.query(Tool).filter(
+                or_(
+                    Tool.user_id == user_id,
+                    Tool.id.in_(
+                        AccessGrants.get_accessible_resource_ids_query(
+                            "tool", user_id, permission, user_group_ids
+                        )
+                    ),
+                )
+            )
+            return self.get_tools_by_query(query, skip, limit)
+
+    def get_tools_by_query(
+        self, query, skip: Optional[int] = None, limit: Optional[int] = None
+    ) -> list[ToolUserModel]:
+        query = query.order_by(Tool.updated_at.desc())
+        if skip:
+            query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        tools = query.all()
+        users = {
+            user.id: user
+            for user in Users.get_users_by_user_ids(
+                list({tool.user_id for tool in tools})
+            )
+        }
 
         return [
-            tool
+            ToolUserModel.model_validate(
+                {
+                    **ToolModel.model_validate(tool).model_dump(),
+                    "user": (
+                        users[tool.user_id].model_dump()
+                        if tool.user_id in users
+                        else None
+                    ),
+                }
+            )
             for tool in tools
-            if tool.user_id == user_id
-            or has_access(user_id, permission, tool.access_control)
         ]
 
     def get_tool_valves_by_id(self, id: str) -> Optional[dict]:
@@ -240,6 +275,10 @@ class ToolsTable:
                 db.query(Tool).filter_by(id=id).update(
                     {**updated, "updated_at": int(time.time())}
                 )
+                if "access_control" in updated:
+                    AccessGrants.set_access_grants(
+                        db, "tool", id, updated["access_control"]
+                    )
                 db.commit()
 
                 tool = db.query(Tool).get(id)
@@ -252,6 +291,7 @@ class ToolsTable:
         try:
             with get_db() as db:
                 db.query(Tool).filter_by(id=id).delete()
+                AccessGrants.delete_access_grants(db, "tool", id)
                 db.commit()
 
                 return True
@@ -1,7 +1,8 @@
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.env import AUTH_USER_CACHE_TTL
+from open_webui.internal.db import Base, JSONField, get_db, get_async_db, sync_fallback
 
 
 from open_webui.models.chats import Chats
@@ -9,7 +10,7 @@ from open_webui.models.groups import Groups
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text
+from sqlalchemy import BigInteger, Column, String, Text, case, select
 
 ####################
 # User DB Schema
@@ -95,6 +96,33 @@ class UserUpdateForm(BaseModel):
 
 
 class UsersTable:
+    def __init__(self):
+        # Hash of a token or API key -> (expires_at, user), see `get_cached_user`
+        self.principal_cache: dict[str, tuple[float, UserModel]] = {}
+
+    def get_cached_user(self, key: str) -> Optional[UserModel]:
+        cached = self.principal_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def cache_user(self, key: str, user: UserModel, ttl: float = AUTH_USER_CACHE_TTL):
+        if ttl <= 0:
+            return
+
+        now = time.monotonic()
+        if len(self.principal_cache) >= 10000:
+            for k, (expires_at, _) in list(self.principal_cache.items()):
+                if expires_at <= now:
+                    self.principal_cache.pop(k, None)
+
+        self.principal_cache[key] = (now + ttl, user)
+
+    def invalidate_cached_user(self, id: str):
+        for k, (_, user) in list(self.principal_cache.items()):
+            if user.id == id:
+                self.principal_cache.pop(k, None)
+
     def insert_new_user(
         self,
         id: str,
@@ -135,6 +163,15 @@ class UsersTable:
         except Exception:
             return None
 
+    @sync_fallback(get_user_by_id)
+    async def get_user_by_id_async(self, id: str) -> Optional[UserModel]:
+        try:
+            async with get_async_db() as db:
+                user = await db.get(User, id)
+                return UserModel.model_validate(user)
+        except Exception:
+            return None
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -143,6 +180,15 @@ class UsersTable:
         except Exception:
             return None
 
+    @sync_fallback(get_user_by_api_key)
+    async def get_user_by_api_key_async(self, api_key: str) -> Optional[UserModel]:
+        try:
+            async with get_async_db() as db:
+                user = await db.scalar(select(User).filter_by(api_key=api_key))
+                return UserModel.model_validate(user)
+        except Exception:
+            return None
+
     def get_user_by_email(self, email: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -213,6 +259,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                self.invalidate_cached_user(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -227,6 +274,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -246,6 +294,26 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_users_last_active(self, last_active: dict[str, int]) -> bool:
+        """
+        Set the last activity of many users at once, with one UPDATE per batch
+        of users instead of one per user.
+        """
+        ids = list(last_active.keys())
+        try:
+            with get_db() as db:
+                # Batched to stay within the bound parameters limit of SQLite
+                for i in range(0, len(ids), 300):
+                    batch = {id: last_active[id] for id in ids[i : i + 300]}
+                    db.query(User).filter(User.id.in_(list(batch.keys()))).update(
+                        {"last_active_at": case(batch, value=User.id)},
+                        synchronize_session=False,
+                    )
+                db.commit()
+                return True
+        except Exception:
+            return False
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -253,6 +321,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -264,6 +333,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -283,6 +353,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                self.invalidate_cached_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -301,6 +372,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    self.invalidate_cached_user(id)
 
                 return True
             else:
@@ -313,6 +385,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                self.invalidate_cached_user(id)
                 return True if result == 1 else False
         except Exception:
             return False
@@ -0,0 +1,91 @@
+import logging
+import time
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from sqlalchemy import BigInteger, Column, String
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# VectorCollection DB Schema
+####################
+
+
+class VectorCollection(Base):
+    __tablename__ = "vector_collection"
+
+    name = Column(String, primary_key=True)
+    # Incremented whenever the content of the collection changes
+    generation = Column(BigInteger, nullable=False)
+
+    updated_at = Column(BigInteger)
+
+
+class VectorCollectionsTable:
+    """
+    Generations of the vector database collections, shared by all instances so
+    that data derived from a collection on one instance (e.g. its sparse index)
+    can tell whether the collection was changed by another one.
+    """
+
+    def get_generation(self, name: str) -> int:
+        with get_db() as db:
+            generation = (
+                db.query(VectorCollection.generation).filter_by(name=name).scalar()
+            )
+            return generation or 0
+
+    def increment_generation(self, name: str) -> int:
+        """Increment the generation of a collection and return the new value."""
+        for _ in range(2):
+            with get_db() as db:
+                try:
+                    # The row stays locked until commit, so increments never interleave
+                    updated = (
+                        db.query(VectorCollection)
+                        .filter_by(name=name)
+                        .update(
+                            {
+                                "generation": VectorCollection.generation + 1,
+                                "updated_at": int(time.time()),
+                            },
+                            synchronize_session=False,
+                        )
+                    )
+                    if not updated:
+                        db.add(
+                            VectorCollection(
+                                name=name, generation=1, updated_at=int(time.time())
+                            )
+                        )
+                        db.flush()
+
+                    generation = (
+                        db.query(VectorCollection.generation)
+                        .filter_by(name=name)
+                        .scalar()
+                    )
+                    db.commit()
+                    return generation
+                except IntegrityError:
+                    # Created concurrently by another instance, increment it instead
+                    db.rollback()
+
+        raise RuntimeError(f"Unable to increment the generation of {name}")
+
+    def increment_all_generations(self):
+        with get_db() as db:
+            db.query(VectorCollection).update(
+                {
+                    "generation": VectorCollection.generation + 1,
+                    "updated_at": int(time.time()),
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+
+
+VectorCollections = VectorCollectionsTable()
@@ -0,0 +1,213 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import closing
+from typing import Optional
+
+from open_webui.config import (
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_DIR,
+    RAG_EMBEDDING_CACHE_SIZE,
+    RAG_EMBEDDING_CACHE_DISK_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Version of the on-disk format, older caches are discarded
+SCHEMA_VERSION = 1
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings keyed by (engine, model, text).
+
+    Recently used embeddings are kept as float32 arrays in an in-memory LRU of
+    `max_size` entries, about a quarter of the size of lists of floats, and up to `max_disk_size` are persisted as float32 in an SQLite database
+    under `path` so that the same content indexed into another collection, or
+    the same query repeated, does not hit the embedding model again, even across
+    restarts. The disk tier evicts the embeddings that were least recently read
+    from or written to it once it grows 10% past its size.
+    """
+
+    def __init__(self, path: Optional[str], max_size: int, max_disk_size: int = 0):
+        self.max_size = max_size
+        self.memory: OrderedDict[str, array] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.max_disk_size = max_disk_size
+        self.disk_writes = 0
+
+        self.file_path = None
+        if path and max_disk_size > 0:
+            try:
+                os.makedirs(path, exist_ok=True)
+                self.file_path = os.path.join(path, "embeddings.db")
+                with closing(self.connect()) as conn, conn:
+                    (version,) = conn.execute("PRAGMA user_version").fetchone()
+                    if version != SCHEMA_VERSION:
+                        conn.execute("DROP TABLE IF EXISTS embedding")
+                        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS embedding (key TEXT PRIMARY KEY, "
+                        "vector BLOB NOT NULL, accessed_at INTEGER NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE INDEX IF NOT EXISTS embedding_accessed_at "
+                        "ON embedding (accessed_at)"
+                    )
+            except (OSError, sqlite3.Error) as e:
+                log.warning(f"Embedding cache is memory only: {e}")
+                self.file_path = None
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.file_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def get_key(engine: str, model: str, text: str) -> str:
+        return hashlib.sha256(f"{engine}\0{model}\0{text}".encode()).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self.lock:
+            for key in keys:
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    found[key] = self.memory[key].tolist()
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if missing and self.file_path:
+            loaded = {}
+            try:
+                with closing(self.connect()) as conn:
+                    # Stay well below the SQLite host parameter limit
+                    for idx in range(0, len(missing), 500):
+                        batch = missing[idx : idx + 500]
+                        rows = conn.execute(
+                            "SELECT key, vector FROM embedding WHERE key IN "
+                            f"({', '.join('?' for _ in batch)})",
+                            batch,
+                        ).fetchall()
+                        for key, vector in rows:
+                            loaded[key] = array("f", vector)
+                            found[key] = loaded[key].tolist()
+
+                        if rows:
+                            with conn:
+                                conn.execute(
+                                    "UPDATE embedding SET accessed_at = ? WHERE key IN "
+                                    f"({', '.join('?' for _ in rows)})",
+                                    [int(time.time()), *(key for key, _ in rows)],
+                                )
+            except sqlite3.Error as e:
+                log.warning(f"Error reading embedding cache: {e}")
+
+            self.remember(loaded)
+
+        return found
+
+    def set_many(self, embeddings: dict[str, list[float]]):
+        vectors = {key: array("f", vector) for key, vector in embeddings.items()}
+        self.remember(vectors)
+
+        if self.file_path:
+            try:
+                with closing(self.connect()) as conn, conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embedding (key, vector, accessed_at) "
+                        "VALUES (?, ?, ?)",
+                        [
+                            (key, vector.tobytes(), int(time.time()))
+                            for key, vector in vectors.items()
+                        ],
+                    )
+
+                    with self.lock:
+                        self.disk_writes += len(embeddings)
+                        evict = self.disk_writes >= max(self.max_disk_size // 10, 1)
+                        if evict:
+                            self.disk_writes = 0
+
+                    if evict:
+                        self.evict(conn)
+            except sqlite3.Error as e:
+                log.warning(f"Error writing embedding cache: {e}")
+
+    def evict(self, conn: sqlite3.Connection):
+        """Delete the least recently used embeddings past `max_disk_size`."""
+        (count,) = conn.execute("SELECT COUNT(*) FROM embedding").fetchone()
+        if count > self.max_disk_size:
+            conn.execute(
+                "DELETE FROM embedding WHERE key IN (SELECT key FROM embedding "
+                "ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_disk_size,),
+            )
+            log.debug(f"Evicted {count - self.max_disk_size} cached embeddings")
+
+    def remember(self, embeddings: dict[str, array]):
+        with self.lock:
+            for key, vector in embeddings.items():
+                self.memory[key] = vector
+                self.memory.move_to_end(key)
+
+            while len(self.memory) > self.max_size:
+                self.memory.popitem(last=False)
+
+    def wrap(self, engine: str, model: str, func):
+        """
+        Wrap an embedding function taking `(query, user=None)`, where query is a
+        string or a list of strings, so that only uncached texts are embedded.
+        """
+
+        def cached_func(query, user=None):
+            texts = query if isinstance(query, list) else [query]
+            keys = [self.get_key(engine, model, text) for text in texts]
+
+            found = self.get_many(keys)
+
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in found and key not in missing:
+                    missing[key] = text
+
+            if missing:
+                log.debug(
+                    f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
+                )
+                embeddings = func(list(missing.values()), user=user)
+                if embeddings is None:
+                    return None
+                if len(embeddings) != len(missing):
+                    log.warning(
+                        f"Expected {len(missing)} embeddings, got {len(embeddings)}"
+                    )
+                    return None
+
+                computed = dict(zip(missing.keys(), embeddings))
+                self.set_many(computed)
+                found.update(computed)
+
+            embeddings = [found[key] for key in keys]
+            return embeddings if isinstance(query, list) else embeddings[0]
+
+        return cached_func
+
+
+EMBEDDING_CACHE = (
+    EmbeddingCache(
+        RAG_EMBEDDING_CACHE_DIR,
+        RAG_EMBEDDING_CACHE_SIZE,
+        RAG_EMBEDDING_CACHE_DISK_SIZE,
+    )
+    if ENABLE_RAG_EMBEDDING_CACHE
+    else None
+)
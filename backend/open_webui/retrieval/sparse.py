@@ -0,0 +1,318 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Optional
+
+from open_webui.config import SPARSE_INDEX_DATA_PATH
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.models.vector_collections import VectorCollections
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Size of the memory map used to read the index files
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Collections that are created for a single use and never deleted, e.g. the
+# results of a web search, which are not worth keeping an index file for
+EPHEMERAL_COLLECTION_PREFIXES = ("web-search-",)
+
+
+class SparseIndex:
+    """
+    Persistent BM25 index, one SQLite FTS5 database per collection.
+
+    The index is kept in sync with the vector database by the routers that
+    insert into and delete from collections, so that hybrid search only has to
+    score the query terms against the prebuilt inverted index instead of
+    loading the whole collection and building a BM25 retriever per query.
+
+    Index files are local to each instance while the vector database is shared,
+    so every change to a collection increments its generation in the database
+    (see `VectorCollections`). An index records the generation it is up to date
+    with and is only used while that is still the current one. Changes are
+    applied to an up to date index directly; otherwise the index is rebuilt from
+    the vector database the next time the collection is searched, see `build`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.build_locks = {}
+        self.enabled = self.is_fts5_available()
+
+        if self.enabled:
+            os.makedirs(self.path, exist_ok=True)
+        else:
+            log.warning("SQLite FTS5 is not available, sparse index is disabled")
+
+    @staticmethod
+    def is_fts5_available() -> bool:
+        try:
+            with closing(sqlite3.connect(":memory:")) as conn:
+                conn.execute("CREATE VIRTUAL TABLE fts5_check USING fts5(text)")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def get_file_path(self, collection_name: str) -> str:
+        # Collection names are not guaranteed to be valid file names
+        file_name = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.path, f"{file_name}.db")
+
+    def connect(self, collection_name: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.get_file_path(collection_name), timeout=30)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def is_indexed(self, collection_name: str) -> bool:
+        return self.enabled and not collection_name.startswith(
+            EPHEMERAL_COLLECTION_PREFIXES
+        )
+
+    def get_index_generation(self, collection_name: str) -> Optional[int]:
+        """Generation the local index of a collection is up to date with."""
+        file_path = self.get_file_path(collection_name)
+        if not os.path.exists(file_path):
+            return None
+
+        try:
+            with closing(sqlite3.connect(file_path, timeout=30)) as conn:
+                row = conn.execute("SELECT generation FROM meta").fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            # Index files from before generations were tracked
+            return None
+
+    def has_collection(self, collection_name: str) -> bool:
+        if not self.is_indexed(collection_name):
+            return False
+
+        generation = self.get_index_generation(collection_name)
+        return (
+            generation is not None
+            and generation == VectorCollections.get_generation(collection_name)
+        )
+
+    def update(self, collection_name: str, apply):
+        """
+        Record a change made to a collection in the vector database, and apply it
+        to the local index with `apply(conn)` if that has every earlier change.
+        Must be called after the vector database was changed.
+        """
+        if not self.is_indexed(collection_name):
+            return
+
+        with self.lock:
+            index_generation = self.get_index_generation(collection_name)
+            generation = VectorCollections.increment_generation(collection_name)
+
+            if index_generation is None:
+                return
+            if index_generation != generation - 1:
+                # Changed on another instance too, rebuilt on the next search
+                log.debug(f"Sparse index of {collection_name} is out of date")
+                return
+
+            with closing(self.connect(collection_name)) as conn, conn:
+                apply(conn)
+                conn.execute("UPDATE meta SET generation = ?", (generation,))
+
+    def insert(self, collection_name: str, items: list[dict]):
+        """
+        Add `items` (`id`, `text` and `metadata`) to the index of a collection.
+        Collections without an up to date index are indexed on their next search.
+        """
+
+        def apply(conn):
+            conn.executemany(
+                "INSERT INTO chunk (text, chunk_id, metadata) VALUES (?, ?, ?)",
+                [
+                    (
+                        item["text"],
+                        item["id"],
+                        json.dumps(item.get("metadata") or {}),
+                    )
+                    for item in items
+                ],
+            )
+
+        self.update(collection_name, apply)
+
+    def get_build_lock(self, collection_name: str) -> threading.Lock:
+        with self.lock:
+            return self.build_locks.setdefault(collection_name, threading.Lock())
+
+    def build(self, collection_name: str, get_result) -> bool:
+        """
+        Index a collection unless its index is up to date. `get_result` returns
+        the collection as a `GetResult` of the vector database, and is only
+        called when the index has to be built.
+        """
+        if not self.is_indexed(collection_name):
+            return False
+
+        with self.get_build_lock(collection_name):
+            # Read before the collection, so an index built from content older
+            # than the generation it records is never possible
+            generation = VectorCollections.get_generation(collection_name)
+            if self.get_index_generation(collection_name) == generation:
+                return True
+
+            result = get_result()
+            if result is None:
+                return False
+
+            items = [
+                {"id": id, "text": text, "metadata": metadata}
+                for id, text, metadata in zip(
+                    result.ids[0], result.documents[0], result.metadatas[0]
+                )
+            ]
+
+            # Build into a temporary file so that a partial index is never used
+            file_path = self.get_file_path(collection_name)
+            tmp_path = f"{file_path}.tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            with closing(sqlite3.connect(tmp_path)) as conn, conn:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE chunk USING fts5("
+                    "text, chunk_id UNINDEXED, metadata UNINDEXED)"
+                )
+                conn.executemany(
+                    "INSERT INTO chunk (text, chunk_id, metadata) VALUES (?, ?, ?)",
+                    [
+                        (item["text"], item["id"], json.dumps(item["metadata"] or {}))
+                        for item in items
+                    ],
+                )
+                conn.execute("INSERT INTO chunk (chunk) VALUES ('optimize')")
+                conn.execute("CREATE TABLE meta (collection_name TEXT, generation INT)")
+                conn.execute(
+                    "INSERT INTO meta (collection_name, generation) VALUES (?, ?)",
+                    (collection_name, generation),
+                )
+
+            with self.lock:
+                os.replace(tmp_path, file_path)
+
+        log.info(f"Built sparse index for {collection_name} ({len(items)} chunks)")
+        return True
+
+    def search(self, collection_name: str, query: str, k: int) -> list[dict]:
+        terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+        if not terms or not self.has_collection(collection_name):
+            return []
+
+        # Quote every term so that it is never parsed as FTS5 query syntax
+        match = " OR ".join(f'"{term}"' for term in terms)
+
+        with closing(self.connect(collection_name)) as conn:
+            rows = conn.execute(
+                "SELECT chunk_id, text, metadata, bm25(chunk) AS score FROM chunk "
+                "WHERE chunk MATCH ? ORDER BY score LIMIT ?",
+                (match, k),
+            ).fetchall()
+
+        return [
+            {
+                "id": chunk_id,
+                "text": text,
+                "metadata": json.loads(metadata),
+                # FTS5 scores are negative, lower is better
+                "score": -score,
+            }
+            for chunk_id, text, metadata, score in rows
+        ]
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        def apply(conn):
+            if ids:
+                conn.executemany(
+                    "DELETE FROM chunk WHERE chunk_id = ?", [(id,) for id in ids]
+                )
+            elif filter:
+                conditions = " AND ".join(
+                    "json_extract(metadata, ?) = ?" for _ in filter.keys()
+                )
+                params = []
+                for key, value in filter.items():
+                    params.extend([f'$."{key}"', value])
+
+                conn.execute(f"DELETE FROM chunk WHERE {conditions}", params)
+
+        self.update(collection_name, apply)
+
+    def remove_files(self, file_path: str):
+        for path in (file_path, f"{file_path}-wal", f"{file_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def delete_collection(self, collection_name: str):
+        if not self.is_indexed(collection_name):
+            return
+
+        with self.lock:
+            VectorCollections.increment_generation(collection_name)
+            self.remove_files(self.get_file_path(collection_name))
+
+    def reset(self):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            VectorCollections.increment_all_generations()
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+
+    def prune(self):
+        """
+        Remove the index files that are out of date, e.g. those of collections
+        that were changed or deleted on another instance, and files from before
+        generations were tracked. Collections that are still in use are indexed
+        again on their next search.
+        """
+        if not self.enabled:
+            return
+
+        removed = 0
+        for file_name in os.listdir(self.path):
+            if not file_name.endswith(".db"):
+                continue
+
+            file_path = os.path.join(self.path, file_name)
+            try:
+                with closing(sqlite3.connect(file_path, timeout=30)) as conn:
+                    collection_name, generation = conn.execute(
+                        "SELECT collection_name, generation FROM meta"
+                    ).fetchone()
+            except (sqlite3.Error, TypeError):
+                collection_name, generation = None, None
+
+            if collection_name is None or generation != (
+                VectorCollections.get_generation(collection_name)
+            ):
+                with self.lock:
+                    self.remove_files(file_path)
+                removed += 1
+
+        if removed:
+            log.info(f"Removed {removed} out of date sparse index files")
+
+
+SPARSE_INDEX = SparseIndex(SPARSE_INDEX_DATA_PATH)
@@ -6,15 +6,27 @@ from typing import Optional, Union
 import asyncio
 import requests
 import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from huggingface_hub import snapshot_download
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
 from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 
-from open_webui.config import VECTOR_DB
+from open_webui.config import (
+    VECTOR_DB,
+    RAG_RETRIEVAL_MAX_WORKERS,
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    RAG_EMBEDDING_BATCH_MAX_TOKENS,
+    RAG_EMBEDDING_MAX_RETRIES,
+)
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.sparse import SPARSE_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 from open_webui.utils.misc import get_last_user_message, calculate_sha256_string
 
 from open_webui.models.users import UserModel
@@ -29,6 +41,66 @@ from open_webui.env import (
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Shared by all requests to bound the number of concurrent vector DB searches
+RETRIEVAL_EXECUTOR = ThreadPoolExecutor(
+    max_workers=RAG_RETRIEVAL_MAX_WORKERS, thread_name_prefix="retrieval"
+)
+
+# Bounds the number of embedding batches in flight to the embedding API
+EMBEDDING_EXECUTOR = ThreadPoolExecutor(
+    max_workers=RAG_EMBEDDING_CONCURRENT_REQUESTS, thread_name_prefix="embedding"
+)
+
+
+def map_embedding_batches(func, batches: list):
+    """
+    Like `EMBEDDING_EXECUTOR.map`, but with at most as many batches of a call
+    queued as there are workers, so that the batches of a large upload do not
+    delay those of other calls. A single batch, e.g. the queries of a search,
+    is embedded in the calling thread rather than queued.
+    """
+    if len(batches) <= 1:
+        yield from (func(batch) for batch in batches)
+        return
+
+    futures = deque()
+    try:
+        for batch in batches:
+            if len(futures) >= RAG_EMBEDDING_CONCURRENT_REQUESTS:
+                yield futures.popleft().result()
+            futures.append(EMBEDDING_EXECUTOR.submit(func, batch))
+        while futures:
+            yield futures.popleft().result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def get_embedding_session() -> requests.Session:
+    """
+    Pooled HTTP session for the embedding APIs, retrying with exponential
+    backoff on rate limits and server errors (honoring `Retry-After`).
+    """
+    retry = Retry(
+        total=RAG_EMBEDDING_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_maxsize=max(RAG_EMBEDDING_CONCURRENT_REQUESTS, 10), max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+EMBEDDING_SESSION = get_embedding_session()
+
 
 from typing import Any
 
@@ -68,6 +140,48 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
+class SparseIndexRetriever(BaseRetriever):
+    collection_name: Any
+    top_k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        results = SPARSE_INDEX.search(
+            collection_name=self.collection_name,
+            query=query,
+            k=self.top_k,
+        )
+
+        return [
+            Document(
+                metadata=result["metadata"],
+                page_content=result["text"],
+            )
+            for result in results
+        ]
+
+
+def get_sparse_retriever(collection_name: str, k: int) -> BaseRetriever:
+    # Indexes the collection from the vector database unless it is up to date
+    if SPARSE_INDEX.build(
+        collection_name,
+        lambda: VECTOR_DB_CLIENT.get(collection_name=collection_name),
+    ):
+        return SparseIndexRetriever(collection_name=collection_name, top_k=k)
+
+    result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+    bm25_retriever = BM25Retriever.from_texts(
+        texts=result.documents[0],
+        metadatas=result.metadatas[0],
+    )
+    bm25_retriever.k = k
+    return bm25_retriever
+
+
 def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
@@ -109,13 +223,7 @@ def query_doc_with_hybrid_search(
     r: float,
 ) -> dict:
     try:
-        result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
-
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=result.documents[0],
-            metadatas=result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        bm25_retriever = get_sparse_retriever(collection_name, k)
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -236,22 +344,35 @@ def query_collection(
     k: int,
 ) -> dict:
     results = []
-    for query in queries:
-        query_embedding = embedding_function(query)
-        for collection_name in collection_names:
-            if collection_name:
-                try:
-                    result = query_doc(
-                        collection_name=collection_name,
-                        k=k,
-                        query_embedding=query_embedding,
-                    )
-                    if result is not None:
-                        results.append(result.model_dump())
-                except Exception as e:
-                    log.exception(f"Error when querying the collection: {e}")
-            else:
-                pass
+    collection_names = [name for name in collection_names if name]
+
+    # Embed all queries in a single call and search every pair concurrently
+    query_embeddings = embedding_function(list(queries)) if queries else []
+    if query_embeddings is None or len(query_embeddings) != len(queries):
+        log.error(
+            f"Expected {len(queries)} query embeddings, got "
+            f"{len(query_embeddings) if query_embeddings is not None else None}"
+        )
+        query_embeddings = []
+
+    futures = [
+        RETRIEVAL_EXECUTOR.submit(
+            query_doc,
+            collection_name=collection_name,
+            k=k,
+            query_embedding=query_embedding,
+        )
+        for query_embedding in query_embeddings
+        for collection_name in collection_names
+    ]
+
+    for future in futures:
+        try:
+            result = future.result()
+            if result is not None:
+                results.append(result.model_dump())
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
 
     if VECTOR_DB == "chroma":
         # Chroma uses unconventional cosine similarity, so we don't need to reverse the results
@@ -271,18 +392,29 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    for collection_name in collection_names:
+
+    # Embed all queries in a single call up front, the searches below then hit
+    # the embedding cache instead of embedding the queries one at a time
+    if queries and EMBEDDING_CACHE is not None:
+        embedding_function(list(queries))
+
+    futures = [
+        RETRIEVAL_EXECUTOR.submit(
+            query_doc_with_hybrid_search,
+            collection_name=collection_name,
+            query=query,
+            embedding_function=embedding_function,
+            k=k,
+            reranking_function=reranking_function,
+            r=r,
+        )
+        for collection_name in collection_names
+        for query in queries
+    ]
+
+    for future in futures:
         try:
-            for query in queries:
-                result = query_doc_with_hybrid_search(
-                    collection_name=collection_name,
-                    query=query,
-                    embedding_function=embedding_function,
-                    k=k,
-                    reranking_function=reranking_function,
-                    r=r,
-                )
-                results.append(result)
+            results.append(future.result())
         except Exception as e:
             log.exception(
                 "Error when querying the collection with " f"hybrid_search: {e}"
@@ -311,9 +443,9 @@ def get_embedding_function(
     embedding_batch_size,
 ):
     if embedding_engine == "":
-        return lambda query, user=None: embedding_function.encode(query).tolist()
+        func = lambda query, user=None: embedding_function.encode(query).tolist()
     elif embedding_engine in ["ollama", "openai"]:
-        func = lambda query, user=None: generate_embeddings(
+        batch_func = lambda query, user=None: generate_embeddings(
             engine=embedding_engine,
             model=embedding_model,
             text=query,
@@ -324,19 +456,54 @@ def get_embedding_function(
 
         def generate_multiple(query, user, func):
             if isinstance(query, list):
+                batches = get_embedding_batches(
+                    query, embedding_batch_size, RAG_EMBEDDING_BATCH_MAX_TOKENS
+                )
+
+                # Send the batches concurrently, results keep the batch order
                 embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(query[i : i + embedding_batch_size], user=user)
-                    )
+                for batch_embeddings in map_embedding_batches(
+                    lambda batch: func(batch, user=user), batches
+                ):
+                    embeddings.extend(batch_embeddings)
                 return embeddings
             else:
                 return func(query, user)
 
-        return lambda query, user=None: generate_multiple(query, user, func)
+        func = lambda query, user=None: generate_multiple(query, user, batch_func)
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
 
+    if EMBEDDING_CACHE is not None:
+        func = EMBEDDING_CACHE.wrap(embedding_engine, embedding_model, func)
+
+    return func
+
+
+def get_embedding_batches(
+    texts: list[str], batch_size: int, max_tokens: int
+) -> list[list[str]]:
+    """
+    Split texts into batches of at most `batch_size` texts and, as estimated
+    from their length, `max_tokens` tokens.
+    """
+    batches = []
+    batch, batch_tokens = [], 0
+
+    for text in texts:
+        # Roughly 4 characters per token for common tokenizers
+        tokens = len(text) // 4 + 1
+        if batch and (len(batch) >= batch_size or batch_tokens + tokens > max_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+
+        batch.append(text)
+        batch_tokens += tokens
+
+    if batch:
+        batches.append(batch)
+    return batches
+
 
 def get_sources_from_files(
     request,
@@ -556,7 +723,7 @@ def generate_openai_batch_embeddings(
     user: UserModel = None,
 ) -> Optional[list[list[float]]]:
     try:
-        r = requests.post(
+        r = EMBEDDING_SESSION.post(
             f"{url}/embeddings",
             headers={
                 "Content-Type": "application/json",
@@ -589,7 +756,7 @@ def generate_ollama_batch_embeddings(
     model: str, texts: list[str], url: str, key: str = "", user: UserModel = None
 ) -> Optional[list[list[float]]]:
     try:
-        r = requests.post(
+        r = EMBEDDING_SESSION.post(
             f"{url}/api/embed",
             headers={
                 "Content-Type": "application/json",
@@ -0,0 +1,261 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    ENABLE_RAG_WEB_FETCH_CACHE,
+    RAG_WEB_FETCH_CACHE_DIR,
+    RAG_WEB_FETCH_CACHE_TTL,
+    RAG_WEB_FETCH_CACHE_MAX_SIZE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Version of the on-disk format, older caches are discarded
+SCHEMA_VERSION = 1
+
+
+def parse_cache_control(value: Optional[str]) -> dict:
+    """Directives of a `Cache-Control` header, e.g. {"max-age": "60", "private": None}."""
+    directives = {}
+    for directive in (value or "").split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+class WebPageCache:
+    """
+    Disk cache of fetched web pages and of the documents parsed from them.
+
+    Pages are served from the cache for `ttl` seconds, or less if their
+    `Cache-Control` max-age says so, after which they are revalidated with their
+    `ETag` / `Last-Modified` validators. Pages marked `no-store` or `private` are
+    not cached. Parsed documents are keyed by URL and content hash, so that an
+    unchanged page is not parsed again.
+
+    The size of the cache is tracked as a running total, an upper bound that is
+    recounted once it grows over `max_size` bytes. Least recently used pages are
+    then evicted until the cache is back under 90% of `max_size`.
+
+    All methods do blocking I/O and should be called from a thread in async code.
+    """
+
+    def __init__(self, path: str, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        self.file_path = os.path.join(path, "pages.db")
+
+        with closing(self.connect()) as conn, conn:
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS page")
+                conn.execute("DROP TABLE IF EXISTS document")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS page ("
+                "url TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, "
+                "last_modified TEXT, size INTEGER NOT NULL, ttl INTEGER NOT NULL, "
+                "fetched_at INTEGER NOT NULL, accessed_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS document ("
+                "url TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "page_content TEXT NOT NULL, metadata TEXT NOT NULL, "
+                "size INTEGER NOT NULL, PRIMARY KEY (url, content_hash))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS page_accessed_at_idx ON page (accessed_at)"
+            )
+            self.total_size = self.get_total_size(conn)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.file_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get_page(self, url: str) -> Optional[dict]:
+        with closing(self.connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT body, etag, last_modified, ttl, fetched_at FROM page "
+                "WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE page SET accessed_at = ? WHERE url = ?",
+                (int(time.time()), url),
+            )
+
+        body, etag, last_modified, ttl, fetched_at = row
+        return {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": time.time() - fetched_at < ttl,
+        }
+
+    def get_ttl(self, directives: dict) -> int:
+        if "no-cache" in directives:
+            return 0
+
+        # The cache is shared by all users, so s-maxage takes precedence
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        if max_age is not None:
+            try:
+                return max(min(int(max_age), self.ttl), 0)
+            except ValueError:
+                pass
+        return self.ttl
+
+    def revalidate_page(self, url: str):
+        # The page was not modified, serve it for another `ttl` seconds
+        now = int(time.time())
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                "UPDATE page SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def set_page(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        cache_control: Optional[str] = None,
+    ):
+        directives = parse_cache_control(cache_control)
+        if "no-store" in directives or "private" in directives:
+            # Drop any earlier version of the page as well
+            with self.lock, closing(self.connect()) as conn, conn:
+                conn.execute("DELETE FROM page WHERE url = ?", (url,))
+                conn.execute("DELETE FROM document WHERE url = ?", (url,))
+            return
+
+        size = len(body.encode("utf-8", errors="ignore"))
+        if size > self.max_size:
+            return
+
+        now = int(time.time())
+        with self.lock, closing(self.connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO page "
+                "(url, body, etag, last_modified, size, ttl, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    body,
+                    etag,
+                    last_modified,
+                    size,
+                    self.get_ttl(directives),
+                    now,
+                    now,
+                ),
+            )
+            # Documents parsed from a previous version of the page are stale
+            conn.execute("DELETE FROM document WHERE url = ?", (url,))
+
+            self.total_size += size
+            self.evict(conn)
+
+    def get_document(self, url: str, content_hash: str) -> Optional[Document]:
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                "SELECT page_content, metadata FROM document "
+                "WHERE url = ? AND content_hash = ?",
+                (url, content_hash),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def set_document(self, url: str, content_hash: str, document: Document):
+        metadata = json.dumps(document.metadata)
+        size = len(document.page_content.encode("utf-8", errors="ignore")) + len(
+            metadata
+        )
+
+        with self.lock, closing(self.connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO document "
+                "(url, content_hash, page_content, metadata, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, content_hash, document.page_content, metadata, size),
+            )
+
+            self.total_size += size
+            self.evict(conn)
+
+    @staticmethod
+    def get_total_size(conn: sqlite3.Connection) -> int:
+        (total_size,) = conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM page) + "
+            "(SELECT COALESCE(SUM(size), 0) FROM document)"
+        ).fetchone()
+        return total_size
+
+    def evict(self, conn: sqlite3.Connection):
+        if self.total_size <= self.max_size:
+            return
+
+        # Replaced and deleted entries are not subtracted from the running
+        # total, and other processes may share the file, so count it again
+        total_size = self.get_total_size(conn)
+
+        while total_size > self.max_size * 0.9:
+            row = conn.execute(
+                "SELECT url, size FROM page ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                # Only documents of pages that were too large to be cached remain
+                conn.execute("DELETE FROM document")
+                total_size = 0
+                break
+
+            url, size = row
+            (document_size,) = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM document WHERE url = ?", (url,)
+            ).fetchone()
+
+            conn.execute("DELETE FROM page WHERE url = ?", (url,))
+            conn.execute("DELETE FROM document WHERE url = ?", (url,))
+            total_size -= size + document_size
+
+        self.total_size = total_size
+
+
+def get_web_page_cache() -> Optional[WebPageCache]:
+    if not ENABLE_RAG_WEB_FETCH_CACHE:
+        return None
+
+    try:
+        return WebPageCache(
+            RAG_WEB_FETCH_CACHE_DIR,
+            ttl=RAG_WEB_FETCH_CACHE_TTL,
+            max_size=RAG_WEB_FETCH_CACHE_MAX_SIZE,
+        )
+    except (OSError, sqlite3.Error) as e:
+        log.warning(f"Web page cache is disabled: {e}")
+        return None
+
+
+WEB_PAGE_CACHE = get_web_page_cache()
@@ -1,8 +1,11 @@
 import logging
 from typing import Optional
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    SEARCH_SESSION,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
@@ -43,7 +46,7 @@ def search_google_pse(
             "num": num_results_this_page,
             "start": start_index,
         }
-        response = requests.request("GET", url, headers=headers, params=params)
+        response = SEARCH_SESSION.request("GET", url, headers=headers, params=params)
         response.raise_for_status()
         json_response = response.json()
         results = json_response.get("items", [])
@@ -1,9 +1,24 @@
+import requests
 import validators
 
 from typing import Optional
 from urllib.parse import urlparse
 
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+
+
+def get_search_session() -> requests.Session:
+    # Shared by the search engine clients so that connections are reused
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+SEARCH_SESSION = get_search_session()
 
 
 def get_filtered_results(results, filter_list):
@@ -1,8 +1,11 @@
 import logging
 from typing import Optional
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    SEARCH_SESSION,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
@@ -24,7 +27,7 @@ def search_mojeek(
     }
     params = {"q": query, "api_key": api_key, "fmt": "json", "t": count}
 
-    response = requests.get(url, headers=headers, params=params)
+    response = SEARCH_SESSION.get(url, headers=headers, params=params)
     response.raise_for_status()
     json_response = response.json()
     results = json_response.get("response", {}).get("results", [])
@@ -2,8 +2,11 @@ import logging
 from typing import Optional
 from urllib.parse import urlencode
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    SEARCH_SESSION,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
@@ -30,7 +33,7 @@ def search_serpapi(
     payload = {"engine": engine, "q": query, "api_key": api_key}
 
     url = f"{url}?{urlencode(payload)}"
-    response = requests.request("GET", url)
+    response = SEARCH_SESSION.request("GET", url)
 
     json_response = response.json()
     log.info(f"results from serpapi search: {json_response}")
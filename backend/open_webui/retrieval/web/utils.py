@@ -25,6 +25,8 @@ from langchain_community.document_loaders.firecrawl import FireCrawlLoader
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.retrieval.web.cache import WEB_PAGE_CACHE
+from open_webui.utils.misc import calculate_sha256_string
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
     PLAYWRIGHT_WS_URI,
@@ -407,11 +409,27 @@ class SafeWebBaseLoader(WebBaseLoader):
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
     ) -> str:
+        cached_page = (
+            await asyncio.to_thread(WEB_PAGE_CACHE.get_page, url)
+            if WEB_PAGE_CACHE
+            else None
+        )
+        if cached_page and cached_page["fresh"]:
+            return cached_page["body"]
+
+        # Revalidate the cached page instead of downloading it again
+        conditional_headers = {}
+        if cached_page:
+            if cached_page["etag"]:
+                conditional_headers["If-None-Match"] = cached_page["etag"]
+            if cached_page["last_modified"]:
+                conditional_headers["If-Modified-Since"] = cached_page["last_modified"]
+
         async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
             for i in range(retries):
                 try:
                     kwargs: Dict = dict(
-                        headers=self.session.headers,
+                        headers={**self.session.headers, **conditional_headers},
                         cookies=self.session.cookies.get_dict(),
                     )
                     if not self.session.verify:
@@ -420,9 +438,24 @@ class SafeWebBaseLoader(WebBaseLoader):
                     async with session.get(
                         url, **(self.requests_kwargs | kwargs)
                     ) as response:
+                        if response.status == 304 and cached_page:
+                            await asyncio.to_thread(WEB_PAGE_CACHE.revalidate_page, url)
+                            return cached_page["body"]
+
                         if self.raise_for_status:
                             response.raise_for_status()
-                        return await response.text()
+                        body = await response.text()
+
+                        if WEB_PAGE_CACHE and response.status == 200:
+                            await asyncio.to_thread(
+                                WEB_PAGE_CACHE.set_page,
+                                url,
+                                body,
+                                etag=response.headers.get("ETag"),
+                                last_modified=response.headers.get("Last-Modified"),
+                                cache_control=response.headers.get("Cache-Control"),
+                            )
+                        return body
                 except aiohttp.ClientConnectionError as e:
                     if i == retries - 1:
                         raise
@@ -476,8 +509,19 @@ class SafeWebBaseLoader(WebBaseLoader):
 
     async def alazy_load(self) -> AsyncIterator[Document]:
         """Async lazy load text from the url(s) in web_path."""
-        results = await self.ascrape_all(self.web_paths)
-        for path, soup in zip(self.web_paths, results):
+        results = await self.fetch_all(self.web_paths)
+        for path, result in zip(self.web_paths, results):
+            # Pages that did not change since they were last parsed are reused
+            content_hash = calculate_sha256_string(result)
+            if WEB_PAGE_CACHE:
+                document = await asyncio.to_thread(
+                    WEB_PAGE_CACHE.get_document, path, content_hash
+                )
+                if document:
+                    yield document
+                    continue
+
+            soup = self._unpack_fetch_results([result], [path])[0]
             text = soup.get_text(**self.bs_get_text_kwargs)
             metadata = {"source": path}
             if title := soup.find("title"):
@@ -488,7 +532,13 @@ class SafeWebBaseLoader(WebBaseLoader):
                 )
             if html := soup.find("html"):
                 metadata["language"] = html.get("lang", "No language found.")
-            yield Document(page_content=text, metadata=metadata)
+
+            document = Document(page_content=text, metadata=metadata)
+            if WEB_PAGE_CACHE and result:
+                await asyncio.to_thread(
+                    WEB_PAGE_CACHE.set_document, path, content_hash, document
+                )
+            yield document
 
     async def aload(self) -> list[Document]:
         """Load data into Document objects."""
@@ -40,17 +40,16 @@ from open_webui.utils.auth import (
     get_admin_user,
     get_verified_user,
     get_current_user,
-    get_password_hash,
+    get_password_hash_async,
+    run_in_password_executor,
 )
 from open_webui.utils.webhook import post_webhook
 from open_webui.utils.access_control import get_permissions
+from open_webui.utils.ldap import LDAP_CONNECTION_MANAGER
 
 from typing import Optional, List
 
-from ssl import CERT_REQUIRED, PROTOCOL_TLS
-
 if ENABLE_LDAP.value:
-    from ldap3 import Server, Connection, NONE, Tls
     from ldap3.utils.conv import escape_filter_chars
 
 router = APIRouter()
@@ -149,10 +148,12 @@ async def update_password(
     if WEBUI_AUTH_TRUSTED_EMAIL_HEADER:
         raise HTTPException(400, detail=ERROR_MESSAGES.ACTION_PROHIBITED)
     if session_user:
-        user = Auths.authenticate_user(session_user.email, form_data.password)
+        user = await run_in_password_executor(
+            Auths.authenticate_user, session_user.email, form_data.password
+        )
 
         if user:
-            hashed = get_password_hash(form_data.new_password)
+            hashed = await get_password_hash_async(form_data.new_password)
             return Auths.update_user_password_by_id(user.id, hashed)
         else:
             raise HTTPException(400, detail=ERROR_MESSAGES.INVALID_PASSWORD)
@@ -186,36 +187,19 @@ async def ldap_auth(request: Request, response: Response, form_data: LdapForm):
     if not ENABLE_LDAP:
         raise HTTPException(400, detail="LDAP authentication is not enabled")
 
-    try:
-        tls = Tls(
-            validate=CERT_REQUIRED,
-            version=PROTOCOL_TLS,
-            ca_certs_file=LDAP_CA_CERT_FILE,
-            ciphers=LDAP_CIPHERS,
-        )
-    except Exception as e:
-        log.error(f"An error occurred on TLS: {str(e)}")
-        raise HTTPException(400, detail=str(e))
+    settings = (
+        LDAP_SERVER_HOST,
+        LDAP_SERVER_PORT,
+        LDAP_USE_TLS,
+        LDAP_CA_CERT_FILE,
+        LDAP_CIPHERS,
+        LDAP_APP_DN,
+        LDAP_APP_PASSWORD,
+    )
 
     try:
-        server = Server(
-            host=LDAP_SERVER_HOST,
-            port=LDAP_SERVER_PORT,
-            get_info=NONE,
-            use_ssl=LDAP_USE_TLS,
-            tls=tls,
-        )
-        connection_app = Connection(
-            server,
-            LDAP_APP_DN,
-            LDAP_APP_PASSWORD,
-            auto_bind="NONE",
-            authentication="SIMPLE",
-        )
-        if not connection_app.bind():
-            raise HTTPException(400, detail="Application account bind failed")
-
-        search_success = connection_app.search(
+        entries = await LDAP_CONNECTION_MANAGER.search(
+            settings,
             search_base=LDAP_SEARCH_BASE,
             search_filter=f"(&({LDAP_ATTRIBUTE_FOR_USERNAME}={escape_filter_chars(form_data.user.lower())}){LDAP_SEARCH_FILTERS})",
             attributes=[
@@ -225,10 +209,10 @@ async def ldap_auth(request: Request, response: Response, form_data: LdapForm):
             ],
         )
 
-        if not search_success:
+        if not entries:
             raise HTTPException(400, detail="User not found in the LDAP server")
 
-        entry = connection_app.entries[0]
+        entry = entries[0]
         username = str(entry[f"{LDAP_ATTRIBUTE_FOR_USERNAME}"]).lower()
         email = str(entry[f"{LDAP_ATTRIBUTE_FOR_MAIL}"])
         if not email or email == "" or email == "[]":
@@ -240,14 +224,9 @@ async def ldap_auth(request: Request, response: Response, form_data: LdapForm):
         user_dn = entry.entry_dn
 
         if username == form_data.user.lower():
-            connection_user = Connection(
-                server,
-                user_dn,
-                form_data.password,
-                auto_bind="NONE",
-                authentication="SIMPLE",
-            )
-            if not connection_user.bind():
+            if not await LDAP_CONNECTION_MANAGER.bind_user(
+                settings, user_dn, form_data.password
+            ):
                 raise HTTPException(400, f"Authentication failed for {form_data.user}")
 
             user = Users.get_user_by_email(email)
@@ -351,7 +330,9 @@ async def signin(request: Request, response: Response, form_data: SigninForm):
         admin_password = "admin"
 
         if Users.get_user_by_email(admin_email.lower()):
-            user = Auths.authenticate_user(admin_email.lower(), admin_password)
+            user = await run_in_password_executor(
+                Auths.authenticate_user, admin_email.lower(), admin_password
+            )
         else:
             if Users.get_num_users() != 0:
                 raise HTTPException(400, detail=ERROR_MESSAGES.EXISTING_USERS)
@@ -362,9 +343,13 @@ async def signin(request: Request, response: Response, form_data: SigninForm):
                 SignupForm(email=admin_email, password=admin_password, name="User"),
             )
 
-            user = Auths.authenticate_user(admin_email.lower(), admin_password)
+            user = await run_in_password_executor(
+                Auths.authenticate_user, admin_email.lower(), admin_password
+            )
     else:
-        user = Auths.authenticate_user(form_data.email.lower(), form_data.password)
+        user = await run_in_password_executor(
+            Auths.authenticate_user, form_data.email.lower(), form_data.password
+        )
 
     if user:
 
@@ -453,7 +438,7 @@ async def signup(request: Request, response: Response, form_data: SignupForm):
             # Disable signup after the first user is created
             request.app.state.config.ENABLE_SIGNUP = False
 
-        hashed = get_password_hash(form_data.password)
+        hashed = await get_password_hash_async(form_data.password)
         user = Auths.insert_new_auth(
             form_data.email.lower(),
             hashed,
@@ -568,7 +553,7 @@ async def add_user(form_data: AddUserForm, user=Depends(get_admin_user)):
         raise HTTPException(400, detail=ERROR_MESSAGES.EMAIL_TAKEN)
 
     try:
-        hashed = get_password_hash(form_data.password)
+        hashed = await get_password_hash_async(form_data.password)
         user = Auths.insert_new_auth(
             form_data.email.lower(),
             hashed,
@@ -143,6 +143,39 @@ class MessageUserResponse(MessageResponse):
     user: UserNameResponse
 
 
+def get_message_user_responses(
+    message_list: list[MessageModel], with_replies: bool = True
+) -> list[MessageUserResponse]:
+    # Hydrate a page of messages with a fixed number of queries
+    message_ids = [message.id for message in message_list]
+
+    users = {
+        user.id: user
+        for user in Users.get_users_by_user_ids(
+            list({message.user_id for message in message_list})
+        )
+    }
+    reactions = Messages.get_reactions_by_message_ids(message_ids)
+    reply_stats = (
+        Messages.get_reply_stats_by_message_ids(message_ids) if with_replies else {}
+    )
+
+    return [
+        MessageUserResponse(
+            **{
+                **message.model_dump(),
+                "reply_count": reply_stats.get(message.id, {}).get("reply_count", 0),
+                "latest_reply_at": reply_stats.get(message.id, {}).get(
+                    "latest_reply_at"
+                ),
+                "reactions": reactions.get(message.id, []),
+                "user": UserNameResponse(**users[message.user_id].model_dump()),
+            }
+        )
+        for message in message_list
+    ]
+
+
 @router.get("/{id}/messages", response_model=list[MessageUserResponse])
 async def get_channel_messages(
     id: str, skip: int = 0, limit: int = 50, user=Depends(get_verified_user)
@@ -161,30 +194,7 @@ async def get_channel_messages(
         )
 
     message_list = Messages.get_messages_by_channel_id(id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        replies = Messages.get_replies_by_message_id(message.id)
-        latest_reply_at = replies[0].created_at if replies else None
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": len(replies),
-                    "latest_reply_at": latest_reply_at,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    return get_message_user_responses(message_list, with_replies=True)
 
 
 ############################
@@ -299,7 +309,7 @@ async def post_new_message(
                         to=f"channel:{channel.id}",
                     )
 
-            active_user_ids = get_user_ids_from_room(f"channel:{channel.id}")
+            active_user_ids = await get_user_ids_from_room(f"channel:{channel.id}")
 
             background_tasks.add_task(
                 send_notification,
@@ -390,27 +400,7 @@ async def get_channel_thread_messages(
         )
 
     message_list = Messages.get_messages_by_parent_id(id, message_id, skip, limit)
-    users = {}
-
-    messages = []
-    for message in message_list:
-        if message.user_id not in users:
-            user = Users.get_user_by_id(message.user_id)
-            users[message.user_id] = user
-
-        messages.append(
-            MessageUserResponse(
-                **{
-                    **message.model_dump(),
-                    "reply_count": 0,
-                    "latest_reply_at": None,
-                    "reactions": Messages.get_reactions_by_message_id(message.id),
-                    "user": UserNameResponse(**users[message.user_id].model_dump()),
-                }
-            )
-        )
-
-    return messages
+    return get_message_user_responses(message_list, with_replies=False)
 
 
 ############################
@@ -1,10 +1,13 @@
+import asyncio
 import json
 import logging
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 
 from open_webui.models.chats import (
+    ChatBulkImportForm,
     ChatForm,
     ChatImportForm,
+    ChatModel,
     ChatResponse,
     Chats,
     ChatTitleIdResponse,
@@ -16,6 +19,7 @@ from open_webui.config import ENABLE_ADMIN_CHAT_ACCESS, ENABLE_ADMIN_EXPORT
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 
@@ -110,20 +114,29 @@ async def create_new_chat(form_data: ChatForm, user=Depends(get_verified_user)):
 ############################
 
 
+def insert_chat_tags(user_id: str, tags: list[str], known: Optional[set] = None):
+    """Create the tags of an imported chat that the user does not have yet."""
+    for tag_id in tags:
+        tag_id = tag_id.replace(" ", "_").lower()
+        tag_name = " ".join([word.capitalize() for word in tag_id.split("_")])
+        if known is not None:
+            if (user_id, tag_id) in known:
+                continue
+            known.add((user_id, tag_id))
+
+        if (
+            tag_id != "none"
+            and Tags.get_tag_by_name_and_user_id(tag_name, user_id) is None
+        ):
+            Tags.insert_new_tag(tag_name, user_id)
+
+
 @router.post("/import", response_model=Optional[ChatResponse])
 async def import_chat(form_data: ChatImportForm, user=Depends(get_verified_user)):
     try:
         chat = Chats.import_chat(user.id, form_data)
         if chat:
-            tags = chat.meta.get("tags", [])
-            for tag_id in tags:
-                tag_id = tag_id.replace(" ", "_").lower()
-                tag_name = " ".join([word.capitalize() for word in tag_id.split("_")])
-                if (
-                    tag_id != "none"
-                    and Tags.get_tag_by_name_and_user_id(tag_name, user.id) is None
-                ):
-                    Tags.insert_new_tag(tag_name, user.id)
+            insert_chat_tags(user.id, chat.meta.get("tags", []))
 
         return ChatResponse(**chat.model_dump())
     except Exception as e:
@@ -133,6 +146,102 @@ async def import_chat(form_data: ChatImportForm, user=Depends(get_verified_user)
         )
 
 
+############################
+# BulkImportChats
+############################
+
+# Chats inserted per transaction
+CHAT_IMPORT_BATCH_SIZE = 100
+
+
+class ChatImportError(BaseModel):
+    line: int
+    id: Optional[str] = None
+    error: str
+
+
+class ChatBulkImportResponse(BaseModel):
+    imported: int
+    errors: list[ChatImportError]
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    yield buffer
+
+
+@router.post("/import/bulk", response_model=ChatBulkImportResponse)
+async def import_chats(
+    request: Request,
+    preserve_user_id: bool = False,
+    user=Depends(get_verified_user),
+):
+    """
+    Import chats from a stream of newline-delimited JSON, one chat per line as
+    exported by `/all/export`. Chats are inserted in batches and keep their ids
+    and timestamps. Admins can also keep the owner of the chats with
+    `preserve_user_id`, otherwise they are imported for the current user.
+    """
+    if preserve_user_id and user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
+        )
+
+    imported = 0
+    errors: list[ChatImportError] = []
+    known_tags: set = set()
+    batch: list[tuple[int, ChatBulkImportForm]] = []
+
+    async def insert_batch():
+        nonlocal imported
+        results = await asyncio.to_thread(
+            Chats.import_chats, [form for _, form in batch]
+        )
+        for (line, form), error in zip(batch, results):
+            if error:
+                errors.append(ChatImportError(line=line, id=form.id, error=error))
+                continue
+
+            imported += 1
+            await asyncio.to_thread(
+                insert_chat_tags,
+                form.user_id,
+                (form.meta or {}).get("tags", []),
+                known_tags,
+            )
+        batch.clear()
+
+    line = 0
+    async for data in iter_lines(request.stream()):
+        line += 1
+        if not data.strip():
+            continue
+
+        try:
+            form = ChatBulkImportForm.model_validate_json(data)
+        except Exception as e:
+            errors.append(ChatImportError(line=line, error=str(e)))
+            continue
+
+        if not preserve_user_id or not form.user_id:
+            form.user_id = user.id
+
+        batch.append((line, form))
+        if len(batch) >= CHAT_IMPORT_BATCH_SIZE:
+            await insert_batch()
+
+    if batch:
+        await insert_batch()
+
+    return ChatBulkImportResponse(imported=imported, errors=errors)
+
+
 ############################
 # GetChats
 ############################
@@ -213,6 +322,28 @@ async def get_user_chats(user=Depends(get_verified_user)):
     ]
 
 
+############################
+# ExportChats
+############################
+
+
+def iter_chats_ndjson(chats: Iterator[ChatModel]) -> Iterator[str]:
+    for chat in chats:
+        yield ChatResponse(**chat.model_dump()).model_dump_json() + "\n"
+
+
+@router.get("/all/export")
+async def export_user_chats(user=Depends(get_verified_user)):
+    """
+    Stream all the chats of the user as newline-delimited JSON, without loading
+    them all in memory.
+    """
+    return StreamingResponse(
+        iter_chats_ndjson(Chats.iter_chats(user_id=user.id)),
+        media_type="application/x-ndjson",
+    )
+
+
 ############################
 # GetArchivedChats
 ############################
@@ -258,6 +389,18 @@ async def get_all_user_chats_in_db(user=Depends(get_admin_user)):
     return [ChatResponse(**chat.model_dump()) for chat in Chats.get_chats()]
 
 
+@router.get("/all/db/export")
+async def export_all_chats_in_db(user=Depends(get_admin_user)):
+    if not ENABLE_ADMIN_EXPORT:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
+        )
+    return StreamingResponse(
+        iter_chats_ndjson(Chats.iter_chats()), media_type="application/x-ndjson"
+    )
+
+
 ############################
 # GetArchivedChats
 ############################
@@ -19,6 +19,7 @@ from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.jobs import INGESTION_QUEUE
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -32,12 +33,42 @@ router = APIRouter()
 ############################
 
 
+def process_uploaded_file(request: Request, file_item: FileModel, user):
+    if file_item.meta.get("content_type") in [
+        "audio/mpeg",
+        "audio/wav",
+        "audio/ogg",
+        "audio/x-m4a",
+    ]:
+        file_path = Storage.get_file(file_item.path)
+        result = transcribe(request, file_path)
+        process_file(
+            request,
+            ProcessFileForm(file_id=file_item.id, content=result.get("text", "")),
+            user=user,
+        )
+    else:
+        process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
+
+
+@INGESTION_QUEUE.register("process_uploaded_file")
+def process_uploaded_file_job(request, job, user, report):
+    file_item = Files.get_file_by_id(job.data["file_id"])
+    if not file_item:
+        raise Exception(ERROR_MESSAGES.NOT_FOUND)
+
+    report({"stage": "processing"})
+    process_uploaded_file(request, file_item, user)
+    return {"file_id": file_item.id}
+
+
 @router.post("/", response_model=FileModelResponse)
 def upload_file(
     request: Request,
     file: UploadFile = File(...),
     user=Depends(get_verified_user),
     file_metadata: dict = {},
+    background: bool = False,
 ):
     log.info(f"file.content_type: {file.content_type}")
     try:
@@ -67,23 +98,18 @@ def upload_file(
             ),
         )
 
-        try:
-            if file.content_type in [
-                "audio/mpeg",
-                "audio/wav",
-                "audio/ogg",
-                "audio/x-m4a",
-            ]:
-                file_path = Storage.get_file(file_path)
-                result = transcribe(request, file_path)
-                process_file(
-                    request,
-                    ProcessFileForm(file_id=id, content=result.get("text", "")),
-                    user=user,
-                )
-            else:
-                process_file(request, ProcessFileForm(file_id=id), user=user)
+        if background and file_item:
+            # Return right away, the file is processed by the ingestion queue
+            job = INGESTION_QUEUE.enqueue(
+                user, "process_uploaded_file", {"file_id": file_item.id}
+            )
+            if not job:
+                raise Exception("Error scheduling the file processing")
+
+            return FileModelResponse(**file_item.model_dump(), job_id=job.id)
 
+        try:
+            process_uploaded_file(request, file_item, user)
             file_item = Files.get_file_by_id(id=id)
         except Exception as e:
             log.exception(e)
@@ -158,7 +184,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
 
 @router.get("/{id}", response_model=Optional[FileModel])
 async def get_file_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
 
     if file and (file.user_id == user.id or user.role == "admin"):
         return file
@@ -176,7 +202,7 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
 
 @router.get("/{id}/data/content")
 async def get_file_data_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
 
     if file and (file.user_id == user.id or user.role == "admin"):
         return {"content": file.data.get("content", "")}
@@ -229,7 +255,7 @@ async def update_file_data_content_by_id(
 
 @router.get("/{id}/content")
 async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
     if file and (file.user_id == user.id or user.role == "admin"):
         try:
             file_path = Storage.get_file(file.path)
@@ -281,7 +307,7 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
 
 @router.get("/{id}/content/html")
 async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
     if file and (file.user_id == user.id or user.role == "admin"):
         try:
             file_path = Storage.get_file(file.path)
@@ -312,7 +338,7 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
 
 @router.get("/{id}/content/{file_name}")
 async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await Files.get_file_by_id_async(id)
 
     if file and (file.user_id == user.id or user.role == "admin"):
         file_path = file.path
@@ -10,6 +10,7 @@ from open_webui.models.functions import (
     Functions,
 )
 from open_webui.utils.plugin import load_function_module_by_id, replace_imports
+from open_webui.utils.models import MODEL_CATALOGUE
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -78,6 +79,7 @@ async def create_new_function(
             function_cache_dir.mkdir(parents=True, exist_ok=True)
 
             if function:
+                MODEL_CATALOGUE.invalidate()
                 return function
             else:
                 raise HTTPException(
@@ -129,6 +131,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            MODEL_CATALOGUE.invalidate()
             return function
         else:
             raise HTTPException(
@@ -156,6 +159,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         )
 
         if function:
+            MODEL_CATALOGUE.invalidate()
             return function
         else:
             raise HTTPException(
@@ -194,6 +198,7 @@ async def update_function_by_id(
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            MODEL_CATALOGUE.invalidate()
             return function
         else:
             raise HTTPException(
@@ -223,6 +228,7 @@ async def delete_function_by_id(
         FUNCTIONS = request.app.state.FUNCTIONS
         if id in FUNCTIONS:
             del FUNCTIONS[id]
+        MODEL_CATALOGUE.invalidate()
 
     return result
 
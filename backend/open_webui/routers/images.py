@@ -8,13 +8,13 @@ import re
 from pathlib import Path
 from typing import Optional
 
-import requests
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import ENABLE_FORWARD_USER_INFO_HEADERS, SRC_LOG_LEVELS
 from open_webui.routers.files import upload_file
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.http_client import HTTP_CLIENT_POOL
 from open_webui.utils.images.comfyui import (
     ComfyUIGenerateImageForm,
     ComfyUIWorkflow,
@@ -195,7 +195,7 @@ def get_automatic1111_api_auth(request: Request):
 async def verify_url(request: Request, user=Depends(get_admin_user)):
     if request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111":
         try:
-            r = requests.get(
+            r = HTTP_CLIENT_POOL.get_sync_session().get(
                 url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
                 headers={"authorization": get_automatic1111_api_auth(request)},
             )
@@ -213,7 +213,7 @@ async def verify_url(request: Request, user=Depends(get_admin_user)):
             }
 
         try:
-            r = requests.get(
+            r = HTTP_CLIENT_POOL.get_sync_session().get(
                 url=f"{request.app.state.config.COMFYUI_BASE_URL}/object_info",
                 headers=headers,
             )
@@ -231,14 +231,14 @@ def set_image_model(request: Request, model: str):
     request.app.state.config.IMAGE_GENERATION_MODEL = model
     if request.app.state.config.IMAGE_GENERATION_ENGINE in ["", "automatic1111"]:
         api_auth = get_automatic1111_api_auth(request)
-        r = requests.get(
+        r = HTTP_CLIENT_POOL.get_sync_session().get(
             url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
             headers={"authorization": api_auth},
         )
         options = r.json()
         if model != options["sd_model_checkpoint"]:
             options["sd_model_checkpoint"] = model
-            r = requests.post(
+            r = HTTP_CLIENT_POOL.get_sync_session().post(
                 url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
                 json=options,
                 headers={"authorization": api_auth},
@@ -270,7 +270,7 @@ def get_image_model(request):
         or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
     ):
         try:
-            r = requests.get(
+            r = HTTP_CLIENT_POOL.get_sync_session().get(
                 url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/options",
                 headers={"authorization": get_automatic1111_api_auth(request)},
             )
@@ -343,7 +343,7 @@ def get_models(request: Request, user=Depends(get_verified_user)):
             headers = {
                 "Authorization": f"Bearer {request.app.state.config.COMFYUI_API_KEY}"
             }
-            r = requests.get(
+            r = HTTP_CLIENT_POOL.get_sync_session().get(
                 url=f"{request.app.state.config.COMFYUI_BASE_URL}/object_info",
                 headers=headers,
             )
@@ -391,7 +391,7 @@ def get_models(request: Request, user=Depends(get_verified_user)):
             request.app.state.config.IMAGE_GENERATION_ENGINE == "automatic1111"
             or request.app.state.config.IMAGE_GENERATION_ENGINE == ""
         ):
-            r = requests.get(
+            r = HTTP_CLIENT_POOL.get_sync_session().get(
                 url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/sd-models",
                 headers={"authorization": get_automatic1111_api_auth(request)},
             )
@@ -433,9 +433,9 @@ def load_b64_image_data(b64_str):
 def load_url_image_data(url, headers=None):
     try:
         if headers:
-            r = requests.get(url, headers=headers)
+            r = HTTP_CLIENT_POOL.get_sync_session().get(url, headers=headers)
         else:
-            r = requests.get(url)
+            r = HTTP_CLIENT_POOL.get_sync_session().get(url)
 
         r.raise_for_status()
         if r.headers["content-type"].split("/")[0] == "image":
@@ -505,7 +505,7 @@ async def image_generations(
 
             # Use asyncio.to_thread for the requests.post call
             r = await asyncio.to_thread(
-                requests.post,
+                HTTP_CLIENT_POOL.get_sync_session().post,
                 url=f"{request.app.state.config.IMAGES_OPENAI_API_BASE_URL}/images/generations",
                 json=data,
                 headers=headers,
@@ -544,7 +544,7 @@ async def image_generations(
 
             # Use asyncio.to_thread for the requests.post call
             r = await asyncio.to_thread(
-                requests.post,
+                HTTP_CLIENT_POOL.get_sync_session().post,
                 url=f"{request.app.state.config.IMAGES_GEMINI_API_BASE_URL}/models/{model}:predict",
                 json=data,
                 headers=headers,
@@ -647,7 +647,7 @@ async def image_generations(
 
             # Use asyncio.to_thread for the requests.post call
             r = await asyncio.to_thread(
-                requests.post,
+                HTTP_CLIENT_POOL.get_sync_session().post,
                 url=f"{request.app.state.config.AUTOMATIC1111_BASE_URL}/sdapi/v1/txt2img",
                 json=data,
                 headers={"authorization": get_automatic1111_api_auth(request)},
@@ -11,6 +11,7 @@ from open_webui.models.knowledge import (
 )
 from open_webui.models.files import Files, FileModel
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.sparse import SPARSE_INDEX
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -22,6 +23,7 @@ from open_webui.storage.provider import Storage
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.jobs import INGESTION_QUEUE
 
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -39,13 +41,19 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[KnowledgeUserResponse])
-async def get_knowledge(user=Depends(get_verified_user)):
+async def get_knowledge(
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     knowledge_bases = []
 
     if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
+        knowledge_bases = Knowledges.get_knowledge_bases(skip, limit)
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "read")
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "read", skip, limit
+        )
 
     # Get files for each knowledge base
     knowledge_with_files = []
@@ -87,13 +95,19 @@ async def get_knowledge(user=Depends(get_verified_user)):
 
 
 @router.get("/list", response_model=list[KnowledgeUserResponse])
-async def get_knowledge_list(user=Depends(get_verified_user)):
+async def get_knowledge_list(
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     knowledge_bases = []
 
     if user.role == "admin":
-        knowledge_bases = Knowledges.get_knowledge_bases()
+        knowledge_bases = Knowledges.get_knowledge_bases(skip, limit)
     else:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(user.id, "write")
+        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
+            user.id, "write", skip, limit
+        )
 
     # Get files for each knowledge base
     knowledge_with_files = []
@@ -168,6 +182,7 @@ async def create_new_knowledge(
 
 class KnowledgeFilesResponse(KnowledgeResponse):
     files: list[FileModel]
+    job_id: Optional[str] = None
 
 
 @router.get("/{id}", response_model=Optional[KnowledgeFilesResponse])
@@ -255,6 +270,7 @@ def add_file_to_knowledge_by_id(
     id: str,
     form_data: KnowledgeFileIdForm,
     user=Depends(get_verified_user),
+    background: bool = False,
 ):
     knowledge = Knowledges.get_knowledge_by_id(id=id)
 
@@ -286,6 +302,24 @@ def add_file_to_knowledge_by_id(
             detail=ERROR_MESSAGES.FILE_NOT_PROCESSED,
         )
 
+    if background:
+        job = INGESTION_QUEUE.enqueue(
+            user,
+            "add_file_to_knowledge",
+            {"knowledge_id": id, "file_id": form_data.file_id},
+        )
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERROR_MESSAGES.DEFAULT("Error scheduling the file processing"),
+            )
+
+        return KnowledgeFilesResponse(
+            **knowledge.model_dump(),
+            files=Files.get_files_by_ids((knowledge.data or {}).get("file_ids", [])),
+            job_id=job.id,
+        )
+
     # Add content to the vector database
     try:
         process_file(
@@ -305,13 +339,12 @@ def add_file_to_knowledge_by_id(
         file_ids = data.get("file_ids", [])
 
         if form_data.file_id not in file_ids:
-            file_ids.append(form_data.file_id)
-            data["file_ids"] = file_ids
-
-            knowledge = Knowledges.update_knowledge_data_by_id(id=id, data=data)
+            knowledge = Knowledges.add_file_id_to_knowledge_by_id(
+                id=id, file_id=form_data.file_id
+            )
 
             if knowledge:
-                files = Files.get_files_by_ids(file_ids)
+                files = Files.get_files_by_ids(knowledge.data.get("file_ids", []))
 
                 return KnowledgeFilesResponse(
                     **knowledge.model_dump(),
@@ -334,6 +367,24 @@ def add_file_to_knowledge_by_id(
         )
 
 
+@INGESTION_QUEUE.register("add_file_to_knowledge")
+def add_file_to_knowledge_job(request, job, user, report):
+    knowledge_id = job.data["knowledge_id"]
+    file_id = job.data["file_id"]
+
+    report({"stage": "processing"})
+    process_file(
+        request,
+        ProcessFileForm(file_id=file_id, collection_name=knowledge_id),
+        user=user,
+    )
+
+    if not Knowledges.add_file_id_to_knowledge_by_id(id=knowledge_id, file_id=file_id):
+        raise Exception(ERROR_MESSAGES.NOT_FOUND)
+
+    return {"knowledge_id": knowledge_id, "file_id": file_id}
+
+
 @router.post("/{id}/file/update", response_model=Optional[KnowledgeFilesResponse])
 def update_file_from_knowledge_by_id(
     request: Request,
@@ -370,6 +421,9 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    SPARSE_INDEX.delete(
+        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+    )
 
     # Add content to the vector database
     try:
@@ -440,11 +494,15 @@ def remove_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    SPARSE_INDEX.delete(
+        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+    )
 
     # Remove the file's collection from vector database
     file_collection = f"file-{form_data.file_id}"
     if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
         VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+        SPARSE_INDEX.delete_collection(collection_name=file_collection)
 
     # Delete file from database
     Files.delete_file_by_id(form_data.file_id)
@@ -539,6 +597,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        SPARSE_INDEX.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
@@ -572,6 +631,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        SPARSE_INDEX.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
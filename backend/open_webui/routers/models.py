@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access, has_permission
+from open_webui.utils.models import MODEL_CATALOGUE
 
 
 router = APIRouter()
@@ -24,11 +25,16 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[ModelUserResponse])
-async def get_models(id: Optional[str] = None, user=Depends(get_verified_user)):
+async def get_models(
+    id: Optional[str] = None,
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        return Models.get_models()
+        return Models.get_models(skip, limit)
     else:
-        return Models.get_models_by_user_id(user.id)
+        return Models.get_models_by_user_id(user.id, "write", skip, limit)
 
 
 ###########################
@@ -70,6 +76,7 @@ async def create_new_model(
     else:
         model = Models.insert_new_model(form_data, user.id)
         if model:
+            MODEL_CATALOGUE.invalidate()
             return model
         else:
             raise HTTPException(
@@ -118,6 +125,7 @@ async def toggle_model_by_id(id: str, user=Depends(get_verified_user)):
             model = Models.toggle_model_by_id(id)
 
             if model:
+                MODEL_CATALOGUE.invalidate()
                 return model
             else:
                 raise HTTPException(
@@ -166,6 +174,7 @@ async def update_model_by_id(
         )
 
     model = Models.update_model_by_id(id, form_data)
+    MODEL_CATALOGUE.invalidate()
     return model
 
 
@@ -194,10 +203,12 @@ async def delete_model_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     result = Models.delete_model_by_id(id)
+    MODEL_CATALOGUE.invalidate()
     return result
 
 
 @router.delete("/delete/all", response_model=bool)
 async def delete_all_models(user=Depends(get_admin_user)):
     result = Models.delete_all_models()
+    MODEL_CATALOGUE.invalidate()
     return result
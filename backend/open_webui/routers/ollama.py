@@ -1,15 +1,10 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 from urllib.parse import urlparse
 import aiohttp
 from aiocache import cached
@@ -45,7 +40,9 @@ from open_webui.utils.payload import (
     apply_model_system_prompt_to_body,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_user_group_ids, has_access
+from open_webui.utils.http_client import HTTP_CLIENT_POOL
+from open_webui.utils.load_balancer import OLLAMA_LOAD_BALANCER
 
 
 from open_webui.config import (
@@ -74,25 +71,26 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-            ) as response:
-                return await response.json()
+        session = HTTP_CLIENT_POOL.get_session(url)
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -101,12 +99,15 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    end: Optional[Callable[[], None]] = None,
 ):
     if response:
-        response.close()
-    if session:
-        await session.close()
+        # Hands the connection back to the pool, or closes it if the body
+        # was not fully read
+        response.release()
+    if end:
+        # Ends the request in the load balancer stats
+        end()
 
 
 async def send_post_request(
@@ -116,17 +117,30 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    backend: Optional[str] = None,
+    model: Optional[str] = None,
 ):
+    """
+    `backend` is the base URL picked by the load balancer, whose stats are
+    updated, `model` being marked as loaded on it. Connection errors to it are
+    raised as is, to be retried on another backend.
+    """
 
     r = None
+    streaming = False
+    end = None
+
+    if backend:
+        end = OLLAMA_LOAD_BALANCER.begin(backend)
+        started_at = time.monotonic()
+
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = HTTP_CLIENT_POOL.get_session(url)
 
         r = await session.post(
             url,
             data=payload,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             headers={
                 "Content-Type": "application/json",
                 **({"Authorization": f"Bearer {key}"} if key else {}),
@@ -142,6 +156,13 @@ async def send_post_request(
                 ),
             },
         )
+        if backend:
+            OLLAMA_LOAD_BALANCER.record(
+                backend,
+                time.monotonic() - started_at,
+                failed=r.status >= 500,
+                model=model,
+            )
         r.raise_for_status()
 
         if stream:
@@ -150,20 +171,23 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            streaming = True
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r, end=end),
             )
         else:
             res = await r.json()
-            await cleanup_response(r, session)
             return res
 
     except Exception as e:
+        if backend and r is None:
+            OLLAMA_LOAD_BALANCER.record(backend, failed=True)
+            if isinstance(e, aiohttp.ClientConnectorError):
+                raise
+
         detail = None
 
         if r is not None:
@@ -178,6 +202,9 @@ async def send_post_request(
             status_code=r.status if r else 500,
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
+    finally:
+        if not streaming:
+            await cleanup_response(r, end)
 
 
 def get_api_key(idx, url, configs):
@@ -215,45 +242,44 @@ async def verify_connection(
     url = form_data.url
     key = form_data.key
 
-    async with aiohttp.ClientSession(
-        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
-    ) as session:
-        try:
-            async with session.get(
-                f"{url}/api/version",
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-            ) as r:
-                if r.status != 200:
-                    detail = f"HTTP Error: {r.status}"
-                    res = await r.json()
+    session = HTTP_CLIENT_POOL.get_session(url)
+    try:
+        async with session.get(
+            f"{url}/api/version",
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+        ) as r:
+            if r.status != 200:
+                detail = f"HTTP Error: {r.status}"
+                res = await r.json()
 
-                    if "error" in res:
-                        detail = f"External Error: {res['error']}"
-                    raise Exception(detail)
+                if "error" in res:
+                    detail = f"External Error: {res['error']}"
+                raise Exception(detail)
 
-                data = await r.json()
-                return data
-        except aiohttp.ClientError as e:
-            log.exception(f"Client error: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail="Open WebUI: Server Connection Error"
-            )
-        except Exception as e:
-            log.exception(f"Unexpected error: {e}")
-            error_detail = f"Unexpected error: {str(e)}"
-            raise HTTPException(status_code=500, detail=error_detail)
+            data = await r.json()
+            return data
+    except aiohttp.ClientError as e:
+        log.exception(f"Client error: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail="Open WebUI: Server Connection Error"
+        )
+    except Exception as e:
+        log.exception(f"Unexpected error: {e}")
+        error_detail = f"Unexpected error: {str(e)}"
+        raise HTTPException(status_code=500, detail=error_detail)
 
 
 @router.get("/config")
@@ -295,6 +321,12 @@ async def update_config(
     }
 
 
+@router.get("/backends")
+async def get_backends(request: Request, user=Depends(get_admin_user)):
+    # Load balancer stats of each Ollama base URL
+    return OLLAMA_LOAD_BALANCER.get_all_stats(request.app.state.config.OLLAMA_BASE_URLS)
+
+
 @cached(ttl=3)
 async def get_all_models(request: Request, user: UserModel = None):
     log.info("get_all_models()")
@@ -386,11 +418,15 @@ async def get_all_models(request: Request, user: UserModel = None):
 async def get_filtered_models(models, user):
     # Filter models based on user access control
     filtered_models = []
+    user_group_ids = get_user_group_ids(user.id)
     for model in models.get("models", []):
         model_info = Models.get_model_by_id(model["model"])
         if model_info:
             if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
+                user.id,
+                type="read",
+                access_control=model_info.access_control,
+                user_group_ids=user_group_ids,
             ):
                 filtered_models.append(model)
     return filtered_models
@@ -782,7 +818,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.name),
         )
 
-    url_idx = random.choice(models[form_data.name]["urls"])
+    _, url_idx = await get_ollama_url(request, form_data.name)
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -856,7 +892,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            _, url_idx = await get_ollama_url(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -935,7 +971,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            _, url_idx = await get_ollama_url(request, model)
         else:
             raise HTTPException(
                 status_code=400,
@@ -1010,37 +1046,27 @@ async def generate_completion(
     url_idx: Optional[int] = None,
     user=Depends(get_verified_user),
 ):
+    model = form_data.model
+
+    if ":" not in model:
+        model = f"{model}:latest"
+
     if url_idx is None:
         await get_all_models(request, user=user)
         models = request.app.state.OLLAMA_MODELS
 
-        model = form_data.model
-
-        if ":" not in model:
-            model = f"{model}:latest"
-
-        if model in models:
-            url_idx = random.choice(models[model]["urls"])
-        else:
+        if model not in models:
             raise HTTPException(
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.model),
             )
 
-    url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
-    api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
-        str(url_idx),
-        request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
-    )
-
-    prefix_id = api_config.get("prefix_id", None)
-    if prefix_id:
-        form_data.model = form_data.model.replace(f"{prefix_id}.", "")
-
-    return await send_post_request(
-        url=f"{url}/api/generate",
-        payload=form_data.model_dump_json(exclude_none=True).encode(),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+    return await send_model_request(
+        request,
+        model,
+        url_idx,
+        "/api/generate",
+        form_data.model_dump(exclude_none=True),
         user=user,
     )
 
@@ -1076,7 +1102,51 @@ class GenerateChatCompletionForm(BaseModel):
     tools: Optional[list[dict]] = None
 
 
-async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] = None):
+# Strong references to the pending loaded models refreshes
+loaded_models_updates: set[asyncio.Task] = set()
+
+
+async def update_loaded_models(
+    backends: list[tuple[str, Optional[str], Optional[str]]],
+):
+    async def update(url, key, prefix_id):
+        response = await send_get_request(f"{url}/api/ps", key)
+        if response:
+            OLLAMA_LOAD_BALANCER.set_loaded_models(
+                url,
+                [
+                    f"{prefix_id}.{model['model']}" if prefix_id else model["model"]
+                    for model in response.get("models", [])
+                ],
+            )
+
+    await asyncio.gather(*[update(*backend) for backend in backends])
+
+
+def refresh_loaded_models(request: Request, url_idxs: list[int]):
+    # Which backends have the model loaded (`/api/ps`) is refreshed in the
+    # background, so that the request does not wait for it
+    urls = {request.app.state.config.OLLAMA_BASE_URLS[idx]: idx for idx in url_idxs}
+    backends = []
+    for url in OLLAMA_LOAD_BALANCER.needs_loaded_models(list(urls)):
+        api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(urls[url]),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        )
+        backends.append((url, api_config.get("key", None), api_config.get("prefix_id")))
+
+    if backends:
+        update = asyncio.create_task(update_loaded_models(backends))
+        loaded_models_updates.add(update)
+        update.add_done_callback(loaded_models_updates.discard)
+
+
+async def get_ollama_url(
+    request: Request,
+    model: str,
+    url_idx: Optional[int] = None,
+    exclude: Optional[set[str]] = None,
+):
     if url_idx is None:
         models = request.app.state.OLLAMA_MODELS
         if model not in models:
@@ -1084,11 +1154,76 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+
+        url_idxs = [
+            idx
+            for idx in models[model].get("urls", [])
+            if idx < len(request.app.state.config.OLLAMA_BASE_URLS)
+        ]
+        if len(url_idxs) > 1:
+            refresh_loaded_models(request, url_idxs)
+
+        urls = {request.app.state.config.OLLAMA_BASE_URLS[idx]: idx for idx in url_idxs}
+        url = OLLAMA_LOAD_BALANCER.choose(list(urls), model, exclude)
+        if url is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Open WebUI: Server Connection Error",
+            )
+        url_idx = urls[url]
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
 
+async def send_model_request(
+    request: Request,
+    model: str,
+    url_idx: Optional[int],
+    path: str,
+    payload: dict,
+    stream: bool = True,
+    content_type: Optional[str] = None,
+    user: UserModel = None,
+):
+    """
+    Send a request for `model` to the backend picked by the load balancer, or
+    to `url_idx`. Requests that could not connect are retried on the other
+    backends serving the model.
+    """
+    tried = set()
+    while True:
+        url, idx = await get_ollama_url(request, model, url_idx, exclude=tried)
+        api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
+            str(idx),
+            request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
+        )
+
+        body = payload
+        prefix_id = api_config.get("prefix_id", None)
+        if prefix_id:
+            body = {**payload, "model": payload["model"].replace(f"{prefix_id}.", "")}
+
+        try:
+            return await send_post_request(
+                url=f"{url}{path}",
+                payload=json.dumps(body),
+                stream=stream,
+                key=get_api_key(idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
+                content_type=content_type,
+                user=user,
+                backend=url,
+                model=model,
+            )
+        except aiohttp.ClientConnectorError as e:
+            log.warning(f"Could not connect to {url}: {e}")
+            tried.add(url)
+            if url_idx is not None:
+                raise HTTPException(
+                    status_code=500,
+                    detail="Open WebUI: Server Connection Error",
+                )
+
+
 @router.post("/api/chat")
 @router.post("/api/chat/{url_idx}")
 async def generate_chat_completion(
@@ -1155,21 +1290,13 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
-    api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
-        str(url_idx),
-        request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
-    )
-
-    prefix_id = api_config.get("prefix_id", None)
-    if prefix_id:
-        payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
-
-    return await send_post_request(
-        url=f"{url}/api/chat",
-        payload=json.dumps(payload),
+    return await send_model_request(
+        request,
+        payload["model"],
+        url_idx,
+        "/api/chat",
+        payload,
         stream=form_data.stream,
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         content_type="application/x-ndjson",
         user=user,
     )
@@ -1258,22 +1385,13 @@ async def generate_openai_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
-    api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
-        str(url_idx),
-        request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
-    )
-
-    prefix_id = api_config.get("prefix_id", None)
-
-    if prefix_id:
-        payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
-
-    return await send_post_request(
-        url=f"{url}/v1/completions",
-        payload=json.dumps(payload),
+    return await send_model_request(
+        request,
+        payload["model"],
+        url_idx,
+        "/v1/completions",
+        payload,
         stream=payload.get("stream", False),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
 
@@ -1338,21 +1456,13 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
-    api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
-        str(url_idx),
-        request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
-    )
-
-    prefix_id = api_config.get("prefix_id", None)
-    if prefix_id:
-        payload["model"] = payload["model"].replace(f"{prefix_id}.", "")
-
-    return await send_post_request(
-        url=f"{url}/v1/chat/completions",
-        payload=json.dumps(payload),
+    return await send_model_request(
+        request,
+        payload["model"],
+        url_idx,
+        "/v1/chat/completions",
+        payload,
         stream=payload.get("stream", False),
-        key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
 
@@ -1414,11 +1524,15 @@ async def get_openai_models(
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
         # Filter models based on user access control
         filtered_models = []
+        user_group_ids = get_user_group_ids(user.id)
         for model in models:
             model_info = Models.get_model_by_id(model["id"])
             if model_info:
                 if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+                    user.id,
+                    type="read",
+                    access_control=model_info.access_control,
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
         models = filtered_models
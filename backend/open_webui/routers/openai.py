@@ -2,8 +2,9 @@ import asyncio
 import hashlib
 import json
 import logging
+import time
 from pathlib import Path
-from typing import Literal, Optional, overload
+from typing import Callable, Literal, Optional, overload
 
 import aiohttp
 from aiocache import cached
@@ -38,7 +39,9 @@ from open_webui.utils.payload import (
 )
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
-from open_webui.utils.access_control import has_access
+from open_webui.utils.access_control import get_user_group_ids, has_access
+from open_webui.utils.http_client import HTTP_CLIENT_POOL
+from open_webui.utils.load_balancer import OPENAI_LOAD_BALANCER
 
 
 log = logging.getLogger(__name__)
@@ -55,24 +58,25 @@ log.setLevel(SRC_LOG_LEVELS["OPENAI"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-            ) as response:
-                return await response.json()
+        session = HTTP_CLIENT_POOL.get_session(url)
+        async with session.get(
+            url,
+            timeout=timeout,
+            headers={
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
@@ -81,12 +85,15 @@ async def send_get_request(url, key=None, user: UserModel = None):
 
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    end: Optional[Callable[[], None]] = None,
 ):
     if response:
-        response.close()
-    if session:
-        await session.close()
+        # Hands the connection back to the pool, or closes it if the body
+        # was not fully read
+        response.release()
+    if end:
+        # Ends the request in the load balancer stats
+        end()
 
 
 def openai_o1_o3_handler(payload):
@@ -364,11 +371,15 @@ async def get_all_models_responses(request: Request, user: UserModel) -> list:
 async def get_filtered_models(models, user):
     # Filter models based on user access control
     filtered_models = []
+    user_group_ids = get_user_group_ids(user.id)
     for model in models.get("data", []):
         model_info = Models.get_model_by_id(model["id"])
         if model_info:
             if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
+                user.id,
+                type="read",
+                access_control=model_info.access_control,
+                user_group_ids=user_group_ids,
             ):
                 filtered_models.append(model)
     return filtered_models
@@ -427,7 +438,15 @@ async def get_all_models(request: Request, user: UserModel) -> dict[str, list]:
     models = {"data": merge_models_lists(map(extract_data, responses))}
     log.debug(f"models: {models}")
 
-    request.app.state.OPENAI_MODELS = {model["id"]: model for model in models["data"]}
+    # Connections serving each model, to balance its requests across them
+    url_idxs = {}
+    for model in models["data"]:
+        url_idxs.setdefault(model["id"], []).append(model["urlIdx"])
+
+    request.app.state.OPENAI_MODELS = {
+        model["id"]: {**model, "urlIdxs": url_idxs[model["id"]]}
+        for model in models["data"]
+    }
     return models
 
 
@@ -447,92 +466,11 @@ async def get_models(
         key = request.app.state.config.OPENAI_API_KEYS[url_idx]
 
         r = None
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
-        ) as session:
-            try:
-                async with session.get(
-                    f"{url}/models",
-                    headers={
-                        "Authorization": f"Bearer {key}",
-                        "Content-Type": "application/json",
-                        **(
-                            {
-                                "X-OpenWebUI-User-Name": user.name,
-                                "X-OpenWebUI-User-Id": user.id,
-                                "X-OpenWebUI-User-Email": user.email,
-                                "X-OpenWebUI-User-Role": user.role,
-                            }
-                            if ENABLE_FORWARD_USER_INFO_HEADERS
-                            else {}
-                        ),
-                    },
-                ) as r:
-                    if r.status != 200:
-                        # Extract response error details if available
-                        error_detail = f"HTTP Error: {r.status}"
-                        res = await r.json()
-                        if "error" in res:
-                            error_detail = f"External Error: {res['error']}"
-                        raise Exception(error_detail)
-
-                    response_data = await r.json()
-
-                    # Check if we're calling OpenAI API based on the URL
-                    if "api.openai.com" in url:
-                        # Filter models according to the specified conditions
-                        response_data["data"] = [
-                            model
-                            for model in response_data.get("data", [])
-                            if not any(
-                                name in model["id"]
-                                for name in [
-                                    "babbage",
-                                    "dall-e",
-                                    "davinci",
-                                    "embedding",
-                                    "tts",
-                                    "whisper",
-                                ]
-                            )
-                        ]
-
-                    models = response_data
-            except aiohttp.ClientError as e:
-                # ClientError covers all aiohttp requests issues
-                log.exception(f"Client error: {str(e)}")
-                raise HTTPException(
-                    status_code=500, detail="Open WebUI: Server Connection Error"
-                )
-            except Exception as e:
-                log.exception(f"Unexpected error: {e}")
-                error_detail = f"Unexpected error: {str(e)}"
-                raise HTTPException(status_code=500, detail=error_detail)
-
-    if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
-        models["data"] = await get_filtered_models(models, user)
-
-    return models
-
-
-class ConnectionVerificationForm(BaseModel):
-    url: str
-    key: str
-
-
-@router.post("/verify")
-async def verify_connection(
-    form_data: ConnectionVerificationForm, user=Depends(get_admin_user)
-):
-    url = form_data.url
-    key = form_data.key
-
-    async with aiohttp.ClientSession(
-        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
-    ) as session:
+        session = HTTP_CLIENT_POOL.get_session(url)
         try:
             async with session.get(
                 f"{url}/models",
+                timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
                 headers={
                     "Authorization": f"Bearer {key}",
                     "Content-Type": "application/json",
@@ -557,8 +495,27 @@ async def verify_connection(
                     raise Exception(error_detail)
 
                 response_data = await r.json()
-                return response_data
 
+                # Check if we're calling OpenAI API based on the URL
+                if "api.openai.com" in url:
+                    # Filter models according to the specified conditions
+                    response_data["data"] = [
+                        model
+                        for model in response_data.get("data", [])
+                        if not any(
+                            name in model["id"]
+                            for name in [
+                                "babbage",
+                                "dall-e",
+                                "davinci",
+                                "embedding",
+                                "tts",
+                                "whisper",
+                            ]
+                        )
+                    ]
+
+                models = response_data
         except aiohttp.ClientError as e:
             # ClientError covers all aiohttp requests issues
             log.exception(f"Client error: {str(e)}")
@@ -570,64 +527,70 @@ async def verify_connection(
             error_detail = f"Unexpected error: {str(e)}"
             raise HTTPException(status_code=500, detail=error_detail)
 
+    if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
+        models["data"] = await get_filtered_models(models, user)
 
-@router.post("/chat/completions")
-async def generate_chat_completion(
-    request: Request,
-    form_data: dict,
-    user=Depends(get_verified_user),
-    bypass_filter: Optional[bool] = False,
-):
-    if BYPASS_MODEL_ACCESS_CONTROL:
-        bypass_filter = True
+    return models
 
-    idx = 0
 
-    payload = {**form_data}
-    metadata = payload.pop("metadata", None)
+class ConnectionVerificationForm(BaseModel):
+    url: str
+    key: str
 
-    model_id = form_data.get("model")
-    model_info = Models.get_model_by_id(model_id)
 
-    # Check model info and override the payload
-    if model_info:
-        if model_info.base_model_id:
-            payload["model"] = model_info.base_model_id
-            model_id = model_info.base_model_id
+@router.post("/verify")
+async def verify_connection(
+    form_data: ConnectionVerificationForm, user=Depends(get_admin_user)
+):
+    url = form_data.url
+    key = form_data.key
 
-        params = model_info.params.model_dump()
-        payload = apply_model_params_to_body_openai(params, payload)
-        payload = apply_model_system_prompt_to_body(params, payload, metadata, user)
+    session = HTTP_CLIENT_POOL.get_session(url)
+    try:
+        async with session.get(
+            f"{url}/models",
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
+            headers={
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json",
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS
+                    else {}
+                ),
+            },
+        ) as r:
+            if r.status != 200:
+                # Extract response error details if available
+                error_detail = f"HTTP Error: {r.status}"
+                res = await r.json()
+                if "error" in res:
+                    error_detail = f"External Error: {res['error']}"
+                raise Exception(error_detail)
 
-        # Check if user has access to the model
-        if not bypass_filter and user.role == "user":
-            if not (
-                user.id == model_info.user_id
-                or has_access(
-                    user.id, type="read", access_control=model_info.access_control
-                )
-            ):
-                raise HTTPException(
-                    status_code=403,
-                    detail="Model not found",
-                )
-    elif not bypass_filter:
-        if user.role != "admin":
-            raise HTTPException(
-                status_code=403,
-                detail="Model not found",
-            )
+            response_data = await r.json()
+            return response_data
 
-    await get_all_models(request, user=user)
-    model = request.app.state.OPENAI_MODELS.get(model_id)
-    if model:
-        idx = model["urlIdx"]
-    else:
+    except aiohttp.ClientError as e:
+        # ClientError covers all aiohttp requests issues
+        log.exception(f"Client error: {str(e)}")
         raise HTTPException(
-            status_code=404,
-            detail="Model not found",
+            status_code=500, detail="Open WebUI: Server Connection Error"
         )
+    except Exception as e:
+        log.exception(f"Unexpected error: {e}")
+        error_detail = f"Unexpected error: {str(e)}"
+        raise HTTPException(status_code=500, detail=error_detail)
+
 
+async def send_chat_completion_request(
+    request: Request, idx: int, payload: dict, model: dict, user: UserModel
+):
     # Get the API config for the model
     api_config = request.app.state.config.OPENAI_API_CONFIGS.get(
         str(idx),
@@ -669,19 +632,20 @@ async def generate_chat_completion(
     payload = json.dumps(payload)
 
     r = None
-    session = None
     streaming = False
     response = None
 
+    end = OPENAI_LOAD_BALANCER.begin(url)
+    started_at = time.monotonic()
+
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
+        session = HTTP_CLIENT_POOL.get_session(url)
 
         r = await session.request(
             method="POST",
             url=f"{url}/chat/completions",
             data=payload,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             headers={
                 "Authorization": f"Bearer {key}",
                 "Content-Type": "application/json",
@@ -705,6 +669,9 @@ async def generate_chat_completion(
                 ),
             },
         )
+        OPENAI_LOAD_BALANCER.record(
+            url, time.monotonic() - started_at, failed=r.status >= 500
+        )
 
         # Check if response is SSE
         if "text/event-stream" in r.headers.get("Content-Type", ""):
@@ -713,9 +680,7 @@ async def generate_chat_completion(
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r, end=end),
             )
         else:
             try:
@@ -727,6 +692,12 @@ async def generate_chat_completion(
             r.raise_for_status()
             return response
     except Exception as e:
+        if r is None:
+            OPENAI_LOAD_BALANCER.record(url, failed=True)
+            if isinstance(e, aiohttp.ClientConnectorError):
+                # Retried on another connection serving the model
+                raise
+
         log.exception(e)
 
         detail = None
@@ -741,10 +712,94 @@ async def generate_chat_completion(
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not streaming and session:
-            if r:
-                r.close()
-            await session.close()
+        if not streaming:
+            await cleanup_response(r, end)
+
+
+@router.post("/chat/completions")
+async def generate_chat_completion(
+    request: Request,
+    form_data: dict,
+    user=Depends(get_verified_user),
+    bypass_filter: Optional[bool] = False,
+):
+    if BYPASS_MODEL_ACCESS_CONTROL:
+        bypass_filter = True
+
+    payload = {**form_data}
+    metadata = payload.pop("metadata", None)
+
+    model_id = form_data.get("model")
+    model_info = Models.get_model_by_id(model_id)
+
+    # Check model info and override the payload
+    if model_info:
+        if model_info.base_model_id:
+            payload["model"] = model_info.base_model_id
+            model_id = model_info.base_model_id
+
+        params = model_info.params.model_dump()
+        payload = apply_model_params_to_body_openai(params, payload)
+        payload = apply_model_system_prompt_to_body(params, payload, metadata, user)
+
+        # Check if user has access to the model
+        if not bypass_filter and user.role == "user":
+            if not (
+                user.id == model_info.user_id
+                or has_access(
+                    user.id, type="read", access_control=model_info.access_control
+                )
+            ):
+                raise HTTPException(
+                    status_code=403,
+                    detail="Model not found",
+                )
+    elif not bypass_filter:
+        if user.role != "admin":
+            raise HTTPException(
+                status_code=403,
+                detail="Model not found",
+            )
+
+    await get_all_models(request, user=user)
+    model = request.app.state.OPENAI_MODELS.get(model_id)
+    if not model:
+        raise HTTPException(
+            status_code=404,
+            detail="Model not found",
+        )
+
+    # Models served by several connections are balanced across them
+    urls = {
+        request.app.state.config.OPENAI_API_BASE_URLS[idx]: idx
+        for idx in model.get("urlIdxs", [model["urlIdx"]])
+        if idx < len(request.app.state.config.OPENAI_API_BASE_URLS)
+    }
+
+    tried = set()
+    while True:
+        url = OPENAI_LOAD_BALANCER.choose(list(urls), exclude=tried)
+        if url is None:
+            raise HTTPException(
+                status_code=500,
+                detail="Open WebUI: Server Connection Error",
+            )
+
+        try:
+            return await send_chat_completion_request(
+                request, urls[url], {**payload}, model, user
+            )
+        except aiohttp.ClientConnectorError as e:
+            log.warning(f"Could not connect to {url}: {e}")
+            tried.add(url)
+
+
+@router.get("/backends")
+async def get_backends(request: Request, user=Depends(get_admin_user)):
+    # Load balancer stats of each OpenAI base URL
+    return OPENAI_LOAD_BALANCER.get_all_stats(
+        request.app.state.config.OPENAI_API_BASE_URLS
+    )
 
 
 @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
@@ -760,11 +815,10 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
     key = request.app.state.config.OPENAI_API_KEYS[idx]
 
     r = None
-    session = None
     streaming = False
 
     try:
-        session = aiohttp.ClientSession(trust_env=True)
+        session = HTTP_CLIENT_POOL.get_session(url)
         r = await session.request(
             method=request.method,
             url=f"{url}/{path}",
@@ -793,9 +847,7 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
                 r.content,
                 status_code=r.status,
                 headers=dict(r.headers),
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup_response, response=r),
             )
         else:
             response_data = await r.json()
@@ -818,7 +870,5 @@ async def proxy(path: str, request: Request, user=Depends(get_verified_user)):
             detail=detail if detail else "Open WebUI: Server Connection Error",
         )
     finally:
-        if not streaming and session:
-            if r:
-                r.close()
-            await session.close()
+        if not streaming and r:
+            r.release()
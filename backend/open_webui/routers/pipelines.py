@@ -24,6 +24,8 @@ from open_webui.constants import ERROR_MESSAGES
 
 
 from open_webui.routers.openai import get_all_models_responses
+from open_webui.utils.http_client import HTTP_CLIENT_POOL
+from open_webui.utils.models import MODEL_CATALOGUE
 
 from open_webui.utils.auth import get_admin_user
 
@@ -66,42 +68,43 @@ async def process_pipeline_inlet_filter(request, payload, user, models):
     if "pipeline" in model:
         sorted_filters.append(model)
 
-    async with aiohttp.ClientSession() as session:
-        for filter in sorted_filters:
-            urlIdx = filter.get("urlIdx")
-            if urlIdx is None:
-                continue
+    for filter in sorted_filters:
+        urlIdx = filter.get("urlIdx")
+        if urlIdx is None:
+            continue
 
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
-
-            if not key:
-                continue
-
-            headers = {"Authorization": f"Bearer {key}"}
-            request_data = {
-                "user": user,
-                "body": payload,
-            }
+        url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
+        key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
 
-            try:
-                async with session.post(
-                    f"{url}/{filter['id']}/filter/inlet",
-                    headers=headers,
-                    json=request_data,
-                ) as response:
-                    response.raise_for_status()
-                    payload = await response.json()
-            except aiohttp.ClientResponseError as e:
-                res = (
-                    await response.json()
-                    if response.content_type == "application/json"
-                    else {}
-                )
-                if "detail" in res:
-                    raise Exception(response.status, res["detail"])
-            except Exception as e:
-                log.exception(f"Connection error: {e}")
+        if not key:
+            continue
+
+        session = HTTP_CLIENT_POOL.get_session(url)
+
+        headers = {"Authorization": f"Bearer {key}"}
+        request_data = {
+            "user": user,
+            "body": payload,
+        }
+
+        try:
+            async with session.post(
+                f"{url}/{filter['id']}/filter/inlet",
+                headers=headers,
+                json=request_data,
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json()
+        except aiohttp.ClientResponseError as e:
+            res = (
+                await response.json()
+                if response.content_type == "application/json"
+                else {}
+            )
+            if "detail" in res:
+                raise Exception(response.status, res["detail"])
+        except Exception as e:
+            log.exception(f"Connection error: {e}")
 
     return payload
 
@@ -115,45 +118,46 @@ async def process_pipeline_outlet_filter(request, payload, user, models):
     if "pipeline" in model:
         sorted_filters = [model] + sorted_filters
 
-    async with aiohttp.ClientSession() as session:
-        for filter in sorted_filters:
-            urlIdx = filter.get("urlIdx")
-            if urlIdx is None:
-                continue
-
-            url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
-            key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
-
-            if not key:
-                continue
+    for filter in sorted_filters:
+        urlIdx = filter.get("urlIdx")
+        if urlIdx is None:
+            continue
 
-            headers = {"Authorization": f"Bearer {key}"}
-            request_data = {
-                "user": user,
-                "body": payload,
-            }
+        url = request.app.state.config.OPENAI_API_BASE_URLS[urlIdx]
+        key = request.app.state.config.OPENAI_API_KEYS[urlIdx]
 
+        if not key:
+            continue
+
+        session = HTTP_CLIENT_POOL.get_session(url)
+
+        headers = {"Authorization": f"Bearer {key}"}
+        request_data = {
+            "user": user,
+            "body": payload,
+        }
+
+        try:
+            async with session.post(
+                f"{url}/{filter['id']}/filter/outlet",
+                headers=headers,
+                json=request_data,
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json()
+        except aiohttp.ClientResponseError as e:
             try:
-                async with session.post(
-                    f"{url}/{filter['id']}/filter/outlet",
-                    headers=headers,
-                    json=request_data,
-                ) as response:
-                    response.raise_for_status()
-                    payload = await response.json()
-            except aiohttp.ClientResponseError as e:
-                try:
-                    res = (
-                        await response.json()
-                        if "application/json" in response.content_type
-                        else {}
-                    )
-                    if "detail" in res:
-                        raise Exception(response.status, res)
-                except Exception:
-                    pass
-            except Exception as e:
-                log.exception(f"Connection error: {e}")
+                res = (
+                    await response.json()
+                    if "application/json" in response.content_type
+                    else {}
+                )
+                if "detail" in res:
+                    raise Exception(response.status, res)
+            except Exception:
+                pass
+        except Exception as e:
+            log.exception(f"Connection error: {e}")
 
     return payload
 
@@ -228,6 +232,9 @@ async def upload_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # The pipelines are listed as models of the connection
+        MODEL_CATALOGUE.invalidate()
+
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -279,6 +286,9 @@ async def add_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # The pipelines are listed as models of the connection
+        MODEL_CATALOGUE.invalidate()
+
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -324,6 +334,9 @@ async def delete_pipeline(
         r.raise_for_status()
         data = r.json()
 
+        # The pipelines are listed as models of the connection
+        MODEL_CATALOGUE.invalidate()
+
         return {**data}
     except Exception as e:
         # Handle connection error here
@@ -19,21 +19,29 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[PromptModel])
-async def get_prompts(user=Depends(get_verified_user)):
+async def get_prompts(
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        prompts = Prompts.get_prompts()
+        prompts = Prompts.get_prompts(skip, limit)
     else:
-        prompts = Prompts.get_prompts_by_user_id(user.id, "read")
+        prompts = Prompts.get_prompts_by_user_id(user.id, "read", skip, limit)
 
     return prompts
 
 
 @router.get("/list", response_model=list[PromptUserResponse])
-async def get_prompt_list(user=Depends(get_verified_user)):
+async def get_prompt_list(
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        prompts = Prompts.get_prompts()
+        prompts = Prompts.get_prompts(skip, limit)
     else:
-        prompts = Prompts.get_prompts_by_user_id(user.id, "write")
+        prompts = Prompts.get_prompts_by_user_id(user.id, "write", skip, limit)
 
     return prompts
 
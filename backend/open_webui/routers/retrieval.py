@@ -31,10 +31,12 @@ from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, Files
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.jobs import JobResponse, Jobs
 from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.sparse import SPARSE_INDEX
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -73,6 +75,7 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.jobs import INGESTION_QUEUE
 
 
 from open_webui.config import (
@@ -850,11 +853,15 @@ def save_docs_to_vector_db(
                 metadata[key] = str(value)
 
     try:
-        if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        collection_exists = VECTOR_DB_CLIENT.has_collection(
+            collection_name=collection_name
+        )
+        if collection_exists:
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                SPARSE_INDEX.delete_collection(collection_name=collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -898,6 +905,10 @@ def save_docs_to_vector_db(
             collection_name=collection_name,
             items=items,
         )
+        SPARSE_INDEX.insert(
+            collection_name=collection_name,
+            items=items,
+        )
 
         return True
     except Exception as e:
@@ -916,7 +927,17 @@ def process_file(
     request: Request,
     form_data: ProcessFileForm,
     user=Depends(get_verified_user),
+    background: bool = False,
 ):
+    if background:
+        job = INGESTION_QUEUE.enqueue(user, "process_file", form_data.model_dump())
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERROR_MESSAGES.DEFAULT("Error scheduling the file processing"),
+            )
+        return {"status": True, "job_id": job.id}
+
     try:
         file = Files.get_file_by_id(form_data.file_id)
 
@@ -932,6 +953,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                SPARSE_INDEX.delete_collection(collection_name=f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1088,6 +1110,35 @@ def process_file(
             )
 
 
+@INGESTION_QUEUE.register("process_file")
+def process_file_job(request, job, user, report):
+    report({"stage": "processing"})
+    result = process_file(request, ProcessFileForm(**job.data), user=user)
+    # The extracted content is stored with the file, no need to keep it twice
+    return {key: value for key, value in result.items() if key != "content"}
+
+
+############################
+# Jobs
+############################
+
+
+@router.get("/jobs", response_model=list[JobResponse])
+def get_jobs(skip: int = 0, limit: int = 50, user=Depends(get_verified_user)):
+    return Jobs.get_jobs_by_user_id(user.id, skip=skip, limit=limit)
+
+
+@router.get("/jobs/{id}", response_model=JobResponse)
+def get_job_by_id(id: str, user=Depends(get_verified_user)):
+    job = Jobs.get_job_by_id(id)
+    if not job or (job.user_id != user.id and user.role != "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+    return job
+
+
 class ProcessTextForm(BaseModel):
     name: str
     content: str
@@ -1417,8 +1468,12 @@ async def process_web_search(
         logging.info(
             f"trying to web search with {request.app.state.config.RAG_WEB_SEARCH_ENGINE, form_data.query}"
         )
-        web_results = search_web(
-            request, request.app.state.config.RAG_WEB_SEARCH_ENGINE, form_data.query
+        # The search engine clients are blocking, keep them off the event loop
+        web_results = await run_in_threadpool(
+            search_web,
+            request,
+            request.app.state.config.RAG_WEB_SEARCH_ENGINE,
+            form_data.query,
         )
     except Exception as e:
         log.exception(e)
@@ -1430,12 +1485,29 @@ async def process_web_search(
 
     log.debug(f"web_results: {web_results}")
 
+    return await process_web_search_results(
+        request,
+        form_data.query,
+        web_results,
+        collection_name=form_data.collection_name,
+        user=user,
+    )
+
+
+async def process_web_search_results(
+    request: Request,
+    query: str,
+    web_results: list[SearchResult],
+    collection_name: Optional[str] = None,
+    user=None,
+):
+    """
+    Load the pages of the results of a web search and save them to a collection,
+    or return them as documents when embedding is bypassed.
+    """
     try:
-        collection_name = form_data.collection_name
         if collection_name == "" or collection_name is None:
-            collection_name = f"web-search-{calculate_sha256_string(form_data.query)}"[
-                :63
-            ]
+            collection_name = f"web-search-{calculate_sha256_string(query)}"[:63]
 
         urls = [result.link for result in web_results]
         loader = get_web_loader(
@@ -1603,6 +1675,10 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            SPARSE_INDEX.delete(
+                collection_name=form_data.collection_name,
+                filter={"hash": hash},
+            )
             return {"status": True}
         else:
             return {"status": False}
@@ -1614,6 +1690,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    SPARSE_INDEX.reset()
     Knowledges.delete_all_knowledge()
 
 
@@ -1668,10 +1745,40 @@ def process_files_batch(
     request: Request,
     form_data: BatchProcessFilesForm,
     user=Depends(get_verified_user),
-) -> BatchProcessFilesResponse:
+    background: bool = False,
+):
     """
-    Process a batch of files and save them to the vector database.
+    Process a batch of files and save them to the vector database. With
+    `background=true` the batch is processed by the ingestion queue and the id
+    of the job is returned instead.
     """
+    if background:
+        job = INGESTION_QUEUE.enqueue(
+            user, "process_files_batch", form_data.model_dump()
+        )
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERROR_MESSAGES.DEFAULT("Error scheduling the batch processing"),
+            )
+        return {"status": True, "job_id": job.id}
+
+    return save_files_batch(request, form_data, user)
+
+
+@INGESTION_QUEUE.register("process_files_batch")
+def process_files_batch_job(request, job, user, report):
+    return save_files_batch(
+        request, BatchProcessFilesForm(**job.data), user, report=report
+    ).model_dump()
+
+
+def save_files_batch(
+    request: Request,
+    form_data: BatchProcessFilesForm,
+    user,
+    report=None,
+) -> BatchProcessFilesResponse:
     results: List[BatchProcessFilesResult] = []
     errors: List[BatchProcessFilesResult] = []
     collection_name = form_data.collection_name
@@ -1702,6 +1809,15 @@ def process_files_batch(
             all_docs.extend(docs)
             results.append(BatchProcessFilesResult(file_id=file.id, status="prepared"))
 
+            if report:
+                report(
+                    {
+                        "stage": "preparing",
+                        "completed": len(results) + len(errors),
+                        "total": len(form_data.files),
+                    }
+                )
+
         except Exception as e:
             log.error(f"process_files_batch: Error processing file {file.id}: {str(e)}")
             errors.append(
@@ -1710,6 +1826,9 @@ def process_files_batch(
 
     # Save all documents in one batch
     if all_docs:
+        if report:
+            report({"stage": "embedding", "total": len(form_data.files)})
+
         try:
             save_docs_to_vector_db(
                 request=request,
@@ -30,11 +30,15 @@ router = APIRouter()
 
 
 @router.get("/", response_model=list[ToolUserResponse])
-async def get_tools(user=Depends(get_verified_user)):
+async def get_tools(
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        tools = Tools.get_tools()
+        tools = Tools.get_tools(skip, limit)
     else:
-        tools = Tools.get_tools_by_user_id(user.id, "read")
+        tools = Tools.get_tools_by_user_id(user.id, "read", skip, limit)
     return tools
 
 
@@ -44,11 +48,15 @@ async def get_tools(user=Depends(get_verified_user)):
 
 
 @router.get("/list", response_model=list[ToolUserResponse])
-async def get_tool_list(user=Depends(get_verified_user)):
+async def get_tool_list(
+    skip: Optional[int] = None,
+    limit: Optional[int] = None,
+    user=Depends(get_verified_user),
+):
     if user.role == "admin":
-        tools = Tools.get_tools()
+        tools = Tools.get_tools(skip, limit)
     else:
-        tools = Tools.get_tools_by_user_id(user.id, "write")
+        tools = Tools.get_tools_by_user_id(user.id, "write", skip, limit)
     return tools
 
 
@@ -1,5 +1,6 @@
 import asyncio
 import socketio
+import redis.asyncio as aioredis
 import logging
 import sys
 import time
@@ -13,9 +14,20 @@ from open_webui.env import (
     WEBSOCKET_MANAGER,
     WEBSOCKET_REDIS_URL,
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
+    WEBSOCKET_REDIS_CACHE_TTL,
+    WEBSOCKET_EVENT_COALESCE_INTERVAL,
+    WEBSOCKET_EVENT_DELTA_FRAMES,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    AsyncDict,
+    AsyncSetDict,
+    AsyncRedisDict,
+    AsyncRedisSetDict,
+    AsyncRedisLock,
+    ChatEventBuffer,
+)
+from open_webui.utils.message_store import MESSAGE_STORE
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -55,12 +67,24 @@ TIMEOUT_DURATION = 3
 
 if WEBSOCKET_MANAGER == "redis":
     log.debug("Using Redis to manage websockets.")
-    SESSION_POOL = RedisDict("open-webui:session_pool", redis_url=WEBSOCKET_REDIS_URL)
-    USER_POOL = RedisDict("open-webui:user_pool", redis_url=WEBSOCKET_REDIS_URL)
-    USAGE_POOL = RedisDict("open-webui:usage_pool", redis_url=WEBSOCKET_REDIS_URL)
+    # A single connection pool is shared by all pools and the cleanup lock
+    redis_client = aioredis.Redis(
+        connection_pool=aioredis.ConnectionPool.from_url(
+            WEBSOCKET_REDIS_URL, decode_responses=True
+        )
+    )
 
-    clean_up_lock = RedisLock(
-        redis_url=WEBSOCKET_REDIS_URL,
+    SESSION_POOL = AsyncRedisDict(
+        "open-webui:session_pool", redis_client, cache_ttl=WEBSOCKET_REDIS_CACHE_TTL
+    )
+    # Session ids per user and session ids per model (scored by their last usage)
+    USER_POOL = AsyncRedisSetDict(
+        "open-webui:user_sessions", redis_client, cache_ttl=WEBSOCKET_REDIS_CACHE_TTL
+    )
+    USAGE_POOL = AsyncRedisSetDict("open-webui:model_usage", redis_client, cache_ttl=0)
+
+    clean_up_lock = AsyncRedisLock(
+        redis_client,
         lock_name="usage_cleanup_lock",
         timeout_secs=WEBSOCKET_REDIS_LOCK_TIMEOUT,
     )
@@ -68,51 +92,45 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
-    aquire_func = release_func = renew_func = lambda: True
+    SESSION_POOL = AsyncDict()
+    USER_POOL = AsyncSetDict()
+    USAGE_POOL = AsyncSetDict()
+
+    async def aquire_func():
+        return True
+
+    release_func = renew_func = aquire_func
+
+
+async def listen_for_pool_invalidations():
+    await asyncio.gather(SESSION_POOL.listen(), USER_POOL.listen())
 
 
 async def periodic_usage_pool_cleanup():
-    if not aquire_func():
+    if not await aquire_func():
         log.debug("Usage pool cleanup lock already exists. Not running it.")
         return
     log.debug("Running periodic_usage_pool_cleanup")
     try:
         while True:
-            if not renew_func():
+            if not await renew_func():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
             now = int(time.time())
             send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
+            for model_id in await USAGE_POOL.keys():
+                # Remove the sids that have timed out, and the model once none is left
+                await USAGE_POOL.remove(model_id, min_score=now - TIMEOUT_DURATION)
                 send_usage = True
 
             if send_usage:
                 # Emit updated usage information after cleaning
-                await sio.emit("usage", {"models": get_models_in_use()})
+                await sio.emit("usage", {"models": await get_models_in_use()})
 
             await asyncio.sleep(TIMEOUT_DURATION)
     finally:
-        release_func()
+        await release_func()
 
 
 app = socketio.ASGIApp(
@@ -121,9 +139,9 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
+    models_in_use = list(await USAGE_POOL.keys())
     return models_in_use
 
 
@@ -134,13 +152,10 @@ async def usage(sid, data):
     current_time = int(time.time())
 
     # Store the new usage data and task
-    USAGE_POOL[model_id] = {
-        **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-        sid: {"updated_at": current_time},
-    }
+    await USAGE_POOL.add(model_id, sid, score=current_time)
 
     # Broadcast the usage data to all clients
-    await sio.emit("usage", {"models": get_models_in_use()})
+    await sio.emit("usage", {"models": await get_models_in_use()})
 
 
 @sio.event
@@ -150,18 +165,15 @@ async def connect(sid, environ, auth):
         data = decode_token(auth["token"])
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await Users.get_user_by_id_async(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await SESSION_POOL.set(sid, user.model_dump())
+            await USER_POOL.add(user.id, sid)
 
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
+            await sio.emit("user-list", {"user_ids": await USER_POOL.keys()})
+            await sio.emit("usage", {"models": await get_models_in_use()})
 
 
 @sio.on("user-join")
@@ -175,15 +187,12 @@ async def user_join(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.get_user_by_id_async(data["id"])
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await SESSION_POOL.set(sid, user.model_dump())
+    await USER_POOL.add(user.id, sid)
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -193,7 +202,7 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await USER_POOL.keys()})
     return {"id": user.id, "name": user.name}
 
 
@@ -207,7 +216,7 @@ async def join_channel(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await Users.get_user_by_id_async(data["id"])
     if not user:
         return
 
@@ -240,7 +249,7 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(**(await SESSION_POOL.get(sid))).model_dump(),
             },
             room=room,
         )
@@ -248,54 +257,101 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await USER_POOL.keys()})
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
+    user = await SESSION_POOL.get(sid)
+    if user:
+        await SESSION_POOL.delete(sid)
 
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
+        await USER_POOL.remove(user["id"], sid)
 
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+        await sio.emit("user-list", {"user_ids": await USER_POOL.keys()})
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
 
 
-def get_event_emitter(request_info):
-    async def __event_emitter__(event_data):
-        user_id = request_info["user_id"]
-        session_ids = list(
-            set(USER_POOL.get(user_id, []) + [request_info["session_id"]])
+async def emit_chat_event(request_info, event_data):
+    user_id = request_info["user_id"]
+    session_ids = list(
+        set((await USER_POOL.get(user_id, [])) + [request_info["session_id"]])
+    )
+
+    for session_id in session_ids:
+        await sio.emit(
+            "chat-events",
+            {
+                "chat_id": request_info.get("chat_id", None),
+                "message_id": request_info.get("message_id", None),
+                "data": event_data,
+            },
+            to=session_id,
         )
 
-        for session_id in session_ids:
-            await sio.emit(
-                "chat-events",
-                {
-                    "chat_id": request_info.get("chat_id", None),
-                    "message_id": request_info.get("message_id", None),
-                    "data": event_data,
-                },
-                to=session_id,
-            )
+
+async def emit_user_event(user_id, event, data):
+    # Emit an event to every connected session of a user
+    for session_id in await USER_POOL.get(user_id, []):
+        await sio.emit(event, data, to=session_id)
+
+
+CHAT_EVENT_BUFFER = ChatEventBuffer(
+    emit_chat_event,
+    interval=WEBSOCKET_EVENT_COALESCE_INTERVAL / 1000,
+    delta_frames=WEBSOCKET_EVENT_DELTA_FRAMES,
+)
+
+
+def get_chat_event_key(request_info):
+    return (request_info.get("chat_id", None), request_info.get("message_id", None))
+
+
+@sio.on("chat-events:resync")
+async def chat_events_resync(sid, data):
+    user = await SESSION_POOL.get(sid)
+    if not user:
+        return
+
+    CHAT_EVENT_BUFFER.resync(get_chat_event_key(data))
+
+
+async def close_event_emitter(request_info):
+    """Emit any pending frame of a message and release its buffered state."""
+    await CHAT_EVENT_BUFFER.close(get_chat_event_key(request_info))
+
+
+def get_event_emitter(request_info, coalesce: bool = False):
+    """
+    Return an emitter for the chat events of a message. With `coalesce=True`,
+    streamed chat completion updates are batched into frames; every other event
+    flushes pending frames of the message before it is emitted.
+    """
+
+    async def __event_emitter__(event_data):
+        key = get_chat_event_key(request_info)
+        if coalesce:
+            await CHAT_EVENT_BUFFER.push(key, request_info, event_data)
+        else:
+            await CHAT_EVENT_BUFFER.send(key, request_info, event_data)
 
         if "type" in event_data and event_data["type"] == "status":
-            Chats.add_message_status_to_chat_by_id_and_message_id(
+            await Chats.add_message_status_to_chat_by_id_and_message_id_async(
                 request_info["chat_id"],
                 request_info["message_id"],
                 event_data.get("data", {}),
             )
 
+        if "type" in event_data and event_data["type"] in ("message", "replace"):
+            # Persist buffered stream content first so it is not lost or reordered
+            await MESSAGE_STORE.flush(
+                request_info["chat_id"], request_info["message_id"]
+            )
+
         if "type" in event_data and event_data["type"] == "message":
-            message = Chats.get_message_by_id_and_message_id(
+            message = await Chats.get_message_by_id_and_message_id_async(
                 request_info["chat_id"],
                 request_info["message_id"],
             )
@@ -303,7 +359,7 @@ def get_event_emitter(request_info):
             content = message.get("content", "")
             content += event_data.get("data", {}).get("content", "")
 
-            Chats.upsert_message_to_chat_by_id_and_message_id(
+            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                 request_info["chat_id"],
                 request_info["message_id"],
                 {
@@ -314,7 +370,7 @@ def get_event_emitter(request_info):
         if "type" in event_data and event_data["type"] == "replace":
             content = event_data.get("data", {}).get("content", "")
 
-            Chats.upsert_message_to_chat_by_id_and_message_id(
+            await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                 request_info["chat_id"],
                 request_info["message_id"],
                 {
@@ -344,28 +400,29 @@ def get_event_call(request_info):
 get_event_caller = get_event_call
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSION_POOL.get(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    # Fetch all sessions of the room in a single round-trip
+    sessions = await SESSION_POOL.get_many(
+        [session_id[0] for session_id in active_session_ids]
     )
+
+    active_user_ids = list(set([session["id"] for session in sessions if session]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
+async def get_active_status_by_user_id(user_id):
+    if await USER_POOL.contains(user_id):
         return True
     return False
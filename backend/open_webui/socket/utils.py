@@ -1,7 +1,17 @@
+import asyncio
 import json
+import logging
+import time
 import redis
 import uuid
 
+from redis.exceptions import WatchError
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
+
 
 class RedisLock:
     def __init__(self, redis_url, lock_name, timeout_secs):
@@ -85,3 +95,510 @@ class RedisDict:
         if key not in self:
             self[key] = default
         return self[key]
+
+
+class AsyncRedisLock:
+    def __init__(self, redis, lock_name, timeout_secs):
+        self.lock_name = lock_name
+        self.lock_id = str(uuid.uuid4())
+        self.timeout_secs = timeout_secs
+        self.lock_obtained = False
+        self.redis = redis
+
+    async def aquire_lock(self):
+        # nx=True will only set this key if it _hasn't_ already been set
+        self.lock_obtained = await self.redis.set(
+            self.lock_name, self.lock_id, nx=True, ex=self.timeout_secs
+        )
+        return self.lock_obtained
+
+    async def renew_lock(self):
+        # xx=True will only set this key if it _has_ already been set
+        return await self.redis.set(
+            self.lock_name, self.lock_id, xx=True, ex=self.timeout_secs
+        )
+
+    async def release_lock(self):
+        lock_value = await self.redis.get(self.lock_name)
+        if lock_value and lock_value == self.lock_id:
+            await self.redis.delete(self.lock_name)
+
+
+class AsyncDict:
+    """
+    In-memory pool with the same asynchronous interface as `AsyncRedisDict`, used
+    when websockets are not managed through Redis.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    async def get_many(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def contains(self, key):
+        return key in self.data
+
+    async def keys(self):
+        return list(self.data.keys())
+
+    async def values(self):
+        return list(self.data.values())
+
+    async def items(self):
+        return list(self.data.items())
+
+    async def listen(self):
+        pass
+
+
+class AsyncSetDict(AsyncDict):
+    """
+    In-memory pool of sets with the same asynchronous interface as
+    `AsyncRedisSetDict`. Values are lists of members.
+    """
+
+    async def get(self, key, default=None):
+        members = self.data.get(key)
+        return list(members) if members else default
+
+    async def get_many(self, keys):
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key, members):
+        self.data[key] = {member: 0 for member in members}
+
+    async def values(self):
+        return [list(members) for members in self.data.values()]
+
+    async def items(self):
+        return [(key, list(members)) for key, members in self.data.items()]
+
+    async def add(self, key, member, score: float = 0):
+        self.data.setdefault(key, {})[member] = score
+
+    async def remove(self, key, member=None, min_score: float = None):
+        members = self.data.get(key, {})
+        if member is not None:
+            members.pop(member, None)
+        if min_score is not None:
+            for _member, score in list(members.items()):
+                if score < min_score:
+                    del members[_member]
+
+        if not members:
+            self.data.pop(key, None)
+
+
+class AsyncRedisDict:
+    """
+    Redis hash backed pool for asyncio code.
+
+    All pools share one connection pool. Writes are pipelined together with an
+    invalidation message on `<name>:invalidate`, multi-key reads use a single
+    HMGET, and single-key reads go through a short-lived local cache that is
+    invalidated over pub/sub while `listen()` is running.
+    """
+
+    def __init__(self, name, redis, cache_ttl: float = 3):
+        self.name = name
+        self.redis = redis
+        self.channel = f"{name}:invalidate"
+
+        self.cache_ttl = cache_ttl
+        self.cache = {}
+        self.generation = 0
+        self.listening = False
+
+    def invalidate(self, key=None):
+        self.generation += 1
+        if key is None:
+            self.cache.clear()
+        else:
+            self.cache.pop(key, None)
+
+    async def get(self, key, default=None):
+        if self.listening and self.cache_ttl > 0:
+            entry = self.cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1] if entry[1] is not None else default
+
+        generation = self.generation
+        value = await self.fetch(key)
+
+        # Skip caching if the key was invalidated while it was being read
+        if self.listening and self.cache_ttl > 0 and generation == self.generation:
+            self.cache[key] = (time.monotonic() + self.cache_ttl, value)
+
+        return value if value is not None else default
+
+    async def fetch(self, key):
+        value = await self.redis.hget(self.name, key)
+        return json.loads(value) if value is not None else None
+
+    async def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return []
+
+        values = await self.redis.hmget(self.name, keys)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def set(self, key, value):
+        self.invalidate(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self.name, key, json.dumps(value))
+            pipe.publish(self.channel, key)
+            await pipe.execute()
+
+    async def delete(self, key):
+        self.invalidate(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hdel(self.name, key)
+            pipe.publish(self.channel, key)
+            result, _ = await pipe.execute()
+        return result > 0
+
+    async def contains(self, key):
+        return await self.get(key) is not None
+
+    async def keys(self):
+        return await self.redis.hkeys(self.name)
+
+    async def values(self):
+        return [json.loads(v) for v in await self.redis.hvals(self.name)]
+
+    async def items(self):
+        return [
+            (k, json.loads(v)) for k, v in (await self.redis.hgetall(self.name)).items()
+        ]
+
+    async def clear(self):
+        self.invalidate()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self.name)
+            pipe.publish(self.channel, "")
+            await pipe.execute()
+
+    async def listen(self):
+        """Keep the local cache coherent with writes made by other nodes."""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self.invalidate()
+                    self.listening = True
+
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.invalidate(message.get("data") or None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Lost invalidation channel {self.channel}: {e}")
+            finally:
+                self.listening = False
+                self.invalidate()
+
+            await asyncio.sleep(1)
+
+
+class AsyncRedisSetDict(AsyncRedisDict):
+    """
+    Redis backed pool of sets, e.g. the session ids of each user.
+
+    The members of a key are kept in a sorted set at `<name>:<key>` and `<name>`
+    is the set of keys with members. Members are added and removed with atomic
+    transactions instead of rewriting the whole value, so concurrent updates from
+    any node don't overwrite each other. Only `get` reads through the local
+    cache; updates never depend on it.
+    """
+
+    def get_set_name(self, key):
+        return f"{self.name}:{key}"
+
+    async def fetch(self, key):
+        return await self.redis.zrange(self.get_set_name(key), 0, -1) or None
+
+    async def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return []
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.zrange(self.get_set_name(key), 0, -1)
+            return [members or None for members in await pipe.execute()]
+
+    async def set(self, key, members):
+        self.invalidate(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.get_set_name(key))
+            if members:
+                pipe.zadd(self.get_set_name(key), {member: 0 for member in members})
+                pipe.sadd(self.name, key)
+            else:
+                pipe.srem(self.name, key)
+            pipe.publish(self.channel, key)
+            await pipe.execute()
+
+    async def add(self, key, member, score: float = 0):
+        """Add `member` to the set of `key`, or update its score."""
+        self.invalidate(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.get_set_name(key), {member: score})
+            pipe.sadd(self.name, key)
+            pipe.publish(self.channel, key)
+            await pipe.execute()
+
+    async def remove(self, key, member=None, min_score: float = None):
+        """
+        Remove `member`, and with `min_score` every member scored below it, from
+        the set of `key`. The key is dropped once it has no members left.
+        """
+        set_name = self.get_set_name(key)
+
+        self.invalidate(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    # The transaction fails if the set changes before it runs
+                    await pipe.watch(set_name)
+                    remaining = set(
+                        await pipe.zrangebyscore(
+                            set_name,
+                            min_score if min_score is not None else "-inf",
+                            "+inf",
+                        )
+                    )
+                    remaining.discard(member)
+
+                    pipe.multi()
+                    if member is not None:
+                        pipe.zrem(set_name, member)
+                    if min_score is not None:
+                        pipe.zremrangebyscore(set_name, "-inf", f"({min_score}")
+                    if not remaining:
+                        pipe.srem(self.name, key)
+                    pipe.publish(self.channel, key)
+                    await pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    async def delete(self, key):
+        self.invalidate(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.get_set_name(key))
+            pipe.srem(self.name, key)
+            pipe.publish(self.channel, key)
+            result, _, _ = await pipe.execute()
+        return result > 0
+
+    async def keys(self):
+        return list(await self.redis.smembers(self.name))
+
+    async def values(self):
+        return [members for _, members in await self.items()]
+
+    async def items(self):
+        keys = await self.keys()
+        return [
+            (key, members)
+            for key, members in zip(keys, await self.get_many(keys))
+            if members
+        ]
+
+    async def clear(self):
+        self.invalidate()
+        keys = await self.keys()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.delete(self.get_set_name(key))
+            pipe.delete(self.name)
+            pipe.publish(self.channel, "")
+            await pipe.execute()
+
+
+def get_utf16_length(text: str) -> int:
+    """Length of `text` in UTF-16 code units, as JavaScript strings count it."""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+class ChatEventBuffer:
+    """
+    Coalesces streamed `chat:completion` events per (chat_id, message_id).
+
+    Streaming updates are merged in memory and emitted as a single frame once per
+    `interval` seconds. Any other event for the same message first flushes the
+    pending frame so ordering is preserved. With `delta_frames` enabled, content
+    that only grew since the last frame is sent as `content_delta`, along with the
+    `content_offset` (in UTF-16 code units) it starts at. A client whose content
+    doesn't end at that offset has missed frames and can ask for the full content
+    with `resync`.
+    """
+
+    def __init__(self, emit, interval: float, delta_frames: bool = False):
+        self.emit = emit
+        self.interval = interval
+        self.delta_frames = delta_frames
+
+        self.pending = {}
+        self.locks = {}
+        # key -> (emitted content, its UTF-16 length)
+        self.emitted_content = {}
+        self.flush_tasks: set[asyncio.Task] = set()
+
+    def merge(self, pending_data, data):
+        if "choices" in data:
+            # Raw completion chunks, only plain content deltas can be merged
+            choices = data.get("choices") or []
+            delta = choices[0].get("delta", {}) if len(choices) == 1 else None
+            if (
+                not delta
+                or set(delta.keys()) - {"role", "content"}
+                or choices[0].get("finish_reason")
+                or set(data.keys()) - {"id", "object", "created", "model", "choices"}
+            ):
+                return None
+
+            if not pending_data:
+                return data
+
+            if "choices" not in pending_data:
+                return None
+
+            pending_delta = pending_data["choices"][0]["delta"]
+            return {
+                **pending_data,
+                "choices": [
+                    {
+                        **pending_data["choices"][0],
+                        "delta": {
+                            **pending_delta,
+                            "content": f"{pending_delta.get('content') or ''}{delta.get('content') or ''}",
+                        },
+                    }
+                ],
+            }
+
+        if set(data.keys()) - {"content", "usage"} or "choices" in pending_data:
+            return None
+
+        return {**pending_data, **data}
+
+    async def push(self, key, request_info, event_data):
+        data = event_data.get("data")
+        if (
+            self.interval <= 0
+            or event_data.get("type") != "chat:completion"
+            or not isinstance(data, dict)
+        ):
+            return await self.send(key, request_info, event_data)
+
+        entry = self.pending.get(key)
+        merged = self.merge(entry["data"] if entry else {}, data)
+        if merged is None:
+            return await self.send(key, request_info, event_data)
+
+        if entry is None:
+            entry = self.pending[key] = {
+                "request_info": request_info,
+                "timer": asyncio.get_running_loop().call_later(
+                    self.interval, self.schedule_flush, key
+                ),
+            }
+        entry["data"] = merged
+
+    def schedule_flush(self, key):
+        task = asyncio.create_task(self.flush(key))
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.on_flush_done)
+
+    def on_flush_done(self, task: asyncio.Task):
+        self.flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"Error emitting a chat event frame: {task.exception()}")
+
+    async def flush(self, key):
+        entry = self.pending.pop(key, None)
+        if entry is None:
+            return
+
+        entry["timer"].cancel()
+        await self.emit_frame(
+            key,
+            entry["request_info"],
+            {"type": "chat:completion", "data": entry["data"]},
+        )
+
+    async def send(self, key, request_info, event_data):
+        """Emit an event right away, after any frame still pending for the message."""
+        await self.flush(key)
+        await self.emit_frame(key, request_info, event_data)
+
+        data = event_data.get("data")
+        if event_data.get("type") == "task-cancelled" or (
+            isinstance(data, dict) and data.get("done")
+        ):
+            self.locks.pop(key, None)
+            self.emitted_content.pop(key, None)
+
+    async def close(self, key):
+        """Emit the pending frame of a message and drop everything kept for it."""
+        try:
+            await self.flush(key)
+        finally:
+            self.locks.pop(key, None)
+            self.emitted_content.pop(key, None)
+
+    def resync(self, key):
+        """Send the full content of a message in its next frame."""
+        self.emitted_content.pop(key, None)
+
+    async def emit_frame(self, key, request_info, event_data):
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks[key] = asyncio.Lock()
+
+        async with lock:
+            data = event_data.get("data")
+            if (
+                self.delta_frames
+                and event_data.get("type") == "chat:completion"
+                and isinstance(data, dict)
+                and isinstance(data.get("content"), str)
+            ):
+                content = data["content"]
+                emitted_content, emitted_length = self.emitted_content.get(
+                    key, (None, 0)
+                )
+
+                if (
+                    not data.get("done")
+                    and emitted_content is not None
+                    and content.startswith(emitted_content)
+                ):
+                    content_delta = content[len(emitted_content) :]
+
+                    data = {k: v for k, v in data.items() if k != "content"}
+                    data["content_delta"] = content_delta
+                    data["content_offset"] = emitted_length
+                    event_data = {**event_data, "data": data}
+
+                    length = emitted_length + get_utf16_length(content_delta)
+                else:
+                    length = get_utf16_length(content)
+
+                self.emitted_content[key] = (content, length)
+
+            await self.emit(request_info, event_data)
@@ -1,24 +1,281 @@
 # tasks.py
 import asyncio
-from typing import Dict
+import json
+import logging
+import time
+from typing import Dict, Optional
 from uuid import uuid4
 
-# A dictionary to keep track of active tasks
+from redis import asyncio as aioredis
+
+from open_webui.env import (
+    TASK_MANAGER,
+    TASK_REDIS_URL,
+    TASK_WORKER_LEASE_TTL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# A dictionary to keep track of the tasks running in this process
 tasks: Dict[str, asyncio.Task] = {}
 
+# Identifies this process in the task registry
+WORKER_ID = str(uuid4())
+
+# Seconds to wait for a task running on another worker to be stopped
+STOP_TIMEOUT = 5
+
+
+class LocalTaskRegistry:
+    """
+    In-memory registry of the running tasks, used when the app runs as a single
+    process, where all tasks are in `tasks`.
+    """
+
+    def __init__(self):
+        self.tasks: dict[str, dict] = {}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def register(self, task_id: str, info: dict):
+        self.tasks[task_id] = info
+
+    async def unregister(self, task_id: str, info: Optional[dict] = None):
+        self.tasks.pop(task_id, None)
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        return self.tasks.get(task_id)
+
+    async def keys(self) -> list[str]:
+        return list(self.tasks.keys())
+
+    async def get_counts(self) -> dict:
+        counts = {"users": {}, "models": {}}
+        for info in self.tasks.values():
+            for name, key in [("users", "user_id"), ("models", "model_id")]:
+                if info.get(key):
+                    counts[name][info[key]] = counts[name].get(info[key], 0) + 1
+        return counts
+
+    async def request_stop(self, task_id: str):
+        pass
+
+
+class RedisTaskRegistry:
+    """
+    Registry of the running tasks shared by all workers through Redis.
+
+    Tasks are stored in the `<prefix>` hash along with the worker running them,
+    and counted per user and per model in the `<prefix>:users` and
+    `<prefix>:models` hashes. Each worker renews a lease every third of
+    `lease_ttl`, the tasks of workers whose lease expired are removed. Stop
+    requests are published on `<prefix>:stop` and handled by the worker running
+    the task.
+    """
+
+    def __init__(
+        self,
+        redis,
+        worker_id: str,
+        lease_ttl: int,
+        prefix: str = "open-webui:tasks",
+    ):
+        self.redis = redis
+        self.worker_id = worker_id
+        self.lease_ttl = lease_ttl
+
+        self.name = prefix
+        self.counts = {"users": f"{prefix}:users", "models": f"{prefix}:models"}
+        self.channel = f"{prefix}:stop"
+        self.lease_prefix = f"{prefix}:worker:"
+
+        self.jobs: list[asyncio.Task] = []
+
+    async def start(self):
+        await self.renew_lease()
+        self.jobs = [
+            asyncio.create_task(self.listen()),
+            asyncio.create_task(self.maintain()),
+        ]
+
+    async def stop(self):
+        for job in self.jobs:
+            job.cancel()
+        await asyncio.gather(*self.jobs, return_exceptions=True)
+        self.jobs = []
+
+        # Tasks left running are abandoned with this process
+        for task_id in list(tasks.keys()):
+            await self.unregister(task_id)
+        await self.redis.delete(f"{self.lease_prefix}{self.worker_id}")
+
+    async def register(self, task_id: str, info: dict):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.name, task_id, json.dumps(info))
+            for name, key in [("users", "user_id"), ("models", "model_id")]:
+                if info.get(key):
+                    pipe.hincrby(self.counts[name], info[key], 1)
+            await pipe.execute()
+
+    async def unregister(self, task_id: str, info: Optional[dict] = None):
+        info = info or await self.get(task_id)
+
+        # Only the caller that removed the task decrements its counts
+        if info is None or not await self.redis.hdel(self.name, task_id):
+            return
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for name, key in [("users", "user_id"), ("models", "model_id")]:
+                if info.get(key):
+                    pipe.hincrby(self.counts[name], info[key], -1)
+            await pipe.execute()
+
+    async def get(self, task_id: str) -> Optional[dict]:
+        value = await self.redis.hget(self.name, task_id)
+        return json.loads(value) if value is not None else None
+
+    async def keys(self) -> list[str]:
+        return await self.redis.hkeys(self.name)
+
+    async def get_counts(self) -> dict:
+        counts = {}
+        for name, key in self.counts.items():
+            counts[name] = {
+                k: int(v) for k, v in (await self.redis.hgetall(key)).items()
+            }
+            # Users and models are left in the hashes once back to 0
+            counts[name] = {k: v for k, v in counts[name].items() if v > 0}
+        return counts
+
+    async def request_stop(self, task_id: str):
+        await self.redis.publish(self.channel, task_id)
+
+    async def renew_lease(self):
+        await self.redis.set(
+            f"{self.lease_prefix}{self.worker_id}", int(time.time()), ex=self.lease_ttl
+        )
+
+    async def cleanup(self):
+        """Remove the tasks of the workers whose lease expired."""
+        entries = {
+            task_id: json.loads(value)
+            for task_id, value in (await self.redis.hgetall(self.name)).items()
+        }
+        worker_ids = list({info.get("worker_id") for info in entries.values()})
+        if not worker_ids:
+            return
+
+        leases = await self.redis.mget(
+            [f"{self.lease_prefix}{worker_id}" for worker_id in worker_ids]
+        )
+        dead_worker_ids = {
+            worker_id
+            for worker_id, lease in zip(worker_ids, leases)
+            if lease is None and worker_id != self.worker_id
+        }
+
+        for task_id, info in entries.items():
+            if info.get("worker_id") in dead_worker_ids:
+                log.info(f"Removing task {task_id} of dead worker {info['worker_id']}")
+                await self.unregister(task_id, info)
+
+    async def maintain(self):
+        while True:
+            try:
+                await self.renew_lease()
+                await self.cleanup()
+            except Exception as e:
+                log.warning(f"Error maintaining the task registry: {e}")
+
+            await asyncio.sleep(self.lease_ttl / 3)
+
+    async def listen(self):
+        """Cancel the tasks of this worker that are stopped from another one."""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            task = tasks.get(message.get("data"))
+                            if task:
+                                task.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Lost task stop channel {self.channel}: {e}")
+
+            await asyncio.sleep(1)
+
+
+if TASK_MANAGER == "redis":
+    log.debug("Using Redis to manage tasks.")
+    TASK_REGISTRY = RedisTaskRegistry(
+        aioredis.Redis(
+            connection_pool=aioredis.ConnectionPool.from_url(
+                TASK_REDIS_URL, decode_responses=True
+            )
+        ),
+        worker_id=WORKER_ID,
+        lease_ttl=TASK_WORKER_LEASE_TTL,
+    )
+else:
+    TASK_REGISTRY = LocalTaskRegistry()
+
+
+# Strong references to the pending registry updates, see `cleanup_task`
+registry_updates: set[asyncio.Task] = set()
+
 
 def cleanup_task(task_id: str):
     """
-    Remove a completed or canceled task from the global `tasks` dictionary.
+    Remove a completed or canceled task from the global `tasks` dictionary and
+    from the registry.
     """
     tasks.pop(task_id, None)  # Remove the task if it exists
 
+    update = asyncio.create_task(TASK_REGISTRY.unregister(task_id))
+    registry_updates.add(update)
+    update.add_done_callback(registry_updates.discard)
 
-def create_task(coroutine):
+
+async def create_task(
+    coroutine,
+    user_id: Optional[str] = None,
+    model_id: Optional[str] = None,
+    chat_id: Optional[str] = None,
+    message_id: Optional[str] = None,
+):
     """
-    Create a new asyncio task and add it to the global task dictionary.
+    Create a new asyncio task and add it to the global task dictionary and to
+    the registry, where it is visible to all workers.
     """
     task_id = str(uuid4())  # Generate a unique ID for the task
+
+    try:
+        # Registered first, so that it is never unregistered before
+        await TASK_REGISTRY.register(
+            task_id,
+            {
+                "id": task_id,
+                "worker_id": WORKER_ID,
+                "user_id": user_id,
+                "model_id": model_id,
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "created_at": int(time.time()),
+            },
+        )
+    except Exception as e:
+        log.warning(f"Error registering task {task_id}: {e}")
+
     task = asyncio.create_task(coroutine)  # Create the task
 
     # Add a done callback for cleanup
@@ -30,16 +287,23 @@ def create_task(coroutine):
 
 def get_task(task_id: str):
     """
-    Retrieve a task by its task ID.
+    Retrieve a task of this process by its task ID.
     """
     return tasks.get(task_id)
 
 
-def list_tasks():
+async def list_tasks():
     """
-    List all currently active task IDs.
+    List all currently active task IDs, on all workers.
     """
-    return list(tasks.keys())
+    return await TASK_REGISTRY.keys()
+
+
+async def get_task_counts():
+    """
+    Number of active tasks per user and per model, on all workers.
+    """
+    return await TASK_REGISTRY.get_counts()
 
 
 async def stop_task(task_id: str):
@@ -48,7 +312,22 @@ async def stop_task(task_id: str):
     """
     task = tasks.get(task_id)
     if not task:
-        raise ValueError(f"Task with ID {task_id} not found.")
+        if not await TASK_REGISTRY.get(task_id):
+            raise ValueError(f"Task with ID {task_id} not found.")
+
+        # Running on another worker, which unregisters it once cancelled
+        await TASK_REGISTRY.request_stop(task_id)
+
+        deadline = time.monotonic() + STOP_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            if not await TASK_REGISTRY.get(task_id):
+                return {
+                    "status": True,
+                    "message": f"Task {task_id} successfully stopped.",
+                }
+
+        return {"status": False, "message": f"Failed to stop task {task_id}."}
 
     task.cancel()  # Request task cancellation
     try:
@@ -56,6 +335,7 @@ async def stop_task(task_id: str):
     except asyncio.CancelledError:
         # Task successfully canceled
         tasks.pop(task_id, None)  # Remove it from the dictionary
+        await TASK_REGISTRY.unregister(task_id)
         return {"status": True, "message": f"Task {task_id} successfully stopped."}
 
     return {"status": False, "message": f"Failed to stop task {task_id}."}
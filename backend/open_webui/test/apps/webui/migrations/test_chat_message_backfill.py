@@ -0,0 +1,83 @@
+import importlib.util
+from pathlib import Path
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+import open_webui
+
+MIGRATION_PATH = (
+    Path(open_webui.__file__).parent
+    / "migrations"
+    / "versions"
+    / "d7d58848da1d_add_chat_message_table.py"
+)
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("migration", MIGRATION_PATH)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration
+
+
+def test_backfill_copies_messages_of_existing_chats():
+    migration = load_migration()
+    engine = sa.create_engine("sqlite://")
+
+    metadata = sa.MetaData()
+    chat_table = sa.Table(
+        "chat",
+        metadata,
+        sa.Column("id", sa.Text(), primary_key=True),
+        sa.Column("chat", sa.JSON()),
+    )
+
+    with engine.begin() as conn:
+        metadata.create_all(conn)
+        conn.execute(
+            chat_table.insert(),
+            [
+                {
+                    "id": f"chat-{idx}",
+                    "chat": {
+                        "history": {
+                            "messages": {
+                                "1": {
+                                    "parentId": None,
+                                    "role": "user",
+                                    "content": "Hi",
+                                },
+                                "2": {
+                                    "parentId": "1",
+                                    "role": "assistant",
+                                    "content": f"Answer {idx}",
+                                    "timestamp": 1700000000,
+                                },
+                            }
+                        }
+                    },
+                }
+                # More chats than a batch
+                for idx in range(migration.BATCH_SIZE + 5)
+            ]
+            + [
+                {"id": "empty", "chat": {}},
+                {"id": "invalid", "chat": {"history": {"messages": []}}},
+            ],
+        )
+
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+        rows = conn.execute(
+            sa.text(
+                "SELECT chat_id, id, parent_id, role, content, created_at "
+                "FROM chat_message ORDER BY chat_id, id"
+            )
+        ).all()
+
+    assert len(rows) == 2 * (migration.BATCH_SIZE + 5)
+    assert ("chat-0", "1", None, "user", "Hi") == tuple(rows[0][:5])
+    assert ("chat-0", "2", "1", "assistant", "Answer 0", 1700000000) == tuple(rows[1])
@@ -0,0 +1,196 @@
+import pytest
+
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+ACCESS_CONTROLS = {
+    "public": None,
+    "private": {},
+    "user-read": {"read": {"user_ids": ["2"]}, "write": {}},
+    "user-write": {"read": {}, "write": {"user_ids": ["2"]}},
+    "group-read": {"read": {"group_ids": ["GROUP"]}, "write": {}},
+    "group-write": {
+        "read": {"group_ids": ["GROUP"]},
+        "write": {"group_ids": ["GROUP"]},
+    },
+    "other-group": {"read": {"group_ids": ["other"]}, "write": {"user_ids": ["3"]}},
+}
+
+
+class TestAccessGrants(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/prompts"
+
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.models.access_grants import AccessGrants
+        from open_webui.models.groups import GroupForm, Groups, GroupUpdateForm
+        from open_webui.models.knowledge import KnowledgeForm, Knowledges
+        from open_webui.models.models import ModelForm, ModelMeta, ModelParams, Models
+        from open_webui.models.prompts import PromptForm, Prompts
+        from open_webui.models.tools import ToolForm, ToolMeta, Tools
+        from open_webui.models.users import Users
+        from open_webui.utils.access_control import get_user_group_ids, has_access
+
+        self.access_grants = AccessGrants
+        self.prompts = Prompts
+        self.PromptForm = PromptForm
+        self.get_user_group_ids = get_user_group_ids
+        self.has_access = has_access
+
+        for id in ["1", "2", "3"]:
+            Users.insert_new_user(id, f"User {id}", f"user{id}@openwebui.com")
+
+        group = Groups.insert_new_group("1", GroupForm(name="group", description=""))
+        Groups.update_group_by_id(
+            group.id,
+            GroupUpdateForm(name="group", description="", user_ids=["2", "3"]),
+        )
+        access_controls = {
+            name: self.with_group_id(access_control, group.id)
+            for name, access_control in ACCESS_CONTROLS.items()
+        }
+
+        # resource type -> (insert(name, access_control) -> id, list(user_id, permission) -> ids)
+        self.resources = {
+            "prompt": (
+                lambda name, access_control: Prompts.insert_new_prompt(
+                    "1",
+                    PromptForm(
+                        command=f"/{name}",
+                        title=name,
+                        content="",
+                        access_control=access_control,
+                    ),
+                ).command,
+                lambda user_id, permission: [
+                    prompt.command
+                    for prompt in Prompts.get_prompts_by_user_id(user_id, permission)
+                ],
+            ),
+            "knowledge": (
+                lambda name, access_control: Knowledges.insert_new_knowledge(
+                    "1",
+                    KnowledgeForm(
+                        name=name, description="", access_control=access_control
+                    ),
+                ).id,
+                lambda user_id, permission: [
+                    knowledge.id
+                    for knowledge in Knowledges.get_knowledge_bases_by_user_id(
+                        user_id, permission
+                    )
+                ],
+            ),
+            "model": (
+                lambda name, access_control: Models.insert_new_model(
+                    ModelForm(
+                        id=name,
+                        base_model_id="base",
+                        name=name,
+                        meta=ModelMeta(),
+                        params=ModelParams(),
+                        access_control=access_control,
+                    ),
+                    "1",
+                ).id,
+                lambda user_id, permission: [
+                    model.id
+                    for model in Models.get_models_by_user_id(user_id, permission)
+                ],
+            ),
+            "tool": (
+                lambda name, access_control: Tools.insert_new_tool(
+                    "1",
+                    ToolForm(
+                        id=name,
+                        name=name,
+                        content="",
+                        meta=ToolMeta(),
+                        access_control=access_control,
+                    ),
+                    [],
+                ).id,
+                lambda user_id, permission: [
+                    tool.id for tool in Tools.get_tools_by_user_id(user_id, permission)
+                ],
+            ),
+        }
+        self.access_controls = {
+            resource_type: {
+                insert(name, access_control): access_control
+                for name, access_control in access_controls.items()
+            }
+            for resource_type, (insert, _) in self.resources.items()
+        }
+
+    @staticmethod
+    def with_group_id(access_control, group_id):
+        if not access_control:
+            return access_control
+        return {
+            permission: {
+                key: [group_id if id == "GROUP" else id for id in ids]
+                for key, ids in permission_access.items()
+            }
+            for permission, permission_access in access_control.items()
+        }
+
+    @pytest.mark.parametrize("resource_type", ["prompt", "knowledge", "model", "tool"])
+    @pytest.mark.parametrize("user_id", ["1", "2", "3"])
+    @pytest.mark.parametrize("permission", ["read", "write"])
+    def test_listing_matches_has_access(self, resource_type, user_id, permission):
+        _, list_ids = self.resources[resource_type]
+        user_group_ids = self.get_user_group_ids(user_id)
+
+        expected = {
+            id
+            for id, access_control in self.access_controls[resource_type].items()
+            # Every resource is owned by user 1
+            if user_id == "1"
+            or self.has_access(user_id, permission, access_control, user_group_ids)
+        }
+        assert set(list_ids(user_id, permission)) == expected
+
+    def test_update_replaces_grants(self):
+        self.prompts.update_prompt_by_command(
+            "/public",
+            self.PromptForm(
+                command="/public",
+                title="public",
+                content="",
+                access_control={"read": {"user_ids": ["3"]}, "write": {}},
+            ),
+        )
+
+        assert "/public" not in self.prompts_by_user_id("2", "read")
+        assert "/public" in self.prompts_by_user_id("3", "read")
+
+    def test_update_fails_when_grants_fail(self, monkeypatch):
+        def set_access_grants(*args):
+            raise RuntimeError("grants failed")
+
+        monkeypatch.setattr(self.access_grants, "set_access_grants", set_access_grants)
+        assert (
+            self.prompts.update_prompt_by_command(
+                "/public",
+                self.PromptForm(
+                    command="/public", title="public", content="", access_control={}
+                ),
+            )
+            is None
+        )
+
+        # Neither the prompt nor its grants were changed
+        assert self.prompts.get_prompt_by_command("/public").access_control is None
+        assert "/public" in self.prompts_by_user_id("2", "read")
+
+    def test_delete_removes_grants(self):
+        from open_webui.internal.db import get_db
+        from open_webui.models.access_grants import AccessGrant
+
+        assert self.prompts.delete_prompt_by_command("/public")
+        with get_db() as db:
+            assert not db.query(AccessGrant).filter_by(resource_id="/public").count()
+
+    def prompts_by_user_id(self, user_id, permission):
+        _, list_ids = self.resources["prompt"]
+        return list_ids(user_id, permission)
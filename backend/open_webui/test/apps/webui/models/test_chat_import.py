@@ -0,0 +1,116 @@
+import pytest
+
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+
+def create_form(id=None, **kwargs):
+    from open_webui.models.chats import ChatBulkImportForm
+
+    return ChatBulkImportForm(
+        id=id,
+        user_id="2",
+        chat={
+            "title": f"Chat {id}",
+            "history": {
+                "currentId": "1",
+                "messages": {"1": {"id": "1", "role": "user", "content": "Hi"}},
+            },
+        },
+        **kwargs,
+    )
+
+
+class TestChatImport(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/chats"
+
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.models.chats import Chats
+
+        self.chats = Chats
+
+    @pytest.fixture
+    def commits(self, monkeypatch):
+        from open_webui.internal.db import SessionLocal
+
+        commits = []
+        commit = SessionLocal.class_.commit
+
+        def spy(session):
+            commits.append(session)
+            commit(session)
+
+        monkeypatch.setattr(SessionLocal.class_, "commit", spy)
+        return commits
+
+    def test_keeps_ids_and_timestamps(self):
+        errors = self.chats.import_chats(
+            [
+                create_form("a", created_at=100, updated_at=200, archived=True),
+                create_form("b", created_at=300),
+                create_form(),
+            ]
+        )
+        assert errors == [None, None, None]
+
+        chat = self.chats.get_chat_by_id("a")
+        assert (chat.user_id, chat.title) == ("2", "Chat a")
+        assert (chat.created_at, chat.updated_at, chat.archived) == (100, 200, True)
+        assert self.chats.get_chat_by_id("b").updated_at == 300
+        assert len(self.chats.get_chats_by_user_id("2")) == 3
+        assert self.chats.get_messages_by_chat_id("a") == {
+            "1": {"id": "1", "role": "user", "content": "Hi"}
+        }
+
+    def test_inserts_batch_in_one_transaction(self, commits):
+        assert self.chats.import_chats([create_form(id) for id in "abc"]) == [None] * 3
+        assert len(commits) == 1
+
+    def test_reports_duplicate_ids_per_chat(self):
+        self.chats.import_chats([create_form("a")])
+
+        errors = self.chats.import_chats(
+            [create_form("a"), create_form("b"), create_form("b")]
+        )
+        assert errors == [
+            "Chat a already exists",
+            None,
+            "Chat b already exists",
+        ]
+        assert self.chats.get_chat_by_id("b") is not None
+
+    def test_falls_back_to_one_by_one_when_batch_fails(self, monkeypatch, commits):
+        sync_chat_messages = self.chats.sync_chat_messages
+
+        def fail_on_bad_chat(db, id, chat, *args):
+            if id == "bad":
+                raise ValueError("Invalid chat")
+            return sync_chat_messages(db, id, chat, *args)
+
+        monkeypatch.setattr(self.chats, "sync_chat_messages", fail_on_bad_chat)
+
+        errors = self.chats.import_chats(
+            [create_form("a"), create_form("bad"), create_form("b")]
+        )
+        assert errors == [None, "Invalid chat", None]
+        # The batch was rolled back, then each valid chat committed on its own
+        assert len(commits) == 2
+        assert self.chats.get_chat_by_id("a") is not None
+        assert self.chats.get_chat_by_id("bad") is None
+        assert self.chats.get_chat_by_id("b") is not None
+
+    def test_iter_chats_of_user(self):
+        self.chats.import_chats(
+            [
+                create_form("a", updated_at=100),
+                create_form("b", updated_at=300),
+                create_form("c", updated_at=200),
+            ]
+        )
+        other = create_form("d")
+        other.user_id = "3"
+        self.chats.import_chats([other])
+
+        chats = self.chats.iter_chats(user_id="2", batch_size=2)
+        assert [chat.id for chat in chats] == ["b", "c", "a"]
+        assert {chat.id for chat in self.chats.iter_chats()} == {"a", "b", "c", "d"}
@@ -0,0 +1,76 @@
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+
+def create_history():
+    # 1 -> 2a
+    #   -> 2b -> 3
+    return {
+        "currentId": "3",
+        "messages": {
+            "1": {"id": "1", "parentId": None, "role": "user", "content": "Hi"},
+            "2a": {"id": "2a", "parentId": "1", "role": "assistant", "content": "A"},
+            "2b": {"id": "2b", "parentId": "1", "role": "assistant", "content": "B"},
+            "3": {"id": "3", "parentId": "2b", "role": "user", "content": "Why?"},
+        },
+    }
+
+
+class TestChatMessages(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/chats"
+
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.models.chats import ChatForm, Chats
+
+        self.chats = Chats
+        self.chat = self.chats.insert_new_chat(
+            "2", ChatForm(chat={"title": "Branches", "history": create_history()})
+        )
+
+    def test_insert_mirrors_messages(self):
+        assert self.chats.get_messages_by_chat_id(self.chat.id) == (
+            create_history()["messages"]
+        )
+
+    def test_update_syncs_changed_and_removed_messages(self):
+        history = create_history()
+        history["messages"]["2a"]["content"] = "A, edited"
+        del history["messages"]["3"]
+        history["messages"]["2b"]["content"] = "B"
+
+        self.chats.update_chat_by_id(
+            self.chat.id, {"title": "Branches", "history": history}
+        )
+
+        messages = self.chats.get_messages_by_chat_id(self.chat.id)
+        assert messages == history["messages"]
+        assert "3" not in messages
+
+    def test_get_message_list_follows_the_branch(self):
+        message_list = self.chats.get_message_list_by_id_and_message_id(
+            self.chat.id, "3"
+        )
+        assert [message["id"] for message in message_list] == ["1", "2b", "3"]
+
+        message_list = self.chats.get_message_list_by_id_and_message_id(
+            self.chat.id, "2a"
+        )
+        assert [message["id"] for message in message_list] == ["1", "2a"]
+
+        assert (
+            self.chats.get_message_list_by_id_and_message_id(self.chat.id, "missing")
+            is None
+        )
+
+    def test_upsert_message_updates_row_and_chat(self):
+        self.chats.upsert_message_to_chat_by_id_and_message_id(
+            self.chat.id, "2a", {"content": "A, streamed"}
+        )
+
+        message = self.chats.get_message_by_id_and_message_id(self.chat.id, "2a")
+        assert message["content"] == "A, streamed"
+        assert message["parentId"] == "1"
+
+        chat = self.chats.get_chat_by_id(self.chat.id)
+        assert chat.chat["history"]["messages"]["2a"] == message
+        assert chat.chat["history"]["currentId"] == "2a"
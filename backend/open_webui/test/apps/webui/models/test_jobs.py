@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+
+class TestJobs(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/retrieval"
+
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.internal.db import get_db
+        from open_webui.models.jobs import Job, Jobs
+        from open_webui.models.users import Users
+
+        self.get_db = get_db
+        self.Job = Job
+        self.jobs = Jobs
+        self.user = Users.insert_new_user("1", "John Doe", "john.doe@openwebui.com")
+
+    def set_job(self, id, **fields):
+        with self.get_db() as db:
+            db.query(self.Job).filter_by(id=id).update(fields)
+            db.commit()
+
+    def test_claim_job_once(self):
+        job = self.jobs.insert_new_job(self.user.id, "test", {})
+        stale_before = int(time.time()) - 60
+
+        assert self.jobs.claim_job_by_id(job.id, stale_before)
+        assert not self.jobs.claim_job_by_id(job.id, stale_before)
+        assert self.jobs.get_job_by_id(job.id).status == "processing"
+
+    def test_claim_stale_job(self):
+        job = self.jobs.insert_new_job(self.user.id, "test", {})
+        self.set_job(job.id, status="processing", updated_at=int(time.time()) - 600)
+
+        assert self.jobs.claim_job_by_id(job.id, int(time.time()) - 60)
+        assert not self.jobs.claim_job_by_id(job.id, int(time.time()) - 60)
+
+    def test_finished_jobs_are_never_claimed(self):
+        for status in ["completed", "failed"]:
+            job = self.jobs.insert_new_job(self.user.id, "test", {})
+            self.set_job(job.id, status=status, updated_at=0)
+            assert not self.jobs.claim_job_by_id(job.id, int(time.time()))
+
+    def test_resumable_jobs(self):
+        now = int(time.time())
+        pending = self.jobs.insert_new_job(self.user.id, "test", {})
+        running = self.jobs.insert_new_job(self.user.id, "test", {})
+        stale = self.jobs.insert_new_job(self.user.id, "test", {})
+        done = self.jobs.insert_new_job(self.user.id, "test", {})
+
+        self.set_job(running.id, status="processing", updated_at=now)
+        self.set_job(stale.id, status="processing", updated_at=now - 600)
+        self.set_job(done.id, status="completed", updated_at=now - 600)
+
+        assert {job.id for job in self.jobs.get_resumable_jobs(now - 60)} == {
+            pending.id,
+            stale.id,
+        }
+
+    def test_queue_resumes_and_runs_stale_jobs(self, monkeypatch):
+        from open_webui.utils import jobs as jobs_utils
+        from open_webui.utils.jobs import JobQueue
+
+        events = []
+
+        async def emit_user_event(user_id, event, data):
+            events.append(data["data"]["data"]["status"])
+
+        monkeypatch.setattr(jobs_utils, "emit_user_event", emit_user_event)
+
+        job = self.jobs.insert_new_job(self.user.id, "test", {"value": 2})
+        self.set_job(job.id, status="processing", updated_at=int(time.time()) - 600)
+
+        queue = JobQueue(workers=1, heartbeat_interval=1)
+
+        @queue.register("test")
+        def handler(request, job, user, report):
+            report({"done": 1})
+            return {"value": job.data["value"] * 2}
+
+        async def run():
+            await queue.start(None)
+            await asyncio.wait_for(queue.queue.join(), timeout=10)
+            await queue.stop()
+
+        asyncio.run(run())
+
+        job = self.jobs.get_job_by_id(job.id)
+        assert job.status == "completed"
+        assert job.result == {"value": 4}
+        assert job.progress == {"done": 1}
+        assert events[0] == "processing" and events[-1] == "completed"
@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from test.util.abstract_integration_test import AbstractPostgresTest
+
+
+class TestKnowledge(AbstractPostgresTest):
+    BASE_PATH = "/api/v1/knowledge"
+
+    def setup_method(self):
+        super().setup_method()
+        from open_webui.models.knowledge import KnowledgeForm, Knowledges
+
+        self.knowledges = Knowledges
+        self.knowledge = Knowledges.insert_new_knowledge(
+            "1", KnowledgeForm(name="test", description="", data={"file_ids": ["a"]})
+        )
+
+    def test_add_file_id(self):
+        knowledge = self.knowledges.add_file_id_to_knowledge_by_id(
+            self.knowledge.id, "b"
+        )
+        assert knowledge.data["file_ids"] == ["a", "b"]
+
+        # Already added
+        knowledge = self.knowledges.add_file_id_to_knowledge_by_id(
+            self.knowledge.id, "b"
+        )
+        assert knowledge.data["file_ids"] == ["a", "b"]
+
+    def test_add_file_id_to_missing_knowledge(self):
+        assert self.knowledges.add_file_id_to_knowledge_by_id("missing", "b") is None
+
+    def test_concurrent_additions_keep_every_file_id(self):
+        file_ids = [f"file-{idx}" for idx in range(20)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda file_id: self.knowledges.add_file_id_to_knowledge_by_id(
+                        self.knowledge.id, file_id
+                    ),
+                    file_ids,
+                )
+            )
+
+        assert all(results)
+        knowledge = self.knowledges.get_knowledge_by_id(self.knowledge.id)
+        assert sorted(knowledge.data["file_ids"]) == sorted(["a", *file_ids])
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from open_webui.retrieval import utils
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(utils, "EMBEDDING_EXECUTOR", executor)
+    monkeypatch.setattr(utils, "RAG_EMBEDDING_CONCURRENT_REQUESTS", 2)
+    yield executor
+    executor.shutdown(cancel_futures=True)
+
+
+def test_keeps_batch_order(executor):
+    batches = [[idx] for idx in range(10)]
+
+    assert list(utils.map_embedding_batches(lambda batch: batch, batches)) == batches
+
+
+def test_bounds_batches_queued_by_one_call(executor):
+    submitted = []
+    submit = executor.submit
+
+    def spy(func, batch):
+        submitted.append(batch)
+        return submit(func, batch)
+
+    executor.submit = spy
+    results = utils.map_embedding_batches(lambda batch: batch, [[0], [1], [2], [3]])
+
+    assert next(results) == [0]
+    assert submitted == [[0], [1]]
+    assert list(results) == [[1], [2], [3]]
+
+
+def test_single_batch_does_not_wait_for_busy_executor(executor):
+    release = threading.Event()
+    for _ in range(4):
+        executor.submit(release.wait)
+
+    try:
+        results = utils.map_embedding_batches(
+            lambda batch: threading.current_thread(), [["query"]]
+        )
+        assert list(results) == [threading.current_thread()]
+    finally:
+        release.set()
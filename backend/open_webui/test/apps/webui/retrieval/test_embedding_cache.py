@@ -0,0 +1,90 @@
+import sqlite3
+from array import array
+from contextlib import closing
+
+from open_webui.retrieval.embedding_cache import EmbeddingCache
+
+
+def embed(texts, user=None):
+    return [[float(len(text)), 0.5] for text in texts]
+
+
+def test_only_missing_texts_are_embedded(tmp_path):
+    calls = []
+
+    def func(texts, user=None):
+        calls.append(texts)
+        return embed(texts)
+
+    cached = EmbeddingCache(str(tmp_path), 10, 100).wrap("engine", "model", func)
+
+    assert cached(["a", "bb"]) == [[1.0, 0.5], [2.0, 0.5]]
+    assert cached(["bb", "ccc", "ccc"]) == [[2.0, 0.5], [3.0, 0.5], [3.0, 0.5]]
+    assert cached("a") == [1.0, 0.5]
+    assert calls == [["a", "bb"], ["ccc"]]
+
+
+def test_length_mismatch_is_not_returned_or_cached(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 10, 100)
+
+    cached = cache.wrap("engine", "model", lambda texts, user=None: embed(texts)[:1])
+    assert cached(["a", "bb"]) is None
+    assert cached("a") == [1.0, 0.5]
+    assert cache.get_many([cache.get_key("engine", "model", "bb")]) == {}
+
+
+def test_embeddings_are_stored_as_float32(tmp_path):
+    EmbeddingCache(str(tmp_path), 10, 100).wrap("engine", "model", embed)(["abc"])
+
+    with closing(sqlite3.connect(tmp_path / "embeddings.db")) as conn:
+        (vector,) = conn.execute("SELECT vector FROM embedding").fetchone()
+    assert len(vector) == 2 * 4
+
+    # Read back from disk by a fresh instance
+    cache = EmbeddingCache(str(tmp_path), 10, 100)
+    key = cache.get_key("engine", "model", "abc")
+    assert cache.get_many([key]) == {key: [3.0, 0.5]}
+
+
+def test_memory_tier_stores_float32_arrays():
+    cache = EmbeddingCache(None, 10)
+    cached = cache.wrap("engine", "model", embed)
+    key = cache.get_key("engine", "model", "abc")
+
+    assert cached("abc") == [3.0, 0.5]
+    assert cache.memory[key] == array("f", [3.0, 0.5])
+
+    # Served from memory as a list, not the cached array itself
+    assert cached("abc") == [3.0, 0.5]
+    assert isinstance(cached("abc"), list)
+    assert cache.get_many([key])[key] is not cache.memory[key]
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), 1, 10)
+    keys = [cache.get_key("engine", "model", str(idx)) for idx in range(15)]
+
+    for idx, key in enumerate(keys):
+        with closing(cache.connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO embedding (key, vector, accessed_at) VALUES (?, ?, ?)",
+                (key, b"\0" * 8, idx),
+            )
+
+    # A write past the eviction threshold trims the table back to its size
+    cache.set_many({cache.get_key("engine", "model", "new"): [1.0, 2.0]})
+
+    with closing(cache.connect()) as conn:
+        remaining = {key for (key,) in conn.execute("SELECT key FROM embedding")}
+    assert len(remaining) == 10
+    assert cache.get_key("engine", "model", "new") in remaining
+    assert not remaining & set(keys[:6])
+
+
+def test_outdated_disk_format_is_discarded(tmp_path):
+    with closing(sqlite3.connect(tmp_path / "embeddings.db")) as conn, conn:
+        conn.execute("CREATE TABLE embedding (key TEXT PRIMARY KEY, vector BLOB)")
+        conn.execute("INSERT INTO embedding VALUES ('key', x'00')")
+
+    cache = EmbeddingCache(str(tmp_path), 10, 100)
+    assert cache.get_many(["key"]) == {}
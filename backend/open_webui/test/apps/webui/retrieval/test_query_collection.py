@@ -0,0 +1,40 @@
+import pytest
+
+from open_webui.retrieval import utils
+from open_webui.retrieval.vector.main import SearchResult
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    calls = []
+
+    def query_doc(collection_name, query_embedding, k, user=None):
+        calls.append((collection_name, query_embedding))
+        return SearchResult(
+            ids=[[f"{collection_name}-{query_embedding[0]}"]],
+            distances=[[query_embedding[0]]],
+            documents=[[f"{collection_name} {query_embedding[0]}"]],
+            metadatas=[[{}]],
+        )
+
+    monkeypatch.setattr(utils, "query_doc", query_doc)
+    return calls
+
+
+def test_queries_every_collection_with_every_embedding(searches):
+    result = utils.query_collection(
+        ["a", "b"], ["q1", "q2"], lambda queries: [[0.1], [0.2]], k=10
+    )
+
+    assert sorted(searches) == [("a", [0.1]), ("a", [0.2]), ("b", [0.1]), ("b", [0.2])]
+    assert len(result["documents"][0]) == 4
+
+
+@pytest.mark.parametrize("embeddings", [None, [], [[0.1]]])
+def test_missing_query_embeddings_return_no_results(searches, embeddings):
+    result = utils.query_collection(
+        ["a", "b"], ["q1", "q2"], lambda queries: embeddings, k=10
+    )
+
+    assert searches == []
+    assert result["documents"] == [[]]
@@ -0,0 +1,122 @@
+import os
+import sqlite3
+from contextlib import closing
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.retrieval import sparse
+from open_webui.retrieval.sparse import SparseIndex
+
+pytestmark = pytest.mark.skipif(
+    not SparseIndex.is_fts5_available(), reason="SQLite FTS5 is not available"
+)
+
+
+class FakeVectorCollections:
+    def __init__(self):
+        self.generations = {}
+
+    def get_generation(self, name):
+        return self.generations.get(name, 0)
+
+    def increment_generation(self, name):
+        self.generations[name] = self.get_generation(name) + 1
+        return self.generations[name]
+
+    def increment_all_generations(self):
+        for name in self.generations:
+            self.generations[name] += 1
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    fake = FakeVectorCollections()
+    monkeypatch.setattr(sparse, "VectorCollections", fake)
+    return fake
+
+
+def get_result(items):
+    return SimpleNamespace(
+        ids=[[item["id"] for item in items]],
+        documents=[[item["text"] for item in items]],
+        metadatas=[[item["metadata"] for item in items]],
+    )
+
+
+ITEMS = [
+    {"id": "1", "text": "the quick brown fox", "metadata": {"file_id": "a"}},
+    {"id": "2", "text": "jumps over the lazy dog", "metadata": {"file_id": "b"}},
+]
+
+
+def test_build_only_loads_the_collection_when_out_of_date(tmp_path, collections):
+    index = SparseIndex(str(tmp_path))
+    loads = []
+
+    def load():
+        loads.append(True)
+        return get_result(ITEMS)
+
+    assert index.build("docs", load)
+    assert index.build("docs", load)
+    assert len(loads) == 1
+
+    assert [result["id"] for result in index.search("docs", "lazy dog", 5)] == ["2"]
+
+
+def test_changes_on_another_instance_invalidate_the_index(tmp_path, collections):
+    node_a = SparseIndex(str(tmp_path / "a"))
+    node_b = SparseIndex(str(tmp_path / "b"))
+    items = list(ITEMS)
+
+    node_a.build("docs", lambda: get_result(items))
+    node_b.build("docs", lambda: get_result(items))
+
+    # Node A inserts into the shared vector database and its own index
+    new_item = {"id": "3", "text": "a lazy cat", "metadata": {"file_id": "c"}}
+    items.append(new_item)
+    node_a.insert("docs", [new_item])
+
+    assert node_a.has_collection("docs")
+    assert {result["id"] for result in node_a.search("docs", "lazy", 5)} == {"2", "3"}
+
+    assert not node_b.has_collection("docs")
+    assert node_b.search("docs", "lazy", 5) == []
+    assert node_b.build("docs", lambda: get_result(items))
+    assert {result["id"] for result in node_b.search("docs", "lazy", 5)} == {"2", "3"}
+
+    # Deleting the collection on node B leaves node A's index out of date
+    node_b.delete_collection("docs")
+    assert not node_a.has_collection("docs")
+
+
+def test_delete_applies_to_an_up_to_date_index(tmp_path, collections):
+    index = SparseIndex(str(tmp_path))
+    index.build("docs", lambda: get_result(ITEMS))
+
+    index.delete("docs", filter={"file_id": "b"})
+    assert index.has_collection("docs")
+    assert index.search("docs", "lazy dog", 5) == []
+
+
+def test_web_search_collections_are_not_indexed(tmp_path, collections):
+    index = SparseIndex(str(tmp_path))
+
+    assert not index.build("web-search-0123", lambda: get_result(ITEMS))
+    index.insert("web-search-0123", ITEMS)
+    assert os.listdir(tmp_path) == []
+
+
+def test_prune_removes_out_of_date_files(tmp_path, collections):
+    index = SparseIndex(str(tmp_path))
+    index.build("current", lambda: get_result(ITEMS))
+    index.build("stale", lambda: get_result(ITEMS))
+    collections.increment_generation("stale")
+
+    # An index file from before generations were tracked
+    with closing(sqlite3.connect(tmp_path / "legacy.db")) as conn, conn:
+        conn.execute("CREATE VIRTUAL TABLE chunk USING fts5(text)")
+
+    index.prune()
+    assert os.listdir(tmp_path) == [os.path.basename(index.get_file_path("current"))]
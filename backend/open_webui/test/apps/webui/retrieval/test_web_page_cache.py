@@ -0,0 +1,73 @@
+import time
+from contextlib import closing
+
+from langchain_core.documents import Document
+
+from open_webui.retrieval.web.cache import WebPageCache, parse_cache_control
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('public, Max-Age=60, no-cache="Set-Cookie"') == {
+        "public": None,
+        "max-age": "60",
+        "no-cache": "Set-Cookie",
+    }
+    assert parse_cache_control(None) == {}
+
+
+def test_pages_are_revalidated_after_ttl(tmp_path):
+    cache = WebPageCache(str(tmp_path), ttl=60, max_size=10_000)
+    cache.set_page("https://a", "A", etag='"1"')
+
+    page = cache.get_page("https://a")
+    assert page == {"body": "A", "etag": '"1"', "last_modified": None, "fresh": True}
+
+
+def test_cache_control_max_age_shortens_ttl(tmp_path):
+    cache = WebPageCache(str(tmp_path), ttl=60, max_size=10_000)
+
+    cache.set_page("https://a", "A", cache_control="max-age=0")
+    cache.set_page("https://b", "B", cache_control="no-cache")
+    cache.set_page("https://c", "C", cache_control="max-age=3600, s-maxage=0")
+    cache.set_page("https://d", "D", cache_control="max-age=3600")
+
+    assert not cache.get_page("https://a")["fresh"]
+    assert not cache.get_page("https://b")["fresh"]
+    assert not cache.get_page("https://c")["fresh"]
+    assert cache.get_page("https://d")["fresh"]
+
+
+def test_no_store_and_private_pages_are_not_cached(tmp_path):
+    cache = WebPageCache(str(tmp_path), ttl=60, max_size=10_000)
+    cache.set_page("https://a", "A")
+    cache.set_document("https://a", "hash", Document(page_content="A"))
+
+    cache.set_page("https://a", "A, changed", cache_control="no-store")
+    cache.set_page("https://b", "B", cache_control="private, max-age=60")
+
+    assert cache.get_page("https://a") is None
+    assert cache.get_document("https://a", "hash") is None
+    assert cache.get_page("https://b") is None
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = WebPageCache(str(tmp_path), ttl=60, max_size=100)
+
+    for idx in range(4):
+        cache.set_page(f"https://{idx}", "x" * 30)
+        # Access times have a resolution of a second
+        with closing(cache.connect()) as conn, conn:
+            conn.execute(
+                "UPDATE page SET accessed_at = ? WHERE url = ?",
+                (int(time.time()) - 100 + idx, f"https://{idx}"),
+            )
+
+    # Evicted down to 90% of the maximum size
+    assert cache.get_page("https://0") is None
+    assert [cache.get_page(f"https://{idx}")["body"] for idx in range(1, 4)] == [
+        "x" * 30
+    ] * 3
+    assert cache.total_size == 90
+
+    # The running total is restored from the database on startup
+    assert WebPageCache(str(tmp_path), ttl=60, max_size=100).total_size == 90
@@ -1,3 +1,4 @@
+import json
 import uuid
 
 from test.util.abstract_integration_test import AbstractPostgresTest
@@ -234,3 +235,77 @@ class TestChats(AbstractPostgresTest):
 
         chat = self.chats.get_chat_by_id(chat_id)
         assert chat.share_id is None
+
+    def import_chats(self, lines, **kwargs):
+        return self.fast_api_client.post(
+            self.create_url("/import/bulk", kwargs),
+            content="\n".join(lines).encode(),
+        )
+
+    def test_import_chats_reports_errors_by_line(self):
+        chat = {"chat": {"title": "Imported", "history": {"messages": {}}}}
+        lines = [
+            json.dumps({**chat, "id": "a", "meta": {"tags": ["imported"]}}),
+            "",
+            "{not json",
+            json.dumps({**chat, "id": "a"}),
+            json.dumps({"id": "b"}),
+            json.dumps({**chat, "id": "c"}),
+        ]
+        with mock_webui_user(id="2"):
+            response = self.import_chats(lines)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 2
+        errors = {error["line"]: error for error in data["errors"]}
+        assert sorted(errors) == [3, 4, 5]
+        assert errors[4] == {"line": 4, "id": "a", "error": "Chat a already exists"}
+        # Lines that are not chats
+        assert errors[3]["id"] is None
+        assert "chat" in errors[5]["error"]
+        assert self.chats.get_chat_by_id("c").user_id == "2"
+        assert self.chats.get_chat_list_by_user_id_and_tag_name("2", "imported")
+
+    def test_import_chats_preserve_user_id_requires_admin(self):
+        line = json.dumps({"id": "a", "user_id": "3", "chat": {"title": "Theirs"}})
+
+        with mock_webui_user(id="2"):
+            response = self.import_chats([line], preserve_user_id="true")
+        assert response.status_code == 401
+        assert self.chats.get_chat_by_id("a") is None
+
+        with mock_webui_user(id="2", role="admin"):
+            response = self.import_chats([line], preserve_user_id="true")
+        assert response.status_code == 200
+        assert self.chats.get_chat_by_id("a").user_id == "3"
+
+    def test_export_import_round_trip(self):
+        from open_webui.models.chats import ChatBulkImportForm
+
+        self.chats.import_chats(
+            [
+                ChatBulkImportForm(
+                    id=str(uuid.uuid4()),
+                    user_id="2",
+                    chat={"title": f"Chat {idx}"},
+                    archived=idx == 0,
+                    created_at=100 + idx,
+                    updated_at=200 + idx,
+                )
+                for idx in range(3)
+            ]
+        )
+        with mock_webui_user(id="2"):
+            exported = self.fast_api_client.get(self.create_url("/all/export")).text
+        assert len(exported.splitlines()) == 4
+
+        before = {chat.id: chat for chat in self.chats.iter_chats(user_id="2")}
+        self.chats.delete_chats_by_user_id("2")
+        with mock_webui_user(id="2"):
+            response = self.import_chats(exported.splitlines())
+        assert response.json() == {"imported": 4, "errors": []}
+
+        after = {chat.id: chat for chat in self.chats.iter_chats(user_id="2")}
+        for id, chat in before.items():
+            for key in ["title", "chat", "archived", "created_at", "updated_at"]:
+                assert getattr(after[id], key) == getattr(chat, key)
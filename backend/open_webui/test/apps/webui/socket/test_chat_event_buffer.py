@@ -0,0 +1,78 @@
+import asyncio
+
+from open_webui.socket.utils import ChatEventBuffer
+
+KEY = ("chat", "message")
+
+
+def completion(content, **data):
+    return {"type": "chat:completion", "data": {"content": content, **data}}
+
+
+def create_buffer(interval=60):
+    frames = []
+
+    async def emit(request_info, event_data):
+        frames.append(event_data["data"])
+
+    return ChatEventBuffer(emit, interval=interval, delta_frames=True), frames
+
+
+def test_delta_frames_carry_utf16_offsets():
+    async def run():
+        buffer, frames = create_buffer()
+        await buffer.send(KEY, {}, completion("Hi 👋"))
+        await buffer.send(KEY, {}, completion("Hi 👋 there"))
+        await buffer.send(KEY, {}, completion("Hi 👋 there!"))
+
+        assert frames == [
+            {"content": "Hi 👋"},
+            {"content_delta": " there", "content_offset": 5},
+            {"content_delta": "!", "content_offset": 11},
+        ]
+
+    asyncio.run(run())
+
+
+def test_resync_sends_full_content():
+    async def run():
+        buffer, frames = create_buffer()
+        await buffer.send(KEY, {}, completion("Hello"))
+        buffer.resync(KEY)
+        await buffer.send(KEY, {}, completion("Hello, world"))
+        await buffer.send(KEY, {}, completion("Hello, world!"))
+
+        assert frames == [
+            {"content": "Hello"},
+            {"content": "Hello, world"},
+            {"content_delta": "!", "content_offset": 12},
+        ]
+
+    asyncio.run(run())
+
+
+def test_timer_flushes_pending_frame():
+    async def run():
+        buffer, frames = create_buffer(interval=0.01)
+        await buffer.push(KEY, {}, completion("Hel"))
+        await buffer.push(KEY, {}, completion("Hello"))
+
+        await asyncio.sleep(0.1)
+        assert frames == [{"content": "Hello"}]
+        assert buffer.flush_tasks == set()
+
+    asyncio.run(run())
+
+
+def test_close_flushes_and_releases_message():
+    async def run():
+        buffer, frames = create_buffer()
+        await buffer.push(KEY, {}, completion("Hello"))
+
+        await buffer.close(KEY)
+        assert frames == [{"content": "Hello"}]
+        assert buffer.pending == {}
+        assert buffer.locks == {}
+        assert buffer.emitted_content == {}
+
+    asyncio.run(run())
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from open_webui.socket.utils import AsyncRedisSetDict, AsyncSetDict
+
+
+def create_pools(count=2):
+    # Pools on separate clients of one server, like the pools of several nodes
+    server = FakeServer()
+    return [
+        AsyncRedisSetDict(
+            "test:user_sessions",
+            FakeRedis(server=server, decode_responses=True),
+            cache_ttl=0,
+        )
+        for _ in range(count)
+    ]
+
+
+def test_concurrent_adds_keep_every_member():
+    async def run():
+        pools = create_pools()
+        await asyncio.gather(
+            *[pools[idx % 2].add("user", f"sid-{idx}") for idx in range(50)]
+        )
+
+        assert sorted(await pools[0].get("user")) == sorted(
+            f"sid-{idx}" for idx in range(50)
+        )
+        assert await pools[1].keys() == ["user"]
+
+    asyncio.run(run())
+
+
+def test_concurrent_removes_drop_the_key_once_empty():
+    async def run():
+        pools = create_pools()
+        for idx in range(20):
+            await pools[0].add("user", f"sid-{idx}")
+
+        await asyncio.gather(
+            *[pools[idx % 2].remove("user", f"sid-{idx}") for idx in range(19)]
+        )
+        assert await pools[0].get("user") == ["sid-19"]
+        assert await pools[1].contains("user")
+
+        await pools[1].remove("user", "sid-19")
+        assert await pools[0].get("user", []) == []
+        assert not await pools[0].contains("user")
+        assert await pools[0].keys() == []
+
+    asyncio.run(run())
+
+
+def test_remove_below_min_score():
+    async def run():
+        (pool,) = create_pools(1)
+        await pool.add("model", "old", score=100)
+        await pool.add("model", "new", score=105)
+        await pool.add("other", "old", score=100)
+
+        await pool.remove("model", min_score=103)
+        await pool.remove("other", min_score=103)
+
+        assert await pool.get("model") == ["new"]
+        assert await pool.keys() == ["model"]
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("create_pool", [AsyncSetDict, lambda: create_pools(1)[0]])
+def test_set_pools_share_an_interface(create_pool):
+    async def run():
+        pool = create_pool()
+        await pool.add("user", "a")
+        await pool.add("user", "b")
+        await pool.add("user", "a")
+
+        assert sorted(await pool.get("user")) == ["a", "b"]
+        assert await pool.get_many(["user", "missing"]) == [
+            await pool.get("user"),
+            None,
+        ]
+
+        await pool.remove("user", "a")
+        assert await pool.items() == [("user", ["b"])]
+
+        assert await pool.delete("user")
+        assert await pool.get("user", []) == []
+
+    asyncio.run(run())
@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+from open_webui.test.util import legacy_content_blocks
+from open_webui.utils.content_blocks import ContentBlockSerializer, TagContentScanner
+
+REASONING_TAGS = [
+    ("think", "/think"),
+    ("thinking", "/thinking"),
+    ("reason", "/reason"),
+    ("reasoning", "/reasoning"),
+    ("thought", "/thought"),
+    ("Thought", "/Thought"),
+    ("|begin_of_thought|", "|end_of_thought|"),
+]
+CODE_INTERPRETER_TAGS = [("code_interpreter", "/code_interpreter")]
+SOLUTION_TAGS = [("|begin_of_solution|", "|end_of_solution|")]
+
+HANDLERS = [
+    ("reasoning", REASONING_TAGS),
+    ("code_interpreter", CODE_INTERPRETER_TAGS),
+    ("solution", SOLUTION_TAGS),
+]
+
+RESPONSES = [
+    "<think>Let me see.\nThe user wants a sum.</think>\n\nThe answer is **4**.\n",
+    "  \n<thinking>\nstep one\n> quoted\nstep two\n</thinking>Done.  \n",
+    "Intro text\n<reasoning>why</reasoning> middle <Thought>more</Thought>end",
+    "<|begin_of_thought|>a\nb<|end_of_thought|>\n<|begin_of_solution|>42<|end_of_solution|>",
+    'Let me run it.\n```\n<code_interpreter type="code" lang="python">\nprint(1 + 1)\n</code_interpreter>',
+    "<think></think>Nothing to think about.",
+    "Use `<b>` tags and a < b > c comparison, not a <think tag.\n\n\n",
+    "<think>unterminated reasoning that never ends\nline two",
+    "Text with trailing whitespace   \n\t ",
+    "<reason>first</reason><reason>second</reason>\n\nafter both",
+]
+
+
+def chunk(text, rng):
+    chunks = []
+    idx = 0
+    while idx < len(text):
+        size = rng.choice([1, 1, 2, 3, 5, 8])
+        chunks.append(text[idx : idx + size])
+        idx += size
+    return chunks
+
+
+def without_timings(content_blocks):
+    return [
+        {
+            key: value
+            for key, value in block.items()
+            if key not in ("started_at", "ended_at", "duration")
+        }
+        for block in content_blocks
+    ]
+
+
+def stream(tokens, handle, serialize):
+    content = ""
+    content_blocks = [{"type": "text", "content": ""}]
+    outputs = []
+
+    for value in tokens:
+        content = f"{content}{value}"
+        content_blocks[-1]["content"] = content_blocks[-1]["content"] + value
+
+        for content_type, tags in HANDLERS:
+            content, content_blocks, _ = handle(
+                content_type, tags, content, content_blocks
+            )
+
+        # Durations depend on the wall clock, which the two runs don't share
+        for block in content_blocks:
+            if "duration" in block:
+                block["duration"] = 0
+
+        outputs.append(
+            (
+                serialize(content_blocks),
+                serialize(content_blocks, raw=True),
+                without_timings(content_blocks),
+            )
+        )
+
+    return outputs
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("response", RESPONSES)
+def test_incremental_handling_matches_legacy(response, seed):
+    tokens = chunk(response, random.Random(seed))
+
+    scanner = TagContentScanner()
+    serializer = ContentBlockSerializer()
+
+    assert stream(tokens, scanner.handle, serializer.serialize) == stream(
+        tokens,
+        legacy_content_blocks.tag_content_handler,
+        legacy_content_blocks.serialize_content_blocks,
+    )
+
+
+def test_serializer_matches_legacy_for_tool_calls():
+    serializer = ContentBlockSerializer()
+    content_blocks = [{"type": "text", "content": "  Checking the weather.\n"}]
+
+    tool_call = {"id": "call_1", "function": {"name": "get_weather"}}
+    steps = [
+        lambda: content_blocks.append({"type": "tool_calls", "content": [tool_call]}),
+        lambda: content_blocks[-1].update(
+            results=[{"tool_call_id": "call_1", "content": "Sunny"}]
+        ),
+        lambda: content_blocks.append({"type": "text", "content": ""}),
+        lambda: content_blocks[-1].update(content="\nIt is sunny.  "),
+        lambda: content_blocks.append(
+            {
+                "type": "code_interpreter",
+                "attributes": {"lang": "python"},
+                "content": "print(1)",
+                "output": {"stdout": "1"},
+            }
+        ),
+        lambda: content_blocks.append({"type": "solution", "content": " 1 "}),
+    ]
+
+    for step in steps:
+        step()
+        for raw in (False, True):
+            assert serializer.serialize(
+                content_blocks, raw
+            ) == legacy_content_blocks.serialize_content_blocks(content_blocks, raw)
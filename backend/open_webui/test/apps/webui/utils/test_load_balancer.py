@@ -0,0 +1,230 @@
+import asyncio
+import socket
+import time
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from open_webui.utils.load_balancer import LoadBalancer
+
+URLS = ["http://a", "http://b", "http://c"]
+
+
+def test_least_requests_prefers_fewest_in_flight():
+    balancer = LoadBalancer(strategy="least_requests")
+    balancer.begin("http://a")
+    balancer.begin("http://a")
+    balancer.begin("http://b")
+
+    assert balancer.choose(URLS) == "http://c"
+
+
+def test_least_requests_breaks_ties_by_latency():
+    balancer = LoadBalancer(strategy="least_requests")
+    balancer.record("http://a", latency=2)
+    balancer.record("http://b", latency=1)
+    balancer.record("http://c", latency=3)
+
+    assert balancer.choose(URLS) == "http://b"
+
+
+def test_latency_weights_by_load():
+    balancer = LoadBalancer(strategy="latency")
+    balancer.record("http://a", latency=1)
+    balancer.record("http://b", latency=2)
+    balancer.record("http://c", latency=5)
+    # 1 * (2 + 1) is more than 2 * (0 + 1)
+    balancer.begin("http://a")
+    balancer.begin("http://a")
+
+    assert balancer.choose(URLS) == "http://b"
+
+
+def test_unknown_strategy_falls_back_to_least_requests():
+    assert LoadBalancer(strategy="unknown").strategy == "least_requests"
+
+
+def test_cold_model_penalty():
+    balancer = LoadBalancer(cold_penalty=2)
+    balancer.set_loaded_models("http://a", ["llama"])
+    balancer.set_loaded_models("http://b", [])
+    balancer.begin("http://a")
+
+    # One request in flight is cheaper than loading the model
+    assert balancer.choose(URLS[:2], "llama") == "http://a"
+
+    balancer.begin("http://a")
+    balancer.begin("http://a")
+    assert balancer.choose(URLS[:2], "llama") == "http://b"
+
+
+def test_unknown_loaded_models_are_not_penalized():
+    balancer = LoadBalancer(cold_penalty=2)
+    balancer.set_loaded_models("http://a", ["llama"])
+    balancer.begin("http://a")
+
+    assert balancer.choose(URLS[:2], "llama") == "http://b"
+
+
+def test_circuit_opens_after_failure_threshold_and_closes_after_cooldown(
+    monkeypatch,
+):
+    now = 1000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    balancer = LoadBalancer(failure_threshold=2, cooldown=30)
+
+    balancer.record("http://a", failed=True)
+    assert balancer.get_stats("http://a").open_until == 0.0
+
+    balancer.record("http://a", failed=True)
+    assert balancer.get_stats("http://a").to_dict()["healthy"] is False
+    for _ in range(10):
+        assert balancer.choose(URLS[:2]) == "http://b"
+
+    now += 31
+    assert balancer.get_stats("http://a").to_dict()["healthy"] is True
+    balancer.begin("http://b")
+    assert balancer.choose(URLS[:2]) == "http://a"
+
+
+def test_success_closes_circuit():
+    balancer = LoadBalancer(failure_threshold=1, cooldown=30)
+    balancer.record("http://a", failed=True)
+    balancer.record("http://a", latency=1)
+
+    stats = balancer.get_stats("http://a")
+    assert stats.consecutive_failures == 0
+    assert stats.to_dict()["healthy"] is True
+
+
+def test_all_backends_open_are_still_tried():
+    balancer = LoadBalancer(failure_threshold=1, cooldown=30)
+    for url in URLS[:2]:
+        balancer.record(url, failed=True)
+
+    assert balancer.choose(URLS[:2]) in URLS[:2]
+
+
+def test_exclude():
+    balancer = LoadBalancer()
+
+    assert balancer.choose(URLS, exclude={"http://a", "http://b"}) == "http://c"
+    assert balancer.choose(URLS, exclude=set(URLS)) is None
+
+
+def test_end_is_one_shot():
+    balancer = LoadBalancer()
+    end = balancer.begin("http://a")
+    other_end = balancer.begin("http://a")
+
+    end()
+    end()
+    stats = balancer.get_stats("http://a")
+    assert stats.in_flight == 1
+    assert stats.requests == 2
+
+    other_end()
+    assert stats.in_flight == 0
+
+
+def test_streamed_response_cleanup_ends_request_once():
+    from open_webui.routers.ollama import OLLAMA_LOAD_BALANCER, cleanup_response
+
+    end = OLLAMA_LOAD_BALANCER.begin("http://cleanup")
+    OLLAMA_LOAD_BALANCER.begin("http://cleanup")
+
+    # The background task of streamed chats runs twice on the event emitter path
+    asyncio.run(cleanup_response(None, end))
+    asyncio.run(cleanup_response(None, end))
+    assert OLLAMA_LOAD_BALANCER.get_stats("http://cleanup").in_flight == 1
+
+
+def get_unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_ollama_retries_other_backend_on_connection_error(monkeypatch):
+    from open_webui.routers import ollama
+
+    async def run():
+        async def chat(request):
+            return web.json_response({"message": {"content": "Hi"}})
+
+        async def ps(request):
+            return web.json_response({"models": []})
+
+        app = web.Application()
+        app.router.add_post("/api/chat", chat)
+        app.router.add_get("/api/ps", ps)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        live_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        dead_url = f"http://127.0.0.1:{get_unused_port()}"
+
+        balancer = LoadBalancer()
+        monkeypatch.setattr(ollama, "OLLAMA_LOAD_BALANCER", balancer)
+        # The dead backend is picked first, the live one being slower
+        balancer.begin(live_url)()
+        balancer.record(live_url, latency=10)
+
+        request = SimpleNamespace(
+            app=SimpleNamespace(
+                state=SimpleNamespace(
+                    OLLAMA_MODELS={"llama": {"urls": [0, 1]}},
+                    config=SimpleNamespace(
+                        OLLAMA_BASE_URLS=[dead_url, live_url],
+                        OLLAMA_API_CONFIGS={},
+                    ),
+                )
+            )
+        )
+        try:
+            response = await ollama.send_model_request(
+                request,
+                "llama",
+                None,
+                "/api/chat",
+                {"model": "llama"},
+                stream=False,
+            )
+            await asyncio.gather(*ollama.loaded_models_updates)
+        finally:
+            await runner.cleanup()
+
+        assert response == {"message": {"content": "Hi"}}
+        assert balancer.get_stats(dead_url).failures == 1
+        assert balancer.get_stats(dead_url).in_flight == 0
+        assert balancer.get_stats(live_url).in_flight == 0
+        assert balancer.get_stats(live_url).requests == 2
+
+    asyncio.run(run())
+
+
+def test_ollama_does_not_retry_explicit_backend(monkeypatch):
+    from fastapi import HTTPException
+
+    from open_webui.routers import ollama
+
+    monkeypatch.setattr(ollama, "OLLAMA_LOAD_BALANCER", LoadBalancer())
+    request = SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(
+                    OLLAMA_BASE_URLS=[f"http://127.0.0.1:{get_unused_port()}"],
+                    OLLAMA_API_CONFIGS={},
+                )
+            )
+        )
+    )
+
+    with pytest.raises(HTTPException):
+        asyncio.run(
+            ollama.send_model_request(
+                request, "llama", 0, "/api/chat", {"model": "llama"}, stream=False
+            )
+        )
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from open_webui.utils import message_store
+from open_webui.utils.message_store import MessageStore
+
+
+class FakeChats:
+    def __init__(self):
+        self.writes = []
+        self.fail = False
+
+    async def upsert_message_to_chat_by_id_and_message_id_async(
+        self, chat_id, message_id, fields
+    ):
+        if self.fail:
+            return None
+        self.writes.append((chat_id, message_id, dict(fields)))
+        return True
+
+
+@pytest.fixture
+def chats(monkeypatch):
+    fake = FakeChats()
+    monkeypatch.setattr(message_store, "Chats", fake)
+    return fake
+
+
+def test_stage_coalesces_until_buffer_size(chats):
+    async def run():
+        store = MessageStore(flush_interval=60, flush_size=10)
+        await store.stage("chat", "message", {"content": "Hel"})
+        await store.stage("chat", "message", {"content": "Hello"})
+        assert chats.writes == []
+
+        await store.stage("chat", "message", {"content": "Hello, world!"})
+        assert chats.writes == [("chat", "message", {"content": "Hello, world!"})]
+
+        await store.flush_all()
+
+    asyncio.run(run())
+
+
+def test_timer_flushes_trailing_updates(chats):
+    async def run():
+        store = MessageStore(flush_interval=0.05, flush_size=1000)
+        await store.stage("chat", "message", {"content": "Hi"})
+        await store.stage("chat", "message", {"done": False})
+        assert chats.writes == []
+
+        await asyncio.sleep(0.2)
+        assert chats.writes == [("chat", "message", {"content": "Hi", "done": False})]
+        assert store.flush_tasks == set()
+
+    asyncio.run(run())
+
+
+def test_flush_all_writes_and_drops_pending_messages(chats):
+    async def run():
+        store = MessageStore(flush_interval=60, flush_size=1000)
+        await store.stage("chat", "a", {"content": "first"})
+        await store.stage("chat", "b", {"content": "second"})
+
+        await store.flush_all()
+        assert sorted(chats.writes) == [
+            ("chat", "a", {"content": "first"}),
+            ("chat", "b", {"content": "second"}),
+        ]
+        assert store.pending == {}
+
+    asyncio.run(run())
+
+
+def test_failed_flush_keeps_fields_for_retry(chats):
+    async def run():
+        store = MessageStore(flush_interval=60, flush_size=1000)
+        await store.stage("chat", "message", {"content": "Hi"})
+
+        chats.fail = True
+        assert not await store.flush("chat", "message")
+        assert chats.writes == []
+
+        chats.fail = False
+        await store.stage("chat", "message", {"done": True})
+        await store.flush_all()
+        assert chats.writes == [("chat", "message", {"content": "Hi", "done": True})]
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from open_webui.utils.models import ModelCatalogue
+
+
+def create_catalogue(monkeypatch, check_interval=60):
+    catalogue = ModelCatalogue(refresh_interval=60, check_interval=check_interval)
+    threads = []
+
+    def get_updated_at():
+        threads.append(threading.current_thread())
+        return [(len(threads), 0), (0, 0)]
+
+    monkeypatch.setattr(catalogue, "get_updated_at", get_updated_at)
+    request = SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(config=MagicMock()))
+    )
+    return catalogue, request, threads
+
+
+def test_fingerprint_checks_database_off_the_event_loop(monkeypatch):
+    catalogue, request, threads = create_catalogue(monkeypatch)
+
+    asyncio.run(catalogue.get_fingerprint(request))
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_fingerprint_checks_database_once_per_interval(monkeypatch):
+    async def run():
+        catalogue, request, threads = create_catalogue(monkeypatch)
+
+        fingerprint = await catalogue.get_fingerprint(request)
+        for _ in range(10):
+            assert await catalogue.get_fingerprint(request) == fingerprint
+        assert len(threads) == 1
+
+        assert await catalogue.get_fingerprint(request, force=True) != fingerprint
+        assert len(threads) == 2
+
+    asyncio.run(run())
+
+
+def test_fingerprint_rechecks_database_after_interval(monkeypatch):
+    async def run():
+        catalogue, request, threads = create_catalogue(monkeypatch, check_interval=0)
+
+        fingerprint = await catalogue.get_fingerprint(request)
+        assert await catalogue.get_fingerprint(request) != fingerprint
+        assert len(threads) == 2
+
+    asyncio.run(run())
+
+
+def test_filter_models_with_readers_of_models_not_in_catalogue(monkeypatch):
+    from open_webui.utils import models as models_utils
+
+    custom_models = [
+        SimpleNamespace(id="private", user_id="owner", access_control={}),
+        SimpleNamespace(
+            id="shared",
+            user_id="owner",
+            access_control={"read": {"group_ids": ["group"]}},
+        ),
+        SimpleNamespace(id="public", user_id="owner", access_control=None),
+    ]
+    monkeypatch.setattr(models_utils.Models, "get_all_models", lambda: custom_models)
+    catalogue = ModelCatalogue(refresh_interval=60)
+
+    # e.g. listed for the user by a provider receiving the user info headers
+    models = [{"id": id} for id in ["private", "shared", "public", "base"]]
+    readers = ModelCatalogue.get_readers(models)
+
+    assert catalogue.filter_models(models, "user", {"group"}, readers) == [
+        {"id": "shared"},
+        {"id": "public"},
+    ]
+    assert catalogue.filter_models(models, "owner", set(), readers) == [
+        {"id": "private"},
+        {"id": "shared"},
+        {"id": "public"},
+    ]
+    # Not in the (empty) catalogue
+    assert catalogue.filter_models(models, "owner", set()) == []
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from open_webui.internal.db import Session
+from open_webui.utils.request_middleware import RequestMiddleware
+
+
+@pytest.fixture
+def commits(monkeypatch):
+    commits = []
+    session_class = Session.session_factory.class_
+    commit = session_class.commit
+
+    def spy(session):
+        commits.append(session)
+        commit(session)
+
+    monkeypatch.setattr(session_class, "commit", spy)
+    Session.remove()
+    yield commits
+    Session.remove()
+
+
+def request(handler):
+    async def app(scope, receive, send):
+        await handler()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http",
+        "path": "/",
+        "query_string": b"",
+        "headers": [],
+        "app": SimpleNamespace(
+            state=SimpleNamespace(config=SimpleNamespace(ENABLE_API_KEY=True))
+        ),
+    }
+    asyncio.run(RequestMiddleware(app)(scope, receive, send))
+
+
+def test_commits_session_used_by_request(commits):
+    async def handler():
+        Session.execute(text("SELECT 1;")).all()
+
+    request(handler)
+    assert len(commits) == 1
+
+
+def test_skips_commit_when_session_unused(commits):
+    async def use_session():
+        Session.execute(text("SELECT 1;")).all()
+
+    async def handler():
+        pass
+
+    # The session of the event loop thread exists, but this request didn't use it
+    request(use_session)
+    request(handler)
+    assert len(commits) == 1
+
+
+def test_skips_commit_of_worker_thread_sessions(commits):
+    async def handler():
+        await asyncio.to_thread(lambda: Session.execute(text("SELECT 1;")).all())
+
+    request(handler)
+    assert commits == []
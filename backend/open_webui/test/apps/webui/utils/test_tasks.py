@@ -0,0 +1,212 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from open_webui import tasks
+from open_webui.tasks import LocalTaskRegistry, RedisTaskRegistry
+
+
+def create_registries(*worker_ids, lease_ttl=30):
+    # Registries on separate clients of one server, like those of several workers
+    server = FakeServer()
+    return [
+        RedisTaskRegistry(
+            FakeRedis(server=server, decode_responses=True),
+            worker_id=worker_id,
+            lease_ttl=lease_ttl,
+            prefix="test:tasks",
+        )
+        for worker_id in worker_ids
+    ]
+
+
+def info(task_id, worker_id="a", user_id="user", model_id="model"):
+    return {
+        "id": task_id,
+        "worker_id": worker_id,
+        "user_id": user_id,
+        "model_id": model_id,
+    }
+
+
+async def wait_for(condition, timeout=5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def has_subscriber(registry):
+    (_, count), *_ = await registry.redis.pubsub_numsub(registry.channel)
+    return count > 0
+
+
+async def is_stopped(registry, task_id):
+    return await registry.get(task_id) is None
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    def set_registry(registry):
+        monkeypatch.setattr(tasks, "TASK_REGISTRY", registry)
+        return registry
+
+    monkeypatch.setattr(tasks, "tasks", {})
+    return set_registry
+
+
+def test_local_counts_follow_running_tasks(registry):
+    async def run():
+        registry(LocalTaskRegistry())
+        release = asyncio.Event()
+
+        task_ids = [
+            (await tasks.create_task(release.wait(), user_id=user, model_id=model))[0]
+            for user, model in [("u1", "m1"), ("u1", "m2"), ("u2", "m1")]
+        ]
+        assert sorted(await tasks.list_tasks()) == sorted(task_ids)
+        assert await tasks.get_task_counts() == {
+            "users": {"u1": 2, "u2": 1},
+            "models": {"m1": 2, "m2": 1},
+        }
+
+        assert (await tasks.stop_task(task_ids[0]))["status"] is True
+        assert await tasks.get_task_counts() == {
+            "users": {"u1": 1, "u2": 1},
+            "models": {"m1": 1, "m2": 1},
+        }
+
+        release.set()
+        await asyncio.sleep(0)
+        await asyncio.gather(*tasks.registry_updates)
+        assert await tasks.list_tasks() == []
+        assert await tasks.get_task_counts() == {"users": {}, "models": {}}
+
+    asyncio.run(run())
+
+
+def test_redis_counts_per_user_and_model():
+    async def run():
+        a, b = create_registries("a", "b")
+        await a.register("1", info("1", user_id="u1", model_id="m1"))
+        await b.register("2", info("2", "b", user_id="u1", model_id="m2"))
+        await b.register("3", info("3", "b", user_id="u2", model_id=None))
+
+        assert sorted(await a.keys()) == ["1", "2", "3"]
+        assert await a.get_counts() == {
+            "users": {"u1": 2, "u2": 1},
+            "models": {"m1": 1, "m2": 1},
+        }
+
+        # Unregistered by both its worker and a stop request, counted down once
+        await asyncio.gather(a.unregister("1"), b.unregister("1"))
+        await b.unregister("3")
+        assert await b.get_counts() == {"users": {"u1": 1}, "models": {"m2": 1}}
+        assert await a.get("1") is None
+        assert (await a.get("2"))["worker_id"] == "b"
+
+    asyncio.run(run())
+
+
+def test_stop_request_cancels_task_on_its_worker(registry):
+    async def run():
+        a, b = create_registries("a", "b")
+        registry(b)
+        await b.start()
+        try:
+            await wait_for(lambda: has_subscriber(b))
+            task_id, task = await tasks.create_task(asyncio.Event().wait())
+            assert await a.get(task_id) is not None
+
+            # Requested from the other worker, which does not run the task
+            await a.request_stop(task_id)
+            await wait_for(lambda: is_stopped(a, task_id))
+            assert task.cancelled()
+            assert task_id not in tasks.tasks
+        finally:
+            await b.stop()
+
+    asyncio.run(run())
+
+
+def test_stop_task_of_another_worker_waits_for_it(registry, monkeypatch):
+    async def run():
+        (a,) = create_registries("a")
+        registry(a)
+        await a.register("remote", info("remote", "b"))
+
+        # The other worker, unregistering the task once asked to stop it
+        async def other_worker(ready):
+            async with a.redis.pubsub() as pubsub:
+                await pubsub.subscribe(a.channel)
+                ready.set()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await a.unregister(message["data"])
+                        return
+
+        ready = asyncio.Event()
+        worker = asyncio.create_task(other_worker(ready))
+        await ready.wait()
+
+        assert (await tasks.stop_task("remote"))["status"] is True
+        await worker
+
+        with pytest.raises(ValueError):
+            await tasks.stop_task("remote")
+
+        # Nobody handles the request
+        monkeypatch.setattr(tasks, "STOP_TIMEOUT", 0.2)
+        await a.register("stuck", info("stuck", "b"))
+        assert (await tasks.stop_task("stuck"))["status"] is False
+
+    asyncio.run(run())
+
+
+def test_cleanup_removes_tasks_of_dead_workers():
+    async def run():
+        a, b = create_registries("a", "b")
+        await a.renew_lease()
+        await b.renew_lease()
+        await a.register("1", info("1", "a"))
+        await b.register("2", info("2", "b"))
+        await a.register("3", info("3", "dead", user_id="u2", model_id="m2"))
+
+        await a.cleanup()
+        assert sorted(await a.keys()) == ["1", "2"]
+        assert await a.get_counts() == {
+            "users": {"user": 2},
+            "models": {"model": 2},
+        }
+
+        # Once the lease of b expires, its tasks are removed by a
+        await b.redis.delete(f"{b.lease_prefix}b")
+        await a.cleanup()
+        assert await a.keys() == ["1"]
+
+        # The worker never removes its own tasks
+        await a.redis.delete(f"{a.lease_prefix}a")
+        await a.cleanup()
+        assert await a.keys() == ["1"]
+
+    asyncio.run(run())
+
+
+def test_stop_unregisters_tasks_left_running(registry):
+    async def run():
+        a, b = create_registries("a", "b")
+        registry(a)
+        await a.start()
+        # fakeredis does not handle cancelling a subscription in progress
+        await wait_for(lambda: has_subscriber(a))
+        task_id, task = await tasks.create_task(asyncio.Event().wait())
+
+        await a.stop()
+        assert await b.get(task_id) is None
+        assert await b.redis.get(f"{a.lease_prefix}a") is None
+
+        task.cancel()
+
+    asyncio.run(run())
@@ -0,0 +1,109 @@
+"""
+Benchmark for the streamed content block handling in `process_chat_response`.
+
+Streams synthetic tokens through the same per-delta steps as `stream_body_handler`
+(append, tag detection, serialization) and reports the time spent per window of
+tokens, for the incremental serializer and tag scanner and for the handling they
+replaced (`open_webui.test.util.legacy_content_blocks`), which rescans and
+reserializes the whole message on every delta.
+
+Neither is flat: every delta still appends to and copies the whole message once,
+which is linear in its length. The legacy handling adds repeated full scans and
+copies on top of that, so its time per window grows several times faster.
+
+    python -m open_webui.test.benchmarks.content_blocks --tokens 50000
+"""
+
+import argparse
+import time
+
+from open_webui.test.util import legacy_content_blocks
+from open_webui.utils.content_blocks import ContentBlockSerializer, TagContentScanner
+
+REASONING_TAGS = [
+    ("think", "/think"),
+    ("thinking", "/thinking"),
+    ("reason", "/reason"),
+    ("reasoning", "/reasoning"),
+    ("thought", "/thought"),
+    ("Thought", "/Thought"),
+    ("|begin_of_thought|", "|end_of_thought|"),
+]
+CODE_INTERPRETER_TAGS = [("code_interpreter", "/code_interpreter")]
+SOLUTION_TAGS = [("|begin_of_solution|", "|end_of_solution|")]
+
+
+def generate_tokens(count):
+    yield "<think>"
+    for idx in range(count // 10):
+        yield f"step {idx} "
+    yield "</think>"
+    for idx in range(count - count // 10 - 2):
+        yield "\n" if idx % 20 == 19 else f"word{idx % 7} "
+
+
+def stream(tokens, window, incremental):
+    if incremental:
+        handle = TagContentScanner().handle
+        serialize = ContentBlockSerializer().serialize
+    else:
+        handle = legacy_content_blocks.tag_content_handler
+        serialize = legacy_content_blocks.serialize_content_blocks
+
+    content = ""
+    content_blocks = [{"type": "text", "content": ""}]
+
+    timings = []
+    started_at = time.perf_counter()
+
+    for idx, value in enumerate(tokens, start=1):
+        content = f"{content}{value}"
+        content_blocks[-1]["content"] = content_blocks[-1]["content"] + value
+
+        for content_type, tags in (
+            ("reasoning", REASONING_TAGS),
+            ("code_interpreter", CODE_INTERPRETER_TAGS),
+            ("solution", SOLUTION_TAGS),
+        ):
+            content, content_blocks, _ = handle(
+                content_type, tags, content, content_blocks
+            )
+
+        serialize(content_blocks)
+
+        if idx % window == 0:
+            now = time.perf_counter()
+            timings.append(now - started_at)
+            started_at = now
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=50000)
+    parser.add_argument("--window", type=int, default=5000)
+    parser.add_argument(
+        "--skip-baseline",
+        action="store_true",
+        help="Only run the incremental handler",
+    )
+    args = parser.parse_args()
+
+    modes = [("incremental", True)]
+    if not args.skip_baseline:
+        modes.append(("legacy", False))
+
+    for name, incremental in modes:
+        timings = stream(generate_tokens(args.tokens), args.window, incremental)
+
+        print(f"{name}: {sum(timings):.3f}s for {args.tokens} tokens")
+        for idx, timing in enumerate(timings, start=1):
+            print(
+                f"  tokens {(idx - 1) * args.window:>7}-{idx * args.window:<7} "
+                f"{timing * 1000:9.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
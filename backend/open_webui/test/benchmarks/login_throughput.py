@@ -0,0 +1,129 @@
+"""
+Benchmark of concurrent logins against the latency of a streamed response.
+
+A chat is streamed while a burst of logins verifies bcrypt passwords, either
+inline in the handler, as the auth router used to, or on the password hashing
+threads (`run_in_password_executor`). It reports the login throughput and the
+gaps between the chunks of the stream, which are `--interval` apart when the
+event loop is free.
+
+    python -m open_webui.test.benchmarks.login_throughput --logins 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from open_webui.test.benchmarks.request_middleware import call
+from open_webui.utils.auth import (
+    get_password_hash,
+    run_in_password_executor,
+    verify_password,
+)
+from open_webui.env import PASSWORD_HASHING_WORKERS
+
+
+def create_app(password_hash: str):
+    app = FastAPI()
+
+    @app.get("/signin/inline")
+    async def signin_inline(password: str):
+        return {"status": verify_password(password, password_hash)}
+
+    @app.get("/signin/executor")
+    async def signin_executor(password: str):
+        return {
+            "status": await run_in_password_executor(
+                verify_password, password, password_hash
+            )
+        }
+
+    @app.get("/stream")
+    async def stream(chunks: int = 100, interval: float = 0.01):
+        async def generate():
+            for _ in range(chunks):
+                await asyncio.sleep(interval)
+                yield "data: {}\n\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    return app
+
+
+async def measure(app, mode: str, logins: int, concurrency: int, interval: float):
+    received_at = []
+
+    def on_chunk(body, at):
+        if body:
+            received_at.append(at)
+
+    async def stream():
+        await call(
+            app,
+            "/stream",
+            query_string=f"chunks=1000000&interval={interval}".encode(),
+            on_chunk=on_chunk,
+        )
+
+    async def login(semaphore):
+        async with semaphore:
+            await call(app, f"/signin/{mode}", query_string=b"password=password")
+
+    stream_task = asyncio.create_task(stream())
+    await asyncio.sleep(0.2)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started_at = time.perf_counter()
+    await asyncio.gather(*[login(semaphore) for _ in range(logins)])
+    elapsed = time.perf_counter() - started_at
+
+    stream_task.cancel()
+    await asyncio.gather(stream_task, return_exceptions=True)
+
+    gaps = sorted(
+        b - a for a, b in zip(received_at, received_at[1:]) if b >= started_at
+    )
+    return elapsed, gaps
+
+
+async def run(args):
+    app = create_app(get_password_hash("password"))
+
+    print(f"{args.logins} logins, {args.concurrency} at a time")
+    print(f"password hashing threads: {PASSWORD_HASHING_WORKERS}")
+    for mode in ["inline", "executor"]:
+        elapsed, gaps = await measure(
+            app, mode, args.logins, args.concurrency, args.interval
+        )
+
+        print(f"{mode}:")
+        print(f"  logins    {args.logins / elapsed:8.1f} /s")
+        if gaps:
+            print(
+                f"  chunk gap {statistics.median(gaps) * 1e3:8.1f} ms median, "
+                f"{gaps[int(len(gaps) * 0.99)] * 1e3:.1f} ms p99, "
+                f"{gaps[-1] * 1e3:.1f} ms max over {len(gaps)} chunks"
+            )
+        else:
+            print("  chunk gap no chunk was streamed during the logins")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.01,
+        help="Seconds between the chunks of the stream",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
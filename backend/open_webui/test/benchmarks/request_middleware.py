@@ -0,0 +1,200 @@
+"""
+Benchmark for the HTTP middleware stack of the app.
+
+Compares the previous stack, where the request checks, the session commit and
+the security headers were `BaseHTTPMiddleware`s, with the pure ASGI one. Both
+are called directly through ASGI, without a server, and report:
+
+- the time per request of a small JSON endpoint, and the overhead over the
+  bare app
+- the latency of each chunk of a streamed response, from the moment it is
+  yielded by the endpoint to the moment it reaches the server
+
+    python -m open_webui.test.benchmarks.request_middleware --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from open_webui.internal.db import Session
+from open_webui.utils.request_middleware import (
+    RequestMiddleware,
+    is_invalid_websocket_upgrade,
+)
+from open_webui.utils.security_headers import (
+    SecurityHeadersMiddleware,
+    set_security_headers,
+)
+
+
+def create_app():
+    app = FastAPI()
+    app.state.config = SimpleNamespace(ENABLE_API_KEY=True)
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": True}
+
+    @app.get("/stream")
+    async def stream(chunks: int = 100, interval: float = 0.001):
+        async def generate():
+            for _ in range(chunks):
+                await asyncio.sleep(interval)
+                yield f"{time.perf_counter()}\n"
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    return app
+
+
+def create_baseline_app():
+    """The previous stack: three `@app.middleware("http")` and the headers."""
+    app = create_app()
+
+    class BaseHTTPSecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            response = await call_next(request)
+            response.headers.update(set_security_headers())
+            return response
+
+    app.add_middleware(BaseHTTPSecurityHeadersMiddleware)
+
+    @app.middleware("http")
+    async def commit_session_after_request(request: Request, call_next):
+        response = await call_next(request)
+        Session.commit()
+        return response
+
+    @app.middleware("http")
+    async def check_url(request: Request, call_next):
+        start_time = int(time.time())
+        request.state.enable_api_key = app.state.config.ENABLE_API_KEY
+        response = await call_next(request)
+        process_time = int(time.time()) - start_time
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+    @app.middleware("http")
+    async def inspect_websocket(request: Request, call_next):
+        if is_invalid_websocket_upgrade(request.scope):
+            return JSONResponse(
+                status_code=400,
+                content={"detail": "Invalid WebSocket upgrade request"},
+            )
+        return await call_next(request)
+
+    return app
+
+
+def create_asgi_app():
+    app = create_app()
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RequestMiddleware)
+    return app
+
+
+async def call(app, path, query_string=b"", on_chunk=None):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("localhost", 80),
+    }
+
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        # Like a server, only report the disconnect once the response is sent
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            if on_chunk:
+                on_chunk(message.get("body", b""), time.perf_counter())
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+
+
+async def measure_requests(app, count):
+    for _ in range(min(count, 100)):
+        await call(app, "/ping")
+
+    started_at = time.perf_counter()
+    for _ in range(count):
+        await call(app, "/ping")
+    return (time.perf_counter() - started_at) / count
+
+
+async def measure_stream(app, chunks):
+    latencies = []
+
+    def on_chunk(body, received_at):
+        for line in body.decode().splitlines():
+            latencies.append(received_at - float(line))
+
+    await call(
+        app, "/stream", query_string=f"chunks={chunks}".encode(), on_chunk=on_chunk
+    )
+    return latencies
+
+
+async def run(args):
+    stacks = [("bare app", create_app()), ("pure ASGI", create_asgi_app())]
+    if not args.skip_baseline:
+        stacks.insert(1, ("BaseHTTPMiddleware", create_baseline_app()))
+
+    bare = None
+    for name, app in stacks:
+        per_request = await measure_requests(app, args.requests)
+        bare = per_request if bare is None else bare
+        latencies = await measure_stream(app, args.chunks)
+
+        print(f"{name}:")
+        print(
+            f"  request   {per_request * 1e6:8.1f} us "
+            f"(+{(per_request - bare) * 1e6:.1f} us over the bare app)"
+        )
+        print(
+            f"  chunk     {statistics.median(latencies) * 1e6:8.1f} us median, "
+            f"{max(latencies) * 1e6:.1f} us max over {len(latencies)} chunks"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument(
+        "--skip-baseline",
+        action="store_true",
+        help="Only run the pure ASGI stack",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -146,14 +146,21 @@ class AbstractPostgresTest(AbstractIntegrationTest):
 
         # truncate all tables
         tables = [
+            "access_grant",
             "auth",
             "chat",
+            "chat_message",
             "chatidtag",
             "document",
+            '"group"',
+            "group_member",
+            "job",
+            "knowledge",
             "memory",
             "model",
             "prompt",
             "tag",
+            "tool",
             '"user"',
         ]
         for table in tables:
@@ -1,4 +1,4 @@
-from typing import Optional, Union, List, Dict, Any
+from typing import Optional, Union, List, Dict, Any, Set
 from open_webui.models.users import Users, UserModel
 from open_webui.models.groups import Groups
 
@@ -107,23 +107,36 @@ def has_permission(
     return get_permission(default_permissions, permission_hierarchy)
 
 
+def get_user_group_ids(user_id: str) -> Set[str]:
+    """
+    Get the ids of the groups a user is a member of, briefly cached so that
+    listing many resources resolves the user's groups only once.
+    """
+    return Groups.get_group_ids_by_member_id(user_id)
+
+
 def has_access(
     user_id: str,
     type: str = "write",
     access_control: Optional[dict] = None,
+    user_group_ids: Optional[Set[str]] = None,
 ) -> bool:
     if access_control is None:
         return type == "read"
 
-    user_groups = Groups.get_groups_by_member_id(user_id)
-    user_group_ids = [group.id for group in user_groups]
     permission_access = access_control.get(type, {})
-    permitted_group_ids = permission_access.get("group_ids", [])
     permitted_user_ids = permission_access.get("user_ids", [])
+    if user_id in permitted_user_ids:
+        return True
 
-    return user_id in permitted_user_ids or any(
-        group_id in permitted_group_ids for group_id in user_group_ids
-    )
+    permitted_group_ids = permission_access.get("group_ids", [])
+    if not permitted_group_ids:
+        return False
+
+    if user_group_ids is None:
+        user_group_ids = get_user_group_ids(user_id)
+
+    return any(group_id in user_group_ids for group_id in permitted_group_ids)
 
 
 # Get all users with access to a resource
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import logging
 import uuid
 import jwt
@@ -6,12 +8,15 @@ import hmac
 import hashlib
 import requests
 import os
+import time
 
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 from typing import Optional, Union, List, Dict
 
 from open_webui.models.users import Users
+from open_webui.utils.last_active import LAST_ACTIVE_BUFFER
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
@@ -19,6 +24,8 @@ from open_webui.env import (
     TRUSTED_SIGNATURE_KEY,
     STATIC_DIR,
     SRC_LOG_LEVELS,
+    AUTH_USER_CACHE_TTL,
+    PASSWORD_HASHING_WORKERS,
 )
 
 from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
@@ -113,6 +120,28 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+# bcrypt takes a few hundred milliseconds per hash, a bounded pool of threads
+# runs it so that a burst of logins neither blocks the event loop nor takes
+# over the default executor
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASHING_WORKERS, thread_name_prefix="password"
+)
+
+
+async def run_in_password_executor(func, *args, **kwargs):
+    """
+    Run a function hashing or verifying passwords, such as
+    `Auths.authenticate_user`, on the password hashing threads.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        password_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def get_password_hash_async(password):
+    return await run_in_password_executor(get_password_hash, password)
+
+
 def create_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     payload = data.copy()
 
@@ -132,6 +161,10 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+def get_token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def extract_token_from_auth_header(auth_header: str):
     return auth_header[len("Bearer ") :]
 
@@ -149,7 +182,7 @@ def get_http_authorization_cred(auth_header: str):
         raise ValueError(ERROR_MESSAGES.INVALID_TOKEN)
 
 
-def get_current_user(
+async def get_current_user(
     request: Request,
     background_tasks: BackgroundTasks,
     auth_token: HTTPAuthorizationCredentials = Depends(bearer_security),
@@ -185,48 +218,59 @@ def get_current_user(
                     status.HTTP_403_FORBIDDEN, detail=ERROR_MESSAGES.API_KEY_NOT_ALLOWED
                 )
 
-        return get_current_user_by_api_key(token)
+        return await get_current_user_by_api_key(token)
 
-    # auth by jwt token
-    try:
-        data = decode_token(token)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-        )
+    # auth by jwt token, the user is cached at most until the token expires
+    key = get_token_hash(token)
+    user = Users.get_cached_user(key)
 
-    if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+    if user is None:
+        try:
+            data = decode_token(token)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token",
+            )
+
+        if data is None or "id" not in data:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=ERROR_MESSAGES.UNAUTHORIZED,
+            )
+
+        user = await Users.get_user_by_id_async(data["id"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=ERROR_MESSAGES.INVALID_TOKEN,
             )
-        else:
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
-        return user
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=ERROR_MESSAGES.UNAUTHORIZED,
-        )
+
+        ttl = AUTH_USER_CACHE_TTL
+        if data.get("exp") is not None:
+            ttl = min(ttl, data["exp"] - time.time())
+        Users.cache_user(key, user, ttl)
+
+    # Written in bulk by the buffer rather than on every request
+    LAST_ACTIVE_BUFFER.touch(user.id)
+    return user
 
 
-def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+async def get_current_user_by_api_key(api_key: str):
+    key = get_token_hash(api_key)
+    user = Users.get_cached_user(key)
 
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=ERROR_MESSAGES.INVALID_TOKEN,
-        )
-    else:
-        Users.update_user_last_active_by_id(user.id)
+        user = await Users.get_user_by_api_key_async(api_key)
+
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=ERROR_MESSAGES.INVALID_TOKEN,
+            )
+        Users.cache_user(key, user)
 
+    LAST_ACTIVE_BUFFER.touch(user.id)
     return user
 
 
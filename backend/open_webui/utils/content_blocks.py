@@ -0,0 +1,369 @@
+import functools
+import html
+import json
+import re
+import time
+
+# Longest start tag (including attributes) that is looked for across chunk boundaries
+MAX_TAG_LENGTH = 1024
+
+NON_WHITESPACE = re.compile(r"\S")
+
+
+def split_content_and_whitespace(content):
+    content_stripped = content.rstrip()
+    original_whitespace = (
+        content[len(content_stripped) :] if len(content) > len(content_stripped) else ""
+    )
+    return content_stripped, original_whitespace
+
+
+def get_strip_bounds(content):
+    """Bounds of `content.strip()`, without copying the content."""
+    match = NON_WHITESPACE.search(content)
+    if match is None:
+        return 0, 0
+
+    end = len(content)
+    while content[end - 1].isspace():
+        end -= 1
+    return match.start(), end
+
+
+def is_opening_code_block(content):
+    backtick_segments = content.split("```")
+    # Even number of segments means the last backticks are opening a new block
+    return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
+
+
+def serialize_content_block(content, block, raw=False):
+    """
+    Append the serialized form of a single content block to `content`.
+    """
+    if block["type"] == "text":
+        content = f"{content}{block['content'].strip()}\n"
+    elif block["type"] == "tool_calls":
+        attributes = block.get("attributes", {})
+
+        block_content = block.get("content", [])
+        results = block.get("results", [])
+
+        if results:
+
+            result_display_content = ""
+
+            for result in results:
+                tool_call_id = result.get("tool_call_id", "")
+                tool_name = ""
+
+                for tool_call in block_content:
+                    if tool_call.get("id", "") == tool_call_id:
+                        tool_name = tool_call.get("function", {}).get("name", "")
+                        break
+
+                result_display_content = f"{result_display_content}\n> {tool_name}: {result.get('content', '')}"
+
+            if not raw:
+                content = f'{content}\n<details type="tool_calls" done="true" content="{html.escape(json.dumps(block_content))}" results="{html.escape(json.dumps(results))}">\n<summary>Tool Executed</summary>\n{result_display_content}\n</details>\n'
+        else:
+            tool_calls_display_content = ""
+
+            for tool_call in block_content:
+                tool_calls_display_content = f"{tool_calls_display_content}\n> Executing {tool_call.get('function', {}).get('name', '')}"
+
+            if not raw:
+                content = f'{content}\n<details type="tool_calls" done="false" content="{html.escape(json.dumps(block_content))}">\n<summary>Tool Executing...</summary>\n{tool_calls_display_content}\n</details>\n'
+
+    elif block["type"] == "reasoning":
+        reasoning_display_content = "\n".join(
+            (f"> {line}" if not line.startswith(">") else line)
+            for line in block["content"].splitlines()
+        )
+
+        reasoning_duration = block.get("duration", None)
+
+        if reasoning_duration is not None:
+            if raw:
+                content = f'{content}\n<{block["start_tag"]}>{block["content"]}<{block["end_tag"]}>\n'
+            else:
+                content = f'{content}\n<details type="reasoning" done="true" duration="{reasoning_duration}">\n<summary>Thought for {reasoning_duration} seconds</summary>\n{reasoning_display_content}\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}\n<{block["start_tag"]}>{block["content"]}<{block["end_tag"]}>\n'
+            else:
+                content = f'{content}\n<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{reasoning_display_content}\n</details>\n'
+
+    elif block["type"] == "code_interpreter":
+        attributes = block.get("attributes", {})
+        output = block.get("output", None)
+        lang = attributes.get("lang", "")
+
+        content_stripped, original_whitespace = split_content_and_whitespace(content)
+        if is_opening_code_block(content_stripped):
+            # Remove trailing backticks that would open a new block
+            content = content_stripped.rstrip("`").rstrip() + original_whitespace
+        else:
+            # Keep content as is - either closing backticks or no backticks
+            content = content_stripped + original_whitespace
+
+        if output:
+            output = html.escape(json.dumps(output))
+
+            if raw:
+                content = f'{content}\n<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n```output\n{output}\n```\n'
+            else:
+                content = f'{content}\n<details type="code_interpreter" done="true" output="{output}">\n<summary>Analyzed</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+        else:
+            if raw:
+                content = f'{content}\n<code_interpreter type="code" lang="{lang}">\n{block["content"]}\n</code_interpreter>\n'
+            else:
+                content = f'{content}\n<details type="code_interpreter" done="false">\n<summary>Analyzing...</summary>\n```{lang}\n{block["content"]}\n```\n</details>\n'
+
+    else:
+        block_content = str(block["content"]).strip()
+        content = f"{content}{block['type']}: {block_content}\n"
+
+    return content
+
+
+class ContentBlockSerializer:
+    """
+    Serializes content blocks into message content while a response is streamed.
+
+    Only the last block of a streamed response changes between deltas, so the
+    serialized form of all preceding blocks is cached and extended as blocks are
+    appended instead of being rebuilt from scratch on every delta. A trailing
+    text block is copied once into the result rather than being stripped and
+    concatenated several times.
+    """
+
+    def __init__(self):
+        # raw -> (prefix blocks, serialized prefix, serialized prefix lstripped)
+        self.prefixes = {}
+
+    def get_prefix(self, content_blocks, raw):
+        blocks, prefix, _ = self.prefixes.get(raw, ([], "", ""))
+
+        if len(blocks) > len(content_blocks) or any(
+            block is not content_block
+            for block, content_block in zip(blocks, content_blocks)
+        ):
+            blocks, prefix = [], ""
+        elif len(blocks) == len(content_blocks) and raw in self.prefixes:
+            return self.prefixes[raw]
+
+        blocks = list(blocks)
+        for block in content_blocks[len(blocks) :]:
+            prefix = serialize_content_block(prefix, block, raw)
+            blocks.append(block)
+
+        # Blocks are held by reference so their identity can be compared safely
+        self.prefixes[raw] = (blocks, prefix, prefix.lstrip())
+        return self.prefixes[raw]
+
+    def serialize(self, content_blocks, raw=False):
+        if not content_blocks:
+            return ""
+
+        _, prefix, prefix_lstripped = self.get_prefix(content_blocks[:-1], raw)
+
+        block = content_blocks[-1]
+        if block["type"] != "text":
+            return serialize_content_block(prefix, block, raw).strip()
+
+        # Same as serializing the block and stripping the result, but the growing
+        # text of the block is copied only once
+        text = block["content"]
+        start, end = get_strip_bounds(text)
+        if start == end:
+            return prefix.strip()
+        if start == 0 and end == len(text):
+            return f"{prefix_lstripped}{text}"
+        return f"{prefix_lstripped}{text[start:end]}"
+
+
+@functools.lru_cache(maxsize=None)
+def get_start_tag_regex(start_tag):
+    # Match start tag e.g., <tag> or <tag attr="value">
+    return re.compile(rf"<{re.escape(start_tag)}(\s.*?)?>")
+
+
+@functools.lru_cache(maxsize=None)
+def get_end_tag_regex(end_tag):
+    # Match end tag e.g., </tag>
+    return re.compile(rf"<{re.escape(end_tag)}>")
+
+
+def extract_attributes(tag_content):
+    """Extract attributes from a tag if they exist."""
+    attributes = {}
+    if not tag_content:  # Ensure tag_content is not None
+        return attributes
+    # Match attributes in the format: key="value" (ignores single quotes for simplicity)
+    matches = re.findall(r'(\w+)\s*=\s*"([^"]+)"', tag_content)
+    for key, value in matches:
+        attributes[key] = value
+    return attributes
+
+
+class TagContentScanner:
+    """
+    Detects tagged sections (reasoning, code interpreter, solution, ...) in
+    streamed content.
+
+    A cursor is kept per content type so that each call only scans the text
+    appended since the previous call, plus a small lookback for tags that are
+    split across deltas. `content` must only grow between calls, apart from the
+    values returned by `handle` itself.
+    """
+
+    def __init__(self):
+        self.cursors = {}
+
+    def get_scan_start(self, content_type, content, lookback):
+        cursor = min(self.cursors.get(content_type, 0), len(content))
+        start = max(0, cursor - lookback)
+
+        # Start tags never span lines, so there is no need to look past a newline
+        newline = content.rfind("\n", start, cursor)
+        return newline + 1 if newline != -1 else start
+
+    def handle(self, content_type, tags, content, content_blocks):
+        end_flag = False
+
+        if content_blocks[-1]["type"] == "text":
+            scan_start = self.get_scan_start(content_type, content, MAX_TAG_LENGTH)
+
+            for start_tag, end_tag in tags:
+                match = get_start_tag_regex(start_tag).search(content, scan_start)
+                if match:
+                    attr_content = (
+                        match.group(1) if match.group(1) else ""
+                    )  # Ensure it's not None
+                    attributes = extract_attributes(
+                        attr_content
+                    )  # Extract attributes safely
+
+                    # Capture everything before and after the matched tag
+                    before_tag = content[: match.start()]  # Content before opening tag
+                    after_tag = content[match.end() :]  # Content after opening tag
+
+                    # Remove the start tag and after from the currently handling text block
+                    content_blocks[-1]["content"] = content_blocks[-1][
+                        "content"
+                    ].replace(match.group(0) + after_tag, "")
+
+                    if before_tag:
+                        content_blocks[-1]["content"] = before_tag
+
+                    if not content_blocks[-1]["content"]:
+                        content_blocks.pop()
+
+                    # Append the new block
+                    content_blocks.append(
+                        {
+                            "type": content_type,
+                            "start_tag": start_tag,
+                            "end_tag": end_tag,
+                            "attributes": attributes,
+                            "content": "",
+                            "started_at": time.time(),
+                        }
+                    )
+
+                    if after_tag:
+                        content_blocks[-1]["content"] = after_tag
+
+                    # The end tag can only follow the start tag
+                    self.cursors[content_type] = match.end()
+                    return content, content_blocks, end_flag
+
+            self.cursors[content_type] = len(content)
+
+        elif content_blocks[-1]["type"] == content_type:
+            start_tag = content_blocks[-1]["start_tag"]
+            end_tag = content_blocks[-1]["end_tag"]
+            # Match end tag e.g., </tag>
+            end_tag_pattern = rf"<{re.escape(end_tag)}>"
+
+            scan_start = self.get_scan_start(content_type, content, len(f"<{end_tag}>"))
+
+            # Check if the content has the end tag
+            if get_end_tag_regex(end_tag).search(content, scan_start):
+                end_flag = True
+
+                block_content = content_blocks[-1]["content"]
+                # Strip start and end tags from the content
+                start_tag_pattern = rf"<{re.escape(start_tag)}(.*?)>"
+                block_content = re.sub(start_tag_pattern, "", block_content).strip()
+
+                end_tag_regex = re.compile(end_tag_pattern, re.DOTALL)
+                split_content = end_tag_regex.split(block_content, maxsplit=1)
+
+                # Content inside the tag
+                block_content = split_content[0].strip() if split_content else ""
+
+                # Leftover content (everything after `</tag>`)
+                leftover_content = (
+                    split_content[1].strip() if len(split_content) > 1 else ""
+                )
+
+                if block_content:
+                    content_blocks[-1]["content"] = block_content
+                    content_blocks[-1]["ended_at"] = time.time()
+                    content_blocks[-1]["duration"] = int(
+                        content_blocks[-1]["ended_at"]
+                        - content_blocks[-1]["started_at"]
+                    )
+
+                    # Reset the content_blocks by appending a new text block
+                    if content_type != "code_interpreter":
+                        if leftover_content:
+
+                            content_blocks.append(
+                                {
+                                    "type": "text",
+                                    "content": leftover_content,
+                                }
+                            )
+                        else:
+                            content_blocks.append(
+                                {
+                                    "type": "text",
+                                    "content": "",
+                                }
+                            )
+
+                else:
+                    # Remove the block if content is empty
+                    content_blocks.pop()
+
+                    if leftover_content:
+                        content_blocks.append(
+                            {
+                                "type": "text",
+                                "content": leftover_content,
+                            }
+                        )
+                    else:
+                        content_blocks.append(
+                            {
+                                "type": "text",
+                                "content": "",
+                            }
+                        )
+
+                # Clean processed content
+                content = re.sub(
+                    rf"<{re.escape(start_tag)}(.*?)>(.|\n)*?<{re.escape(end_tag)}>",
+                    "",
+                    content,
+                    flags=re.DOTALL,
+                )
+
+                # The content was rewritten, every content type has to rescan it
+                self.cursors = {}
+            else:
+                self.cursors[content_type] = len(content)
+
+        return content, content_blocks, end_flag
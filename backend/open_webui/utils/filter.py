@@ -2,110 +2,178 @@ import inspect
 import logging
 
 from open_webui.utils.plugin import load_function_module_by_id
-from open_webui.models.functions import Functions
+from open_webui.models.functions import (
+    FunctionModel,
+    FunctionWithValvesModel,
+    Functions,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
-def get_sorted_filter_ids(model: dict):
-    def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None and hasattr(function, "valves"):
-            # TODO: Fix FunctionModel to include vavles
-            return (function.valves if function.valves else {}).get("priority", 0)
-        return 0
-
-    filter_ids = [function.id for function in Functions.get_global_filter_functions()]
+# Valves currently applied to each loaded function module, keyed by function id
+FUNCTION_VALVES = {}
+
+
+def get_sorted_filter_functions(model: dict) -> list[FunctionWithValvesModel]:
+    # All active filters are fetched at once, along with their valves
+    enabled_filters = {
+        function.id: function
+        for function in Functions.get_functions_with_valves_by_type(
+            "filter", active_only=True
+        )
+    }
+
+    filter_ids = [
+        function.id for function in enabled_filters.values() if function.is_global
+    ]
     if "info" in model and "meta" in model["info"]:
         filter_ids.extend(model["info"]["meta"].get("filterIds", []))
         filter_ids = list(set(filter_ids))
 
-    enabled_filter_ids = [
-        function.id
-        for function in Functions.get_functions_by_type("filter", active_only=True)
+    filter_functions = [
+        enabled_filters[fid] for fid in filter_ids if fid in enabled_filters
     ]
+    filter_functions.sort(
+        key=lambda function: (function.valves if function.valves else {}).get(
+            "priority", 0
+        )
+    )
+    return filter_functions
+
+
+def get_sorted_filter_ids(model: dict):
+    return [function.id for function in get_sorted_filter_functions(model)]
+
+
+def get_function_module(request, function_id: str):
+    if function_id in request.app.state.FUNCTIONS:
+        return request.app.state.FUNCTIONS[function_id]
+
+    function_module, _, _ = load_function_module_by_id(function_id)
+    request.app.state.FUNCTIONS[function_id] = function_module
+    return function_module
+
+
+def apply_function_valves(function: FunctionModel, function_module):
+    if not (hasattr(function_module, "valves") and hasattr(function_module, "Valves")):
+        return
+
+    if isinstance(function, FunctionWithValvesModel):
+        valves = function.valves
+    else:
+        valves = Functions.get_function_valves_by_id(function.id)
+    valves = valves if valves else {}
+
+    # Only rebuild the valves when they were updated, or the module was reloaded
+    applied = FUNCTION_VALVES.get(function.id)
+    if applied and applied[0] is function_module and applied[1] == valves:
+        return
+
+    function_module.valves = function_module.Valves(**valves)
+    FUNCTION_VALVES[function.id] = (function_module, valves)
+
+
+class FilterChain:
+    """
+    Filter functions of one type, compiled once per request.
+
+    Modules, handlers, valves and handler parameters are resolved when the chain
+    is built, so that running it, e.g. for every streamed chunk, only calls the
+    handlers.
+    """
+
+    def __init__(
+        self,
+        request,
+        filter_functions: list[FunctionModel],
+        filter_type: str,
+        extra_params: dict,
+    ):
+        self.filter_type = filter_type
+        self.body_param = "event" if filter_type == "stream" else "body"
+        self.skip_files = None
+        self.filters = []
+
+        for function in filter_functions:
+            if not function:
+                continue
+
+            filter_id = function.id
+            function_module = get_function_module(request, filter_id)
+
+            # Prepare handler function
+            handler = getattr(function_module, filter_type, None)
+            if not handler:
+                continue
+
+            # Check if the function has a file_handler variable
+            if filter_type == "inlet" and hasattr(function_module, "file_handler"):
+                self.skip_files = function_module.file_handler
+
+            # Apply valves to the function
+            apply_function_valves(function, function_module)
+
+            try:
+                # Prepare parameters
+                sig = inspect.signature(handler)
+
+                params = {
+                    k: v
+                    for k, v in {
+                        **extra_params,
+                        "__id__": filter_id,
+                    }.items()
+                    if k in sig.parameters
+                }
+
+                # Handle user parameters
+                if "__user__" in sig.parameters:
+                    if hasattr(function_module, "UserValves"):
+                        try:
+                            params["__user__"] = {
+                                **params["__user__"],
+                                "valves": function_module.UserValves(
+                                    **Functions.get_user_valves_by_id_and_user_id(
+                                        filter_id, params["__user__"]["id"]
+                                    )
+                                ),
+                            }
+                        except Exception as e:
+                            log.exception(f"Failed to get user values: {e}")
+
+            except Exception as e:
+                log.exception(f"Error in {filter_type} handler {filter_id}: {e}")
+                raise e
+
+            self.filters.append(
+                (filter_id, handler, params, inspect.iscoroutinefunction(handler))
+            )
+
+    async def __call__(self, form_data):
+        for filter_id, handler, params, is_coroutine in self.filters:
+            try:
+                # Execute handler
+                if is_coroutine:
+                    form_data = await handler(**{self.body_param: form_data}, **params)
+                else:
+                    form_data = handler(**{self.body_param: form_data}, **params)
+
+            except Exception as e:
+                log.exception(f"Error in {self.filter_type} handler {filter_id}: {e}")
+                raise e
 
-    filter_ids = [fid for fid in filter_ids if fid in enabled_filter_ids]
-    filter_ids.sort(key=get_priority)
-    return filter_ids
+        # Handle file cleanup for inlet
+        if self.skip_files and "files" in form_data.get("metadata", {}):
+            del form_data["metadata"]["files"]
+
+        return form_data
 
 
 async def process_filter_functions(
     request, filter_functions, filter_type, form_data, extra_params
 ):
-    skip_files = None
-
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
-
-        if filter_id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[filter_id]
-        else:
-            function_module, _, _ = load_function_module_by_id(filter_id)
-            request.app.state.FUNCTIONS[filter_id] = function_module
-
-        # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
-        if not handler:
-            continue
-
-        # Check if the function has a file_handler variable
-        if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
-
-        # Apply valves to the function
-        if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
-
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
-                k: v
-                for k, v in {
-                    **extra_params,
-                    "__id__": filter_id,
-                }.items()
-                if k in sig.parameters
-            }
-
-            # Handle user parameters
-            if "__user__" in sig.parameters:
-                if hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
-                            )
-                        )
-                    except Exception as e:
-                        log.exception(f"Failed to get user values: {e}")
-
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
-            else:
-                form_data = handler(**params)
-
-        except Exception as e:
-            log.exception(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
-
-    # Handle file cleanup for inlet
-    if skip_files and "files" in form_data.get("metadata", {}):
-        del form_data["metadata"]["files"]
-
-    return form_data, {}
+    chain = FilterChain(request, filter_functions, filter_type, extra_params)
+    return await chain(form_data), {}
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class HTTPClientPool:
+    """
+    Long lived HTTP sessions to upstream providers (OpenAI, Ollama, audio and
+    image APIs), one per base URL origin, so that requests reuse kept alive
+    connections instead of paying for a new TCP / TLS handshake every time.
+
+    Sessions are created on first use and closed when the app shuts down.
+    Responses must be released, e.g. with `async with` or `release()`, for
+    their connection to go back to the pool. Cookies are never stored, as the
+    sessions are shared by all users.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int,
+        keepalive_timeout: float,
+        dns_cache_ttl: int,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self.sessions: dict[
+            str, tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]
+        ] = {}
+        self.sync_session: Optional[requests.Session] = None
+        self.sync_session_lock = threading.Lock()
+
+    @staticmethod
+    def get_origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        """
+        Session for requests to `url`. Its default timeout is
+        `AIOHTTP_CLIENT_TIMEOUT`, pass `timeout=` to the request to override it.
+        """
+        loop = asyncio.get_running_loop()
+        origin = self.get_origin(url)
+
+        if origin in self.sessions:
+            session_loop, session = self.sessions[origin]
+            # Sessions are bound to the loop they were created in
+            if session_loop is loop and not session.closed:
+                return session
+
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            ),
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trust_env=True,
+        )
+        self.sessions[origin] = (loop, session)
+        return session
+
+    def get_sync_session(self) -> requests.Session:
+        """
+        Pooled session for the upstream APIs that are called from threads.
+        """
+        with self.sync_session_lock:
+            if self.sync_session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=10, pool_maxsize=self.limit_per_host
+                )
+
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                self.sync_session = session
+
+            return self.sync_session
+
+    async def close(self):
+        sessions, self.sessions = self.sessions, {}
+        for origin, (loop, session) in sessions.items():
+            try:
+                await session.close()
+            except Exception as e:
+                log.warning(f"Error closing the HTTP session of {origin}: {e}")
+
+        with self.sync_session_lock:
+            if self.sync_session is not None:
+                self.sync_session.close()
+                self.sync_session = None
+
+
+HTTP_CLIENT_POOL = HTTPClientPool(
+    limit_per_host=AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    keepalive_timeout=AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=AIOHTTP_CLIENT_DNS_CACHE_TTL,
+)
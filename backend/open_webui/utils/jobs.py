@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from starlette.requests import Request
+
+from open_webui.models.jobs import JobModel, Jobs
+from open_webui.models.users import UserModel, Users
+from open_webui.socket.main import emit_user_event
+from open_webui.config import RAG_INGESTION_WORKERS
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class JobQueue:
+    """
+    Background queue for long running jobs, such as file ingestion.
+
+    Jobs are stored in the `job` table and executed by `workers` concurrent
+    workers, each running the handler registered for the job type in a thread.
+    Progress and state changes are reported to the user over the `chat-events`
+    socket channel as `status` events.
+
+    Running jobs are kept alive with a heartbeat. Jobs that are still pending or
+    whose heartbeat stopped (e.g. after a restart, or on another instance that
+    went away) are resumed on `start` and reclaimed periodically after that.
+    Database calls run in threads so the event loop is never blocked.
+    """
+
+    def __init__(self, workers: int, heartbeat_interval: int = 30):
+        self.workers = workers
+        self.heartbeat_interval = heartbeat_interval
+        self.handlers: dict[str, Callable] = {}
+
+        self.app = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks: list[asyncio.Task] = []
+
+        # Jobs queued or running on this instance
+        self.job_ids: set[str] = set()
+
+    def register(self, type: str):
+        """
+        Register the handler of a job type. Handlers are called from a worker
+        thread with `(request, job, user, report)`, where `report(progress)`
+        publishes a progress dict, and return an optional result dict.
+        """
+
+        def decorator(func):
+            self.handlers[type] = func
+            return func
+
+        return decorator
+
+    def get_stale_before(self) -> int:
+        return int(time.time()) - self.heartbeat_interval * 4
+
+    async def start(self, app):
+        self.app = app
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+        await self.resume()
+
+        self.tasks = [
+            asyncio.create_task(self.worker()) for _ in range(max(self.workers, 1))
+        ]
+        self.tasks.append(asyncio.create_task(self.reclaim()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def enqueue(self, user: UserModel, type: str, data: dict) -> Optional[JobModel]:
+        """
+        Store a new job and schedule it. Safe to call from threads, so that it
+        can be used from synchronous endpoints.
+        """
+        job = Jobs.insert_new_job(user.id, type, data)
+        if job and self.loop:
+            self.loop.call_soon_threadsafe(self.put, job.id)
+        return job
+
+    def put(self, job_id: str):
+        if job_id not in self.job_ids:
+            self.job_ids.add(job_id)
+            self.queue.put_nowait(job_id)
+
+    async def resume(self):
+        """Queue the jobs that are pending or whose worker stopped."""
+        jobs = await asyncio.to_thread(Jobs.get_resumable_jobs, self.get_stale_before())
+        for job in jobs:
+            if job.id not in self.job_ids:
+                log.info(f"Resuming job {job.id} ({job.type})")
+                self.put(job.id)
+
+    async def reclaim(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.resume()
+            except Exception as e:
+                log.exception(f"Error reclaiming jobs: {e}")
+
+    async def worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self.run(job_id)
+            except Exception as e:
+                log.exception(f"Error running job {job_id}: {e}")
+            finally:
+                self.job_ids.discard(job_id)
+                self.queue.task_done()
+
+    async def heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await asyncio.to_thread(Jobs.update_job_by_id, job_id)
+
+    async def emit(self, job: JobModel):
+        await emit_user_event(
+            job.user_id,
+            "chat-events",
+            {
+                "chat_id": None,
+                "message_id": None,
+                "data": {
+                    "type": "status",
+                    "data": {
+                        "action": f"job:{job.type}",
+                        "job_id": job.id,
+                        "status": job.status,
+                        "progress": job.progress,
+                        "error": job.error,
+                        "done": job.status in ["completed", "failed"],
+                    },
+                },
+            },
+        )
+
+    def get_request(self) -> Request:
+        # Handlers only rely on `request.app`, e.g. for `app.state.config`
+        return Request({"type": "http", "app": self.app, "headers": []})
+
+    async def run(self, job_id: str):
+        if not await asyncio.to_thread(
+            Jobs.claim_job_by_id, job_id, self.get_stale_before()
+        ):
+            # Already picked up by another worker
+            return
+
+        job = await asyncio.to_thread(Jobs.get_job_by_id, job_id)
+        handler = self.handlers.get(job.type)
+        user = await Users.get_user_by_id_async(job.user_id)
+
+        if handler is None or user is None:
+            job = await asyncio.to_thread(
+                Jobs.update_job_by_id,
+                job.id,
+                status="failed",
+                error=f"Unknown job type {job.type}" if user else "User not found",
+            )
+            await self.emit(job)
+            return
+
+        await self.emit(job)
+
+        def report(progress: dict):
+            updated_job = Jobs.update_job_by_id(job.id, progress=progress)
+            if updated_job:
+                asyncio.run_coroutine_threadsafe(self.emit(updated_job), self.loop)
+
+        heartbeat = asyncio.create_task(self.heartbeat(job.id))
+        try:
+            result = await asyncio.to_thread(
+                handler, self.get_request(), job, user, report
+            )
+            job = await asyncio.to_thread(
+                Jobs.update_job_by_id, job.id, status="completed", result=result or {}
+            )
+        except Exception as e:
+            log.exception(f"Job {job.id} ({job.type}) failed: {e}")
+            job = await asyncio.to_thread(
+                Jobs.update_job_by_id,
+                job.id,
+                status="failed",
+                error=str(e.detail) if hasattr(e, "detail") else str(e),
+            )
+        finally:
+            heartbeat.cancel()
+
+        if job:
+            await self.emit(job)
+
+
+INGESTION_QUEUE = JobQueue(workers=RAG_INGESTION_WORKERS)
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.users import Users
+from open_webui.env import SRC_LOG_LEVELS, USER_LAST_ACTIVE_FLUSH_INTERVAL
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class LastActiveBuffer:
+    """
+    Write-behind buffer for the users' last activity.
+
+    Authenticated requests only record the time in memory, and all the users seen
+    since the previous flush are written with a single bulk UPDATE every
+    `flush_interval` seconds, instead of one UPDATE per request.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self.pending: dict[str, int] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str):
+        self.pending[user_id] = int(time.time())
+
+    async def flush(self) -> bool:
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return True
+
+        if await asyncio.to_thread(Users.update_users_last_active, pending):
+            return True
+
+        log.warning(f"Error updating the last activity of {len(pending)} users")
+        # Kept for the next flush, unless the users were seen again since
+        self.pending = {**pending, **self.pending}
+        return False
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.exception(e)
+
+    async def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+        await self.flush()
+
+
+LAST_ACTIVE_BUFFER = LastActiveBuffer(flush_interval=USER_LAST_ACTIVE_FLUSH_INTERVAL)
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ssl import CERT_REQUIRED, PROTOCOL_TLS
+from typing import Optional
+
+from open_webui.env import LDAP_CONNECTION_POOL_SIZE, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class LDAPConnectionManager:
+    """
+    Runs the blocking ldap3 binds and searches on a pool of `pool_size` threads,
+    and keeps the connections of the application account bound between logins,
+    so that a user search does not open and bind a new connection every time.
+
+    The connections are dropped when the server settings change, and replaced
+    when the server closed them. Users are always bound on a new connection,
+    which is closed right after.
+    """
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="ldap"
+        )
+
+        self.lock = threading.Lock()
+        self.settings: Optional[tuple] = None
+        self.server = None
+        self.idle: list = []
+
+    def _get_server(self, settings: tuple):
+        from ldap3 import NONE, Server, Tls
+
+        with self.lock:
+            if settings == self.settings:
+                return self.server
+
+            host, port, use_tls, ca_cert_file, ciphers, _, _ = settings
+            try:
+                tls = Tls(
+                    validate=CERT_REQUIRED,
+                    version=PROTOCOL_TLS,
+                    ca_certs_file=ca_cert_file,
+                    ciphers=ciphers,
+                )
+            except Exception as e:
+                log.error(f"An error occurred on TLS: {str(e)}")
+                raise
+
+            self._close_idle()
+            self.settings = settings
+            self.server = Server(
+                host=host, port=port, get_info=NONE, use_ssl=use_tls, tls=tls
+            )
+            return self.server
+
+    def _close_idle(self):
+        for connection in self.idle:
+            try:
+                connection.unbind()
+            except Exception:
+                pass
+        self.idle = []
+
+    def _acquire(self, settings: tuple):
+        from ldap3 import Connection
+
+        server = self._get_server(settings)
+        with self.lock:
+            while self.idle:
+                connection = self.idle.pop()
+                if not connection.closed:
+                    return connection
+
+        connection = Connection(
+            server,
+            settings[5],
+            settings[6],
+            auto_bind="NONE",
+            authentication="SIMPLE",
+        )
+        if not connection.bind():
+            raise ValueError("Application account bind failed")
+        return connection
+
+    def _release(self, settings: tuple, connection):
+        with self.lock:
+            if settings == self.settings and len(self.idle) < self.pool_size:
+                self.idle.append(connection)
+                return
+
+        try:
+            connection.unbind()
+        except Exception:
+            pass
+
+    def _search(self, settings: tuple, **kwargs) -> Optional[list]:
+        from ldap3.core.exceptions import LDAPException
+
+        # A pooled connection may have been closed by the server in the meantime
+        for attempt in range(2):
+            connection = self._acquire(settings)
+            try:
+                if not connection.search(**kwargs):
+                    self._release(settings, connection)
+                    return None
+
+                entries = list(connection.entries)
+                self._release(settings, connection)
+                return entries
+            except LDAPException as e:
+                try:
+                    connection.unbind()
+                except Exception:
+                    pass
+
+                if attempt:
+                    raise
+                log.debug(f"Retrying the LDAP search on a new connection: {e}")
+
+    def _bind_user(self, settings: tuple, user_dn: str, password: str) -> bool:
+        from ldap3 import Connection
+
+        connection = Connection(
+            self._get_server(settings),
+            user_dn,
+            password,
+            auto_bind="NONE",
+            authentication="SIMPLE",
+        )
+        try:
+            return connection.bind()
+        finally:
+            connection.unbind()
+
+    async def run(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def search(self, settings: tuple, **kwargs) -> Optional[list]:
+        """
+        Search with an application account connection, `kwargs` are those of
+        `ldap3.Connection.search`. Returns the entries found, or None if the
+        search failed.
+
+        `settings` is (host, port, use_tls, ca_cert_file, ciphers, app_dn,
+        app_password).
+        """
+        return await self.run(self._search, settings, **kwargs)
+
+    async def bind_user(self, settings: tuple, user_dn: str, password: str) -> bool:
+        return await self.run(self._bind_user, settings, user_dn, password)
+
+    def close(self):
+        with self.lock:
+            self._close_idle()
+
+
+LDAP_CONNECTION_MANAGER = LDAPConnectionManager(pool_size=LDAP_CONNECTION_POOL_SIZE)
@@ -0,0 +1,209 @@
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from open_webui.env import (
+    LOAD_BALANCER_STRATEGY,
+    LOAD_BALANCER_FAILURE_THRESHOLD,
+    LOAD_BALANCER_COOLDOWN,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class BackendStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+
+        # EWMA of the time to the response headers, in seconds
+        self.latency: Optional[float] = None
+
+        # The backend is skipped until then (circuit open)
+        self.open_until = 0.0
+
+        # Models loaded in memory, as reported by the backend
+        self.loaded_models: set[str] = set()
+        self.loaded_models_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "latency": self.latency,
+            "healthy": self.open_until <= time.monotonic(),
+            "loaded_models": sorted(self.loaded_models),
+        }
+
+
+# Cost of sending a request to a backend, the cheapest one is picked. `load` is
+# the number of requests in flight, plus a penalty if the model is not loaded.
+STRATEGIES: dict[str, Callable[[BackendStats, float], object]] = {
+    "least_requests": lambda stats, load: (load, stats.latency or 0),
+    "latency": lambda stats, load: (stats.latency or 0) * (load + 1),
+    "random": lambda stats, load: random.random(),
+}
+
+
+class LoadBalancer:
+    """
+    Picks the backend to send a request to, among the base URLs serving a model.
+
+    Backends are ranked by `strategy` (see `STRATEGIES`), and those that already
+    have the model loaded are preferred, a cold backend counting as if it had
+    `cold_penalty` more requests in flight. Health is checked passively: after
+    `failure_threshold` consecutive connection or server errors a backend is
+    skipped for `cooldown` seconds, after which it gets requests again.
+    """
+
+    def __init__(
+        self,
+        strategy: str = LOAD_BALANCER_STRATEGY,
+        failure_threshold: int = LOAD_BALANCER_FAILURE_THRESHOLD,
+        cooldown: float = LOAD_BALANCER_COOLDOWN,
+        latency_alpha: float = 0.2,
+        cold_penalty: float = 2,
+        loaded_models_ttl: float = 10,
+    ):
+        if strategy not in STRATEGIES:
+            log.warning(f"Unknown load balancer strategy {strategy}")
+            strategy = "least_requests"
+
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_alpha = latency_alpha
+        self.cold_penalty = cold_penalty
+        self.loaded_models_ttl = loaded_models_ttl
+
+        self.stats: dict[str, BackendStats] = {}
+
+    def get_stats(self, url: str) -> BackendStats:
+        if url not in self.stats:
+            self.stats[url] = BackendStats()
+        return self.stats[url]
+
+    def choose(
+        self,
+        urls: list[str],
+        model: Optional[str] = None,
+        exclude: Optional[set[str]] = None,
+    ) -> Optional[str]:
+        candidates = [url for url in dict.fromkeys(urls) if url not in (exclude or ())]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+
+        now = time.monotonic()
+        # All backends failing: try them anyway rather than failing the request
+        candidates = [
+            url for url in candidates if self.get_stats(url).open_until <= now
+        ] or candidates
+
+        strategy = STRATEGIES[self.strategy]
+        costs = {}
+        for url in candidates:
+            stats = self.get_stats(url)
+            load = stats.in_flight
+            if (
+                model
+                and stats.loaded_models_at is not None
+                and model not in stats.loaded_models
+            ):
+                load += self.cold_penalty
+            costs[url] = strategy(stats, load)
+
+        cost = min(costs.values())
+        return random.choice([url for url in candidates if costs[url] == cost])
+
+    def needs_loaded_models(self, urls: list[str]) -> list[str]:
+        """
+        Backends whose loaded models are unknown or outdated. They are marked as
+        up to date, so that only one caller refreshes them.
+        """
+        now = time.monotonic()
+        outdated = []
+        for url in dict.fromkeys(urls):
+            stats = self.get_stats(url)
+            if (
+                stats.loaded_models_at is None
+                or now - stats.loaded_models_at > self.loaded_models_ttl
+            ):
+                stats.loaded_models_at = now
+                outdated.append(url)
+        return outdated
+
+    def set_loaded_models(self, url: str, models: list[str]):
+        stats = self.get_stats(url)
+        stats.loaded_models = set(models)
+        stats.loaded_models_at = time.monotonic()
+
+    def begin(self, url: str) -> Callable[[], None]:
+        """
+        Count a request in flight to `url`, until the returned function is
+        called. Calling it more than once has no effect, as the cleanup of a
+        streamed response may run more than once.
+        """
+        stats = self.get_stats(url)
+        stats.in_flight += 1
+        stats.requests += 1
+
+        ended = False
+
+        def end():
+            nonlocal ended
+            if not ended:
+                ended = True
+                stats.in_flight -= 1
+
+        return end
+
+    def record(
+        self,
+        url: str,
+        latency: Optional[float] = None,
+        failed: bool = False,
+        model: Optional[str] = None,
+    ):
+        stats = self.get_stats(url)
+
+        if failed:
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.failure_threshold:
+                if stats.open_until <= time.monotonic():
+                    log.warning(
+                        f"Backend {url} failed {stats.consecutive_failures} times "
+                        f"in a row, skipping it for {self.cooldown}s"
+                    )
+                stats.open_until = time.monotonic() + self.cooldown
+            return
+
+        stats.consecutive_failures = 0
+        stats.open_until = 0.0
+        if model:
+            # The backend loaded the model to serve the request
+            stats.loaded_models.add(model)
+        if latency is not None:
+            stats.latency = (
+                latency
+                if stats.latency is None
+                else self.latency_alpha * latency
+                + (1 - self.latency_alpha) * stats.latency
+            )
+
+    def get_all_stats(self, urls: list[str]) -> list[dict]:
+        return [
+            {"idx": idx, "url": url, **self.get_stats(url).to_dict()}
+            for idx, url in enumerate(urls)
+        ]
+
+
+OLLAMA_LOAD_BALANCER = LoadBalancer()
+OPENAI_LOAD_BALANCER = LoadBalancer()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_BUFFER_SIZE,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class PendingMessage:
+    def __init__(self):
+        self.fields: dict = {}
+        self.content_length = 0
+        self.buffered_size = 0
+        self.flushed_at = time.monotonic()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.lock = asyncio.Lock()
+
+
+class MessageStore:
+    """
+    Write-behind buffer for messages that are being streamed into a chat.
+
+    Updates are staged in memory per (chat_id, message_id) and coalesced, so that
+    only the latest state of the changed message is written to the database once
+    per `flush_interval` seconds or once `flush_size` characters of new content
+    have been buffered, instead of rewriting the chat on every token.
+    """
+
+    def __init__(self, flush_interval: float, flush_size: int):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.pending: dict[tuple[str, str], PendingMessage] = {}
+
+        # Strong references to the flushes started by timers, see `schedule_flush`
+        self.flush_tasks: set[asyncio.Task] = set()
+
+    async def stage(self, chat_id: str, message_id: str, message: dict):
+        key = (chat_id, message_id)
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = self.pending[key] = PendingMessage()
+
+        entry.fields = {**entry.fields, **message}
+
+        content = message.get("content")
+        if isinstance(content, str):
+            entry.buffered_size += max(len(content) - entry.content_length, 1)
+            entry.content_length = len(content)
+
+        if (
+            entry.buffered_size >= self.flush_size
+            or time.monotonic() - entry.flushed_at >= self.flush_interval
+        ):
+            await self.flush(chat_id, message_id)
+        elif entry.timer is None:
+            # Make sure trailing updates are persisted even if the stream stalls
+            entry.timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, self.schedule_flush, chat_id, message_id
+            )
+
+    def schedule_flush(self, chat_id: str, message_id: str):
+        task = asyncio.create_task(self.flush(chat_id, message_id))
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.on_flush_done)
+
+    def on_flush_done(self, task: asyncio.Task):
+        self.flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"Error flushing a message: {task.exception()}")
+
+    async def flush(self, chat_id: str, message_id: str, close: bool = False) -> bool:
+        """
+        Write the buffered fields of a message to the database. With `close=True`
+        the message is also dropped from the buffer, which should be done once
+        the message is complete.
+        """
+        key = (chat_id, message_id)
+        entry = self.pending.get(key)
+        if entry is None:
+            return True
+
+        async with entry.lock:
+            if entry.timer is not None:
+                entry.timer.cancel()
+                entry.timer = None
+
+            fields = entry.fields
+            entry.fields = {}
+            entry.buffered_size = 0
+            entry.flushed_at = time.monotonic()
+
+            result = True
+            if fields:
+                result = await Chats.upsert_message_to_chat_by_id_and_message_id_async(
+                    chat_id, message_id, fields
+                )
+
+            if not result:
+                log.warning(f"Failed to flush message {message_id} of chat {chat_id}")
+                # Keep the fields so that the next flush retries them
+                entry.fields = {**fields, **entry.fields}
+
+            if close and self.pending.get(key) is entry:
+                del self.pending[key]
+
+            return result
+
+    async def flush_all(self):
+        # Let the flushes already started by timers finish first
+        await asyncio.gather(*self.flush_tasks, return_exceptions=True)
+
+        for chat_id, message_id in list(self.pending.keys()):
+            await self.flush(chat_id, message_id, close=True)
+
+
+MESSAGE_STORE = MessageStore(
+    flush_interval=REALTIME_CHAT_SAVE_INTERVAL,
+    flush_size=REALTIME_CHAT_SAVE_BUFFER_SIZE,
+)
@@ -1,6 +1,10 @@
+import asyncio
+import hashlib
+import json
 import time
 import logging
 import sys
+from typing import Optional
 
 from aiocache import cached
 from fastapi import Request
@@ -21,7 +25,11 @@ from open_webui.config import (
     DEFAULT_ARENA_MODEL,
 )
 
-from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
+from open_webui.env import (
+    MODEL_CATALOGUE_REFRESH_INTERVAL,
+    SRC_LOG_LEVELS,
+    GLOBAL_LOG_LEVEL,
+)
 from open_webui.models.users import UserModel
 
 
@@ -101,71 +109,84 @@ async def get_all_models(request, user: UserModel = None):
             ]
         models = models + arena_models
 
-    global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
-    ]
-    enabled_action_ids = [
-        function.id
+    # Active actions, fetched once along with their metadata
+    action_functions = {
+        function.id: function
         for function in Functions.get_functions_by_type("action", active_only=True)
+    }
+    global_action_ids = [
+        function.id for function in action_functions.values() if function.is_global
     ]
 
+    # Index the models by id and by id without tag (e.g. "llama3" for
+    # "llama3:latest"), in list order, instead of scanning them per custom model
+    models_by_id = {}
+
+    def add_model_to_index(model):
+        for key in dict.fromkeys([model["id"], model["id"].split(":")[0]]):
+            models_by_id.setdefault(key, []).append(model)
+
+    def remove_model_from_index(model):
+        for key in dict.fromkeys([model["id"], model["id"].split(":")[0]]):
+            models_by_id[key].remove(model)
+
+    for model in models:
+        add_model_to_index(model)
+
+    removed_model_ids = set()
+
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
-            for model in models:
-                if (
-                    custom_model.id == model["id"]
-                    or custom_model.id == model["id"].split(":")[0]
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        action_ids = []
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
+            for model in list(models_by_id.get(custom_model.id, [])):
+                if custom_model.is_active:
+                    model["name"] = custom_model.name
+                    model["info"] = custom_model.model_dump()
+
+                    action_ids = []
+                    if "info" in model and "meta" in model["info"]:
+                        action_ids.extend(model["info"]["meta"].get("actionIds", []))
+
+                    model["action_ids"] = action_ids
+                else:
+                    remove_model_from_index(model)
+                    removed_model_ids.add(id(model))
+
+        elif custom_model.is_active and not any(
+            model["id"] == custom_model.id
+            for model in models_by_id.get(custom_model.id, [])
         ):
             owned_by = "openai"
             pipe = None
             action_ids = []
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
-                    owned_by = model.get("owned_by", "unknown owner")
-                    if "pipe" in model:
-                        pipe = model["pipe"]
-                    break
+            base_models = models_by_id.get(custom_model.base_model_id, [])
+            if base_models:
+                owned_by = base_models[0].get("owned_by", "unknown owner")
+                if "pipe" in base_models[0]:
+                    pipe = base_models[0]["pipe"]
 
             if custom_model.meta:
                 meta = custom_model.meta.model_dump()
                 if "actionIds" in meta:
                     action_ids.extend(meta["actionIds"])
 
-            models.append(
-                {
-                    "id": f"{custom_model.id}",
-                    "name": custom_model.name,
-                    "object": "model",
-                    "created": custom_model.created_at,
-                    "owned_by": owned_by,
-                    "info": custom_model.model_dump(),
-                    "preset": True,
-                    **({"pipe": pipe} if pipe is not None else {}),
-                    "action_ids": action_ids,
-                }
-            )
+            model = {
+                "id": f"{custom_model.id}",
+                "name": custom_model.name,
+                "object": "model",
+                "created": custom_model.created_at,
+                "owned_by": owned_by,
+                "info": custom_model.model_dump(),
+                "preset": True,
+                **({"pipe": pipe} if pipe is not None else {}),
+                "action_ids": action_ids,
+            }
+            models.append(model)
+            add_model_to_index(model)
+
+    if removed_model_ids:
+        models = [model for model in models if id(model) not in removed_model_ids]
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -204,14 +225,12 @@ async def get_all_models(request, user: UserModel = None):
         action_ids = [
             action_id
             for action_id in list(set(model.pop("action_ids", []) + global_action_ids))
-            if action_id in enabled_action_ids
+            if action_id in action_functions
         ]
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
+            action_function = action_functions[action_id]
 
             function_module = get_function_module_by_id(action_id)
             model["actions"].extend(
@@ -223,7 +242,7 @@ async def get_all_models(request, user: UserModel = None):
     return models
 
 
-def check_model_access(user, model):
+async def check_model_access(user, model):
     if model.get("arena"):
         if not has_access(
             user.id,
@@ -234,7 +253,7 @@ def check_model_access(user, model):
         ):
             raise Exception("Model not found")
     else:
-        model_info = Models.get_model_by_id(model.get("id"))
+        model_info = await Models.get_model_by_id_async(model.get("id"))
         if not model_info:
             raise Exception("Model not found")
         elif not (
@@ -244,3 +263,195 @@ def check_model_access(user, model):
             )
         ):
             raise Exception("Model not found")
+
+
+class ModelCatalogue:
+    """
+    In-memory catalogue of all models, shared by all requests.
+
+    Provider model lists are refreshed in the background every
+    `refresh_interval` seconds. The catalogue is also rebuilt on the next read
+    after `invalidate`, or once models, functions or the connection settings
+    changed, e.g. through another worker. Every rebuild gets a new `version`, which is part of the
+    `ETag` of the per-user views. Changes of the models and functions tables
+    are checked at most every `check_interval` seconds, off the event loop.
+
+    Who can read each model is precomputed on rebuild, so that filtering the
+    catalogue for a user is a set lookup per model.
+
+    Provider lists are fetched without a user, so the catalogue is not used
+    when `ENABLE_FORWARD_USER_INFO_HEADERS` is set, as providers may then list
+    different models for each user.
+    """
+
+    def __init__(self, refresh_interval: int, check_interval: float = 1):
+        self.refresh_interval = refresh_interval
+        self.check_interval = check_interval
+
+        self.version = 0
+        self.models: list[dict] = []
+        self.readers: dict[str, Optional[dict]] = {}
+
+        self.fingerprint = None
+        self.updated_at = None
+        self.checked_at = 0.0
+        self.stale = True
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def invalidate(self):
+        self.stale = True
+
+    @staticmethod
+    def get_updated_at() -> list:
+        return [Models.get_models_updated_at(), Functions.get_functions_updated_at()]
+
+    async def get_fingerprint(self, request: Request, force: bool = False) -> str:
+        now = time.monotonic()
+        if (
+            force
+            or self.updated_at is None
+            or now - self.checked_at >= self.check_interval
+        ):
+            # Set before awaiting, so that concurrent requests reuse the last value
+            self.checked_at = now
+            self.updated_at = await asyncio.to_thread(self.get_updated_at)
+
+        config = request.app.state.config
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    config.ENABLE_OPENAI_API,
+                    config.OPENAI_API_BASE_URLS,
+                    config.OPENAI_API_KEYS,
+                    config.OPENAI_API_CONFIGS,
+                    config.ENABLE_OLLAMA_API,
+                    config.OLLAMA_BASE_URLS,
+                    config.OLLAMA_API_CONFIGS,
+                    config.ENABLE_EVALUATION_ARENA_MODELS,
+                    config.EVALUATION_ARENA_MODELS,
+                    self.updated_at,
+                ],
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+    async def get_models(self, request: Request) -> list[dict]:
+        fingerprint = await self.get_fingerprint(request)
+        if self.stale or fingerprint != self.fingerprint:
+            await self.refresh(request, fingerprint)
+        return self.models
+
+    async def refresh(self, request: Request, fingerprint: Optional[str] = None):
+        version = self.version
+        async with self.lock:
+            if self.version != version:
+                # Rebuilt by a concurrent request while waiting for the lock
+                return
+
+            self.stale = False
+            fingerprint = fingerprint or await self.get_fingerprint(request, force=True)
+
+            # The catalogue is shared, so provider lists are not fetched per user
+            models = await get_all_models(request)
+            self.set_models(models, fingerprint)
+
+    def set_models(self, models: list[dict], fingerprint: str):
+        self.models = models
+        self.readers = self.get_readers(models)
+        self.fingerprint = fingerprint
+        self.version += 1
+
+    @staticmethod
+    def get_readers(models: list[dict]) -> dict[str, Optional[dict]]:
+        custom_models = {model.id: model for model in Models.get_all_models()}
+
+        readers = {}
+        for model in models:
+            if model.get("arena"):
+                owner_id = None
+                access_control = (
+                    model.get("info", {}).get("meta", {}).get("access_control", {})
+                )
+            elif model["id"] in custom_models:
+                owner_id = custom_models[model["id"]].user_id
+                access_control = custom_models[model["id"]].access_control
+            else:
+                # Only admins can see models without settings
+                readers[model["id"]] = None
+                continue
+
+            read_access = (access_control or {}).get("read", {})
+            readers[model["id"]] = {
+                "owner_id": owner_id,
+                "public": access_control is None,
+                "user_ids": set(read_access.get("user_ids", [])),
+                "group_ids": set(read_access.get("group_ids", [])),
+            }
+        return readers
+
+    def can_read(
+        self,
+        model_id: str,
+        user_id: str,
+        user_group_ids: set[str],
+        readers: Optional[dict[str, Optional[dict]]] = None,
+    ):
+        readers = (self.readers if readers is None else readers).get(model_id)
+        if readers is None:
+            return False
+
+        return (
+            readers["public"]
+            or user_id == readers["owner_id"]
+            or user_id in readers["user_ids"]
+            or not readers["group_ids"].isdisjoint(user_group_ids)
+        )
+
+    def filter_models(
+        self,
+        models: list[dict],
+        user_id: str,
+        user_group_ids: set[str],
+        readers: Optional[dict[str, Optional[dict]]] = None,
+    ) -> list[dict]:
+        """
+        `readers` are those of models not from the catalogue, see `get_readers`.
+        """
+        return [
+            model
+            for model in models
+            if self.can_read(model["id"], user_id, user_group_ids, readers)
+        ]
+
+    def get_etag(self, *args) -> str:
+        """
+        Weak `ETag` of a view of the catalogue, `args` are whatever else the
+        view depends on, e.g. the user's groups and the model order.
+        """
+        digest = hashlib.sha256(
+            json.dumps([self.fingerprint, *args], default=str).encode()
+        ).hexdigest()[:16]
+        return f'W/"{self.version}-{digest}"'
+
+    async def start(self, app):
+        async def refresh_periodically():
+            # Handlers only rely on `request.app`, e.g. for `app.state.config`
+            request = Request({"type": "http", "app": app, "headers": []})
+            while True:
+                try:
+                    await self.refresh(request)
+                except Exception as e:
+                    log.exception(f"Error refreshing the model catalogue: {e}")
+                await asyncio.sleep(self.refresh_interval)
+
+        self.task = asyncio.create_task(refresh_periodically())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+
+MODEL_CATALOGUE = ModelCatalogue(refresh_interval=MODEL_CATALOGUE_REFRESH_INTERVAL)
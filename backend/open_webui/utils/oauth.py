@@ -42,7 +42,7 @@ from open_webui.env import (
     WEBUI_AUTH_COOKIE_SECURE,
 )
 from open_webui.utils.misc import parse_duration
-from open_webui.utils.auth import get_password_hash, create_token
+from open_webui.utils.auth import get_password_hash_async, create_token
 from open_webui.utils.webhook import post_webhook
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
@@ -370,7 +370,7 @@ class OAuthManager:
 
                 user = Auths.insert_new_auth(
                     email=email,
-                    password=get_password_hash(
+                    password=await get_password_hash_async(
                         str(uuid.uuid4())
                     ),  # Random password, not used
                     name=name,
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from open_webui.internal.db import Session, session_threads
+
+
+def is_invalid_websocket_upgrade(scope: Scope) -> bool:
+    """
+    Whether a socket.io websocket request lacks the upgrade headers.
+
+    This is to work around this upstream issue:
+    https://github.com/miguelgrinberg/python-engineio/issues/367
+    """
+    if "/ws/socket.io" not in scope["path"]:
+        return False
+
+    if QueryParams(scope["query_string"]).get("transport") != "websocket":
+        return False
+
+    headers = Headers(scope=scope)
+    upgrade = (headers.get("Upgrade") or "").lower()
+    connection = (headers.get("Connection") or "").lower().split(",")
+    return upgrade != "websocket" or "upgrade" not in connection
+
+
+class RequestMiddleware:
+    """
+    Pure ASGI middleware run for every HTTP request. Unlike `BaseHTTPMiddleware`
+    it does not run the app in a separate task nor pass the response body through
+    a queue, so streamed responses are forwarded as they are.
+
+    It rejects socket.io websocket requests without the upgrade headers, sets
+    `request.state.enable_api_key`, adds the `X-Process-Time` header (milliseconds
+    until the response starts) and commits the scoped database session of the
+    event loop thread if the request used it. The scoped sessions are
+    thread-local, so those used by handlers run in worker threads are not
+    committed here but by their users.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        if is_invalid_websocket_upgrade(scope):
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "Invalid WebSocket upgrade request"},
+            )
+            return await response(scope, receive, send)
+
+        config = scope["app"].state.config
+        scope.setdefault("state", {})["enable_api_key"] = config.ENABLE_API_KEY
+
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                process_time = int((time.perf_counter() - started_at) * 1000)
+                MutableHeaders(scope=message)["X-Process-Time"] = str(process_time)
+            await send(message)
+
+        threads = set()
+        token = session_threads.set(threads)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session_threads.reset(token)
+
+        if threading.get_ident() in threads:
+            Session.commit()
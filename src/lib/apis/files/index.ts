@@ -1,11 +1,15 @@
 import { WEBUI_API_BASE_URL } from '$lib/constants';
+import { waitForJob } from '$lib/apis/retrieval';
 
-export const uploadFile = async (token: string, file: File) => {
+export const uploadFile = async (token: string, file: File, background: boolean = false) => {
 	const data = new FormData();
 	data.append('file', file);
 	let error = null;
 
-	const res = await fetch(`${WEBUI_API_BASE_URL}/files/`, {
+	// In the background, the response has a `job_id` and the file is processed once it completes
+	const searchParams = background ? '?background=true' : '';
+
+	const res = await fetch(`${WEBUI_API_BASE_URL}/files/${searchParams}`, {
 		method: 'POST',
 		headers: {
 			Accept: 'application/json',
@@ -30,6 +34,20 @@ export const uploadFile = async (token: string, file: File) => {
 	return res;
 };
 
+// Uploads a file and resolves once it is processed, without keeping the upload request open
+export const uploadAndProcessFile = async (token: string, file: File) => {
+	const uploadedFile = await uploadFile(token, file, true);
+
+	try {
+		await waitForJob(token, uploadedFile.job_id);
+	} catch (e) {
+		// Like an upload whose processing failed, the file is kept
+		return { ...uploadedFile, error: `${e}` };
+	}
+
+	return await getFileById(token, uploadedFile.id);
+};
+
 export const uploadDir = async (token: string) => {
 	let error = null;
 
@@ -177,10 +177,18 @@ export const updateKnowledgeById = async (token: string, id: string, form: Knowl
 	return res;
 };
 
-export const addFileToKnowledgeById = async (token: string, id: string, fileId: string) => {
+export const addFileToKnowledgeById = async (
+	token: string,
+	id: string,
+	fileId: string,
+	background: boolean = false
+) => {
 	let error = null;
 
-	const res = await fetch(`${WEBUI_API_BASE_URL}/knowledge/${id}/file/add`, {
+	// In the background, the response has a `job_id` and the file is added once it completes
+	const searchParams = background ? '?background=true' : '';
+
+	const res = await fetch(`${WEBUI_API_BASE_URL}/knowledge/${id}/file/add${searchParams}`, {
 		method: 'POST',
 		headers: {
 			Accept: 'application/json',